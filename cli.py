@@ -0,0 +1,341 @@
+"""
+Qt 없이 실행하는 명령줄 도구입니다 (헤드리스 번역 서버, cron, 대량 제출과 처리량 측정용).
+
+GUI와 같은 GeminiApiService / ConfigManager / JobTracker를 사용하며 PySide6는 임포트하지 않습니다.
+결과는 표준 출력에 한 줄에 JSON 객체 하나씩(JSON Lines) 쓰고, 로그는 표준 오류와 app.log에 남깁니다.
+하나라도 실패하면 종료 코드 1을 반환합니다 (잘못된 인자는 2, Ctrl+C로 멈추면 130).
+
+실행 예:
+    python -m cli submit 소설1.txt 소설2.txt --watch --download
+    python -m cli status
+    python -m cli watch batches/abc123 --download --timeout 86400
+    python -m cli download batches/abc123 --output 결과.txt
+    python -m cli delete batches/abc123
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from model.config_manager import ConfigManager
+from model.gemini_api_service import GeminiApiService, normalize_job_state
+from model.logger import setup_logger
+from model.poll_scheduler import PollScheduler, TERMINAL_STATES
+from model.submission_queue import SubmissionQueue, QUEUED, IN_FLIGHT, FAILED
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INTERRUPTED = 130
+
+# 명령줄 제출 대기열 파일 (GUI의 submission_queue.json과 따로 둠). 중단된 제출은 다음 submit에서 이어서 처리됩니다.
+CLI_QUEUE_FILE = 'cli_submission_queue.json'
+
+_emit_lock = threading.Lock()
+
+
+def emit(event, **fields):
+    """결과 레코드 하나를 표준 출력에 JSON 한 줄로 씁니다 (제출 워커 스레드에서도 호출됨)."""
+    line = json.dumps({'event': event, **fields}, ensure_ascii=False, default=str)
+    with _emit_lock:
+        print(line, flush=True)
+
+
+def job_record(service, job):
+    """API 작업 객체와 추적 정보를 합친 상태 레코드."""
+    info = service.job_tracker.get_job(job.name, include_manifest=False)
+    record = {
+        'job': job.name,
+        'state': normalize_job_state(job.state.name),
+        'display_name': getattr(job, 'display_name', None),
+        'source_file': info.get('source_file'),
+        'output_file': info.get('output_file'),
+        'create_time': getattr(job, 'create_time', None),
+        'update_time': getattr(job, 'update_time', None),
+    }
+    for key in ('fanout_group', 'fanout_part', 'repair_of'):
+        if info.get(key) is not None:
+            record[key] = info[key]
+    if getattr(job, 'error', None):
+        record['error'] = str(job.error)
+    return record
+
+
+def download_job(service, job_name, output=None):
+    """
+    성공한 작업의 결과를 내려받아 결과 파일을 씁니다. 분산 제출의 파트이면 그룹 전체를 합칩니다.
+    output이 없으면 소스 파일 옆의 기본 경로(분산 제출은 제출 시 지정한 경로)에 씁니다. 'downloaded' 레코드 필드를 반환합니다.
+    """
+    job = service.get_batch_job(job_name)
+    state = normalize_job_state(job.state.name)
+    if state != 'SUCCEEDED':
+        raise ValueError(f"Job '{job_name}' is {state}, only SUCCEEDED jobs can be downloaded.")
+    info = service.job_tracker.get_job(job_name, include_manifest=False)
+    if info.get('source_files') and not output:
+        raise ValueError(f"Job '{job_name}' translates several files; pass --output with a directory for the results.")
+    if not output and not info.get('fanout_group'):
+        if not info.get('source_file'):
+            raise ValueError(f"Job '{job_name}' is not tracked on this machine; pass --output.")
+        output = service._default_output_path(info['source_file'])
+    report = service.download_and_process_results(job, output)
+    if info.get('fanout_group'):
+        output = service.job_tracker.get_group(info['fanout_group']).get('merged_output')
+    return {
+        'job': job_name, 'output': output, 'repair': report.summary() if report else None,
+        'repair_job': report.repair_job.name if report and report.repair_job else None,
+    }
+
+
+def finish_ready_work(service):
+    """
+    GUI의 상태 확인 직후와 같이, 모든 파트가 성공한 분산 제출 그룹을 합치고 성공한 복구용 배치 작업을 결과 파일에 반영합니다.
+    하나라도 실패하면 False를 반환합니다.
+    """
+    ok = True
+    for group_id in service.ready_fanout_groups():
+        try:
+            emit('merged', group=group_id, output=service.merge_fanout_group(group_id))
+        except Exception as e:
+            logger.error(f"Failed to merge results of job group '{group_id}': {e}", exc_info=True)
+            emit('error', group=group_id, error=str(e))
+            ok = False
+    for job_name in service.ready_repair_jobs():
+        try:
+            report = service.apply_repair_job(job_name)
+            emit('repaired', job=job_name, repair_of=report.job_name, output=report.output_path, repair=report.summary())
+        except Exception as e:
+            logger.error(f"Failed to apply repair job '{job_name}': {e}", exc_info=True)
+            emit('error', job=job_name, error=str(e))
+            ok = False
+    return ok
+
+
+def watch_jobs(service, job_names, download=False, timeout=None):
+    """
+    작업들이 끝날 때까지 GUI와 같은 작업별 간격(PollScheduler)으로 상태를 확인하고, 상태가 바뀔 때마다 'state' 레코드를 씁니다.
+    download가 켜져 있으면 성공한 작업의 결과를 바로 내려받고, 그 과정에서 제출된 복구용 배치 작업도 이어서 지켜봅니다.
+    모든 작업이 성공하고 결과 반영이 끝나면 True를 반환합니다.
+    """
+    config = service.config
+    scheduler = PollScheduler(
+        min_interval=config.get('poll_min_seconds', 15),
+        max_interval=config.get('poll_max_seconds', 600),
+        backoff=config.get('poll_backoff', 1.5),
+    )
+    deadline = time.monotonic() + timeout if timeout else None
+    states = {}
+    ok = True
+    due = list(dict.fromkeys(job_names))
+    while True:
+        for job_name in due:
+            now = time.monotonic()
+            try:
+                job = service.get_batch_job(job_name)
+            except Exception as e:
+                logger.warning(f"Failed to poll job '{job_name}': {e}")
+                emit('error', job=job_name, error=str(e))
+                if job_name in states:
+                    # 일시적인 오류일 수 있으므로 간격을 늘려 다시 시도
+                    scheduler.postpone([job_name], now)
+                else:
+                    # 한 번도 확인하지 못한 작업(잘못된 이름, 삭제된 작업)은 더 지켜보지 않음
+                    ok = False
+                continue
+            state = normalize_job_state(job.state.name)
+            service.release_finished_job_resources(job.name, job.state.name)
+            if states.get(job_name) != state:
+                emit('state', **job_record(service, job))
+            if job_name in states:
+                scheduler.record(job_name, state, now)
+            else:
+                scheduler.track(job_name, state, now)
+            states[job_name] = state
+            if state != 'SUCCEEDED' and state in TERMINAL_STATES:
+                ok = False
+            elif state == 'SUCCEEDED' and download:
+                info = service.job_tracker.get_job(job_name, include_manifest=False)
+                if not (info.get('output_file') or info.get('repair_of') or info.get('fanout_group')):
+                    try:
+                        emit('downloaded', **download_job(service, job_name))
+                    except Exception as e:
+                        logger.error(f"Failed to download the result of job '{job_name}': {e}", exc_info=True)
+                        emit('error', job=job_name, error=str(e))
+                        ok = False
+        ok = finish_ready_work(service) and ok
+        # 결과를 내려받으면서 제출된 복구용 배치 작업도 반영될 때까지 지켜봄
+        for job_name in service.job_tracker.list_repair_jobs(unapplied_only=True):
+            if job_name not in states and job_name not in job_names:
+                job_names = [*job_names, job_name]
+                scheduler.track(job_name, 'PENDING', time.monotonic())
+                states[job_name] = 'PENDING'
+
+        now = time.monotonic()
+        wait = scheduler.next_due_in(now)
+        if wait is None:
+            return ok
+        if deadline is not None and now + wait > deadline:
+            emit('timeout', pending=sorted(job_name for job_name in states if job_name in scheduler))
+            return False
+        time.sleep(wait)
+        due = scheduler.due(time.monotonic())
+
+
+def unfinished_tracked_jobs(service):
+    """결과 파일을 아직 쓰지 않은 추적 중인 작업 (합쳐진 분산 제출 그룹의 파트는 제외)."""
+    merged_groups = {group_id for group_id, group in service.job_tracker.list_groups().items() if group.get('merged_output')}
+    return [
+        job_name for job_name, info in service.job_tracker.list_jobs().items()
+        if not info.get('output_file') and info.get('fanout_group') not in merged_groups
+    ]
+
+
+def cmd_submit(service, args):
+    """소스 파일마다 배치 작업을 제출합니다 (GUI의 제출 대기열과 같은 동시 제출, 요청 한도 초과 시 백오프)."""
+    ok = True
+    started = time.perf_counter()
+    for job in service.resume_pending_uploads():
+        emit('resumed', **job_record(service, job))
+
+    job_names = []
+
+    def on_submitted(source_file, jobs):
+        job_names.extend(job.name for job in jobs)
+        if jobs:
+            emit('submitted', source_file=source_file, jobs=[job.name for job in jobs])
+        else:
+            # 빠른 모드이거나 모든 청크가 번역 캐시에 있어 배치 작업 없이 결과 파일을 씀
+            emit('translated', source_file=source_file, output=service._default_output_path(source_file))
+
+    queue = SubmissionQueue(
+        service.create_batch_jobs,
+        queue_file=args.queue_file,
+        max_concurrent=args.concurrency or service.config.get('max_concurrent_submissions', 2),
+        on_submitted=on_submitted,
+    )
+    queue.enqueue([os.path.abspath(path) for path in args.files])
+    queue.start()
+    try:
+        while (counts := queue.counts())[QUEUED] + counts[IN_FLIGHT]:
+            time.sleep(0.2)
+    finally:
+        queue.stop()
+    for entry in queue.entries:
+        if entry['status'] == FAILED:
+            emit('error', source_file=entry['source_file'], error=entry['error'])
+            ok = False
+    elapsed = time.perf_counter() - started
+    emit(
+        'summary', files=len(queue.entries), submitted=len(queue.entries) - counts[FAILED], failed=counts[FAILED],
+        jobs=len(job_names), seconds=round(elapsed, 3), files_per_minute=round(len(queue.entries) / elapsed * 60, 1) if elapsed else None,
+    )
+    if args.watch and job_names:
+        ok = watch_jobs(service, job_names, download=args.download, timeout=args.timeout) and ok
+    return EXIT_OK if ok else EXIT_FAILED
+
+
+def cmd_status(service, args):
+    """작업들의 현재 상태를 한 번 확인합니다. 작업 이름이 없으면 이 컴퓨터에서 추적 중인 모든 작업을 확인합니다."""
+    ok = True
+    for job_name in args.jobs or list(service.job_tracker.list_jobs()):
+        try:
+            job = service.get_batch_job(job_name)
+            service.release_finished_job_resources(job.name, job.state.name)
+            emit('status', **job_record(service, job))
+        except Exception as e:
+            logger.error(f"Failed to get the status of job '{job_name}': {e}", exc_info=True)
+            emit('error', job=job_name, error=str(e))
+            ok = False
+    return EXIT_OK if ok else EXIT_FAILED
+
+
+def cmd_watch(service, args):
+    """작업들이 끝날 때까지 지켜봅니다. 작업 이름이 없으면 결과 파일을 아직 쓰지 않은 추적 중인 모든 작업을 지켜봅니다."""
+    job_names = args.jobs or unfinished_tracked_jobs(service)
+    return EXIT_OK if watch_jobs(service, job_names, download=args.download, timeout=args.timeout) else EXIT_FAILED
+
+
+def cmd_download(service, args):
+    try:
+        emit('downloaded', **download_job(service, args.job, args.output))
+    except Exception as e:
+        logger.error(f"Failed to download the result of job '{args.job}': {e}", exc_info=True)
+        emit('error', job=args.job, error=str(e))
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+def cmd_delete(service, args):
+    ok = True
+    for job_name in args.jobs:
+        try:
+            service.delete_batch_job(job_name)
+            emit('deleted', job=job_name)
+        except Exception as e:
+            logger.error(f"Failed to delete job '{job_name}': {e}", exc_info=True)
+            emit('error', job=job_name, error=str(e))
+            ok = False
+    return EXIT_OK if ok else EXIT_FAILED
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cli', description="Gemini 배치 번역 명령줄 도구 (JSON Lines 출력)")
+    parser.add_argument('--config', default='config.json', help="설정 파일 경로 (기본값: config.json)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="진행 로그(INFO)도 표준 오류에 출력")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit = commands.add_parser('submit', help="소스 파일마다 배치 작업 제출")
+    submit.add_argument('files', nargs='+', help="번역할 텍스트 파일")
+    submit.add_argument('--concurrency', type=int, help="동시에 제출하는 파일 수 (기본값: max_concurrent_submissions)")
+    submit.add_argument('--queue-file', default=CLI_QUEUE_FILE, help=f"제출 대기열 파일 (기본값: {CLI_QUEUE_FILE})")
+    submit.add_argument('--watch', action='store_true', help="제출한 작업이 끝날 때까지 지켜봄")
+    submit.add_argument('--download', action='store_true', help="--watch와 함께: 성공한 작업의 결과를 바로 내려받음")
+    submit.add_argument('--timeout', type=float, help="--watch와 함께: 최대 대기 시간(초)")
+    submit.set_defaults(handler=cmd_submit)
+
+    status = commands.add_parser('status', help="작업 상태 확인")
+    status.add_argument('jobs', nargs='*', help="작업 이름 (없으면 추적 중인 모든 작업)")
+    status.set_defaults(handler=cmd_status)
+
+    watch = commands.add_parser('watch', help="작업이 끝날 때까지 지켜봄")
+    watch.add_argument('jobs', nargs='*', help="작업 이름 (없으면 결과를 아직 쓰지 않은 추적 중인 모든 작업)")
+    watch.add_argument('--download', action='store_true', help="성공한 작업의 결과를 바로 내려받음")
+    watch.add_argument('--timeout', type=float, help="최대 대기 시간(초)")
+    watch.set_defaults(handler=cmd_watch)
+
+    download = commands.add_parser('download', help="성공한 작업의 결과 파일 쓰기")
+    download.add_argument('job', help="작업 이름")
+    download.add_argument('--output', help="결과 파일 경로 (여러 파일 작업은 폴더). 기본값은 소스 파일 옆의 '<이름>_translated.txt'")
+    download.set_defaults(handler=cmd_download)
+
+    delete = commands.add_parser('delete', help="작업 삭제 (API와 작업 추적 정보)")
+    delete.add_argument('jobs', nargs='+', help="작업 이름")
+    delete.set_defaults(handler=cmd_delete)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logger(console_stream=sys.stderr, console_level=logging.INFO if args.verbose else logging.WARNING)
+    service = GeminiApiService(ConfigManager(args.config))
+    try:
+        return args.handler(service, args)
+    except KeyboardInterrupt:
+        emit('interrupted')
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        logger.error(f"Command '{args.command}' failed: {e}", exc_info=True)
+        emit('error', error=str(e))
+        return EXIT_FAILED
+
+
+if __name__ == '__main__':
+    # Ensure UTF-8 encoding for the JSON output
+    if sys.stdout and sys.stdout.encoding != 'utf-8':
+        sys.stdout.reconfigure(encoding='utf-8')
+    if sys.stderr and sys.stderr.encoding != 'utf-8':
+        sys.stderr.reconfigure(encoding='utf-8')
+    sys.exit(main())
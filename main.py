@@ -1,5 +1,11 @@
 import sys
+import time
+
+# 시작 시간 측정 기준 (python main.py --startup-benchmark)
+STARTED_AT = time.perf_counter()
+
 import json
+from PySide6.QtCore import QObject, QEvent, QTimer, QModelIndex
 from PySide6.QtWidgets import QApplication, QFileDialog, QMenu, QMessageBox
 
 
@@ -14,6 +20,46 @@ from model.file_service import FileService
 import logging
 from model.logger import setup_logger
 
+class FirstPaintWatcher(QObject):
+    """위젯이 처음 그려지는 순간 callback을 한 번 호출합니다 (시작 시간 측정용)."""
+
+    def __init__(self, callback):
+        super().__init__()
+        self._callback = callback
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and self._callback:
+            callback, self._callback = self._callback, None
+            callback()
+        return False
+
+
+def run_startup_benchmark(main_window, view_model):
+    """
+    창을 띄운 시점부터 작업 목록이 처음 그려질 때(저장된 마지막 목록)와 API에서 받은 최신 목록이 반영될 때까지의
+    시간을 출력하고 종료합니다. 제출 대기열과 중단된 업로드 재개는 시작하지 않습니다.
+    """
+    app = QApplication.instance()
+
+    def report_first_paint():
+        rows = view_model.jobs_model.rowCount(QModelIndex())
+        print(f"time to first paint : {(time.perf_counter() - STARTED_AT) * 1000:8.1f} ms ({rows} cached jobs shown)")
+
+    def report_fresh_data(succeeded):
+        result = f"{view_model.jobs_model.rowCount(QModelIndex())} jobs" if succeeded else "refresh failed, see app.log"
+        print(f"time to fresh data  : {(time.perf_counter() - STARTED_AT) * 1000:8.1f} ms ({result})")
+        app.quit()
+
+    watcher = FirstPaintWatcher(report_first_paint)
+    main_window.jobs_table_view.viewport().installEventFilter(watcher)
+    view_model.jobs_refreshed.connect(report_fresh_data)
+    main_window.show()
+    # 첫 화면을 그린 뒤에 새로고침 시작
+    QTimer.singleShot(0, view_model.load_jobs)
+    app.exec()
+    view_model.shutdown()
+
+
 def main():
     """Application entry point."""
     setup_logger()
@@ -43,20 +89,40 @@ def main():
     main_window.jobs_table_view.setModel(view_model.jobs_model)
     view_model.status_message_changed.connect(main_window.status_label.setText)
     
-    def handle_loading_change(is_loading):
-        main_window.setDisabled(is_loading)
-        main_window.status_label.setText("처리 중..." if is_loading else view_model.status_message)
-    view_model.is_loading_changed.connect(handle_loading_change)
+    # API 호출은 백그라운드 작업으로 실행되므로 창을 막지 않고 진행 중인 작업 수만 표시
+    def handle_active_tasks_change(count):
+        main_window.tasks_label.setText(f"진행 중인 작업 {count}개" if count else "")
+        main_window.cancel_tasks_button.setEnabled(count > 0)
+    view_model.active_tasks_changed.connect(handle_active_tasks_change)
+    main_window.cancel_tasks_button.clicked.connect(view_model.cancel_tasks)
+    app.aboutToQuit.connect(view_model.shutdown)
 
     # View -> ViewModel (커맨드 바인딩)
     def open_file_dialog():
-        path = main_window.get_selected_file_path()
-        if path:
-            main_window.source_file_path_edit.setText(path)
-            view_model.select_source_file(path)
+        paths = main_window.get_selected_file_paths()
+        if paths:
+            main_window.source_file_path_edit.setText("; ".join(paths))
+            view_model.select_source_files(paths)
             
     main_window.browse_button.clicked.connect(open_file_dialog)
     main_window.add_job_button.clicked.connect(view_model.add_job)
+    main_window.enqueue_button.clicked.connect(view_model.enqueue_selected_files)
+    main_window.files_dropped.connect(view_model.enqueue_files)
+
+    def handle_submission_counts_change(counts):
+        main_window.queue_label.setText(
+            f"대기열: 대기 {counts['queued']} · 진행 {counts['in_flight']} · 제출 {counts['submitted']} · 실패 {counts['failed']}"
+        )
+    view_model.submission_counts_changed.connect(handle_submission_counts_change)
+
+    def handle_next_poll_change(seconds):
+        if seconds < 0:
+            main_window.next_poll_label.setText("진행 중인 작업 없음")
+        else:
+            main_window.next_poll_label.setText(f"다음 상태 확인: {seconds}초 후" if seconds else "상태 확인 중...")
+    view_model.next_poll_changed.connect(handle_next_poll_change)
+    view_model.preview_started.connect(main_window.start_preview)
+    view_model.preview_text_appended.connect(main_window.append_preview_text)
 
     def open_settings_dialog():
         dialog = SettingsDialog(main_window)
@@ -78,9 +144,12 @@ def main():
             if not new_settings.get("gemini_api_key"):
                 new_settings["gemini_api_key"] = config_manager.get("gemini_api_key")
             
-            config_manager.save_config(new_settings)
-            # Re-initialize the API client with the new key if it changed
-            gemini_api_service.__init__(config_manager)
+            # 대화상자에 없는 설정 항목은 기존 값을 유지
+            merged_settings = dict(config_manager.config)
+            merged_settings.update(new_settings)
+            config_manager.save_config(merged_settings)
+            # 새 API 키와 요청 한도는 다음 API 호출부터 적용
+            gemini_api_service.reload_settings()
             view_model.status_message = "설정이 저장되었습니다."
 
     main_window.settings_button.clicked.connect(open_settings_dialog)
@@ -93,25 +162,44 @@ def main():
             
         menu = QMenu()
         download_action = menu.addAction("결과 다운로드")
+        revise_action = menu.addAction("수정본 재번역 (바뀐 부분만)")
+        revise_action.setEnabled(view_model.can_revise_job(row))
         delete_action = menu.addAction("작업 삭제")
         
         action = menu.exec(main_window.jobs_table_view.viewport().mapToGlobal(position))
         
         if action == download_action:
             job = view_model._batch_jobs[row]
-            save_path = main_window.get_save_file_path(job.display_name)
+            if view_model.is_multi_file_job(row):
+                save_path = main_window.get_save_directory()
+            else:
+                save_path = main_window.get_save_file_path(job.display_name)
             if save_path:
                 view_model.download_result(row, save_path)
+        elif action == revise_action:
+            path = main_window.get_revised_file_path(view_model.get_job_source_file(row))
+            if path:
+                view_model.revise_job(row, path)
         elif action == delete_action:
             view_model.delete_job(row)
 
     main_window.jobs_table_view.customContextMenuRequested.connect(show_context_menu)
 
+    if '--startup-benchmark' in sys.argv:
+        run_startup_benchmark(main_window, view_model)
+        return
+
     # 5. 애플리케이션 시작
+    # 작업 목록은 작업 추적 DB에 저장된 마지막 상태로 바로 보여 주고, API 호출(과 google.genai 임포트)은
+    # 창을 처음 그린 뒤 백그라운드에서 시작
     main_window.show()
-    
-    # 초기 작업 목록 로드
-    view_model.load_jobs()
+
+    def start_background_work():
+        # 이전 실행에서 중단된 요청 업로드를 이어서 마친 뒤 초기 작업 목록 로드
+        view_model.resume_pending_uploads()
+        view_model.load_jobs()
+        view_model.start_submission_queue()
+    QTimer.singleShot(0, start_background_work)
     
     sys.exit(app.exec())
 
@@ -0,0 +1,343 @@
+"""
+실패한 청크를 나눠서 다시 번역하는 재시도 엔진입니다.
+
+청크 전체가 실패하면 가운데에서 가장 가까운 줄바꿈/문장 경계(없으면 공백, 그래도 없으면 문자소 경계)에서
+둘로 나눠 각각 다시 시도합니다. 나뉜 두 조각은 동시에 시도하고, 실제 API 호출 수는 엔진 전체에서
+max_concurrency개로 제한합니다. 같은 텍스트 조각의 결과(성공과 실패 모두)는 기억해 두므로
+겹치는 재시도가 같은 조각을 다시 요청하지 않습니다. 최상위 청크마다 전체 제한 시간이 있습니다.
+
+실행 예 (정해진 조각에서 실패하는 가짜 클라이언트로 동작 확인과 이전 순차 재귀와의 시간 비교):
+    python -m model.chunk_retry
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 나눠서 다시 번역해도 실패한 조각 앞에 붙는 표시
+GAVE_UP_MARKER = "[번역 실패: 최소 단위 도달]"
+DEADLINE_MARKER = "[번역 실패: 시간 초과]"
+
+# 나눌 위치 후보 (앞 단계에서 찾지 못하면 다음 단계): 줄바꿈 > 문장 끝 > 공백
+LINE_BOUNDARY = re.compile(r'[^\S\n]*\n\s*')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？…])["\'”’」』)\]]*(\s+)|(?<=[。！？])["”’」』)\]]*()')
+SPACE_BOUNDARY = re.compile(r'\s+')
+
+ZWJ = '\u200d'
+
+
+class DeadlineExceeded(Exception):
+    """청크의 제한 시간 안에 API 호출 차례를 얻지 못함."""
+
+
+def _hangul_class(char):
+    """한글 자모 결합 규칙에 쓰는 문자 종류 (L/V/T/LV/LVT, 해당 없으면 None)."""
+    cp = ord(char)
+    if 0x1100 <= cp <= 0x115F or 0xA960 <= cp <= 0xA97F:
+        return 'L'
+    if 0x1160 <= cp <= 0x11A7 or 0xD7B0 <= cp <= 0xD7C6:
+        return 'V'
+    if 0x11A8 <= cp <= 0x11FF or 0xD7CB <= cp <= 0xD7FB:
+        return 'T'
+    if 0xAC00 <= cp <= 0xD7A3:
+        return 'LV' if (cp - 0xAC00) % 28 == 0 else 'LVT'
+    return None
+
+
+def _is_regional_indicator(char):
+    return 0x1F1E6 <= ord(char) <= 0x1F1FF
+
+
+def is_grapheme_boundary(text, index):
+    """text[index] 앞이 문자소(사용자가 보는 한 글자) 경계인지 확인합니다 (결합 문자, 이모지 시퀀스, 한글 자모)."""
+    if index <= 0 or index >= len(text):
+        return True
+    prev, cur = text[index - 1], text[index]
+    if prev == '\r' and cur == '\n':
+        return False
+    if unicodedata.category(cur) in ('Mn', 'Me', 'Mc'):
+        return False
+    if cur == ZWJ or prev == ZWJ:
+        return False
+    cp = ord(cur)
+    # 이형 선택자, 피부색 수정자, 태그 문자
+    if 0xFE00 <= cp <= 0xFE0F or 0xE0100 <= cp <= 0xE01EF or 0x1F3FB <= cp <= 0x1F3FF or 0xE0020 <= cp <= 0xE007F:
+        return False
+    if _is_regional_indicator(prev) and _is_regional_indicator(cur):
+        # 국기는 지역 표시 문자 두 개가 한 쌍
+        count = 0
+        while index - count - 1 >= 0 and _is_regional_indicator(text[index - count - 1]):
+            count += 1
+        return count % 2 == 0
+    prev_class, cur_class = _hangul_class(prev), _hangul_class(cur)
+    if prev_class == 'L' and cur_class in ('L', 'V', 'LV', 'LVT'):
+        return False
+    if prev_class in ('LV', 'V') and cur_class in ('V', 'T'):
+        return False
+    if prev_class in ('LVT', 'T') and cur_class == 'T':
+        return False
+    return True
+
+
+def split_text(text):
+    """
+    text를 가운데에서 가장 가까운 줄바꿈, 문장 끝, 공백, 문자소 경계 순으로 찾은 위치에서 나눠
+    (앞 조각, 경계의 공백, 뒤 조각)을 반환합니다. 경계는 가운데 절반 구간에서만 찾으며,
+    나눌 수 없으면 None을 반환합니다. 앞 조각 + 공백 + 뒤 조각은 원래 text와 같습니다.
+    """
+    length = len(text)
+    middle = length // 2
+    low, high = length // 4, length - length // 4
+    for pattern in (LINE_BOUNDARY, SENTENCE_BOUNDARY, SPACE_BOUNDARY):
+        best = None
+        for match in pattern.finditer(text, low, high):
+            # 공백 그룹이 있으면 그 공백이 경계, 없으면 매치 전체가 경계
+            group = next((i for i in range(1, (pattern.groups or 0) + 1) if match.group(i) is not None), 0)
+            start, end = match.span(group)
+            head, tail = text[:start], text[end:]
+            if not head.strip() or not tail.strip():
+                continue
+            if best is None or abs(start - middle) < abs(best[0] - middle):
+                best = (start, end)
+        if best:
+            return text[:best[0]], text[best[0]:best[1]], text[best[1]:]
+    for offset in range(0, middle):
+        for index in (middle - offset, middle + offset):
+            if 0 < index < length and is_grapheme_boundary(text, index):
+                return text[:index], "", text[index:]
+    return None
+
+
+class RetryResult:
+    """청크 하나의 재시도 결과: 번역(실패한 조각은 표시와 원문), 끝내 실패한 조각 수."""
+
+    def __init__(self, text, failed_pieces):
+        self.text = text
+        self.failed_pieces = failed_pieces
+
+    @property
+    def succeeded(self):
+        return self.failed_pieces == 0
+
+
+class ChunkRetryEngine:
+    """
+    translate(text) -> 번역 함수로 실패한 청크를 나눠서 다시 번역합니다. translate는 실패하면 예외를 던집니다.
+    max_concurrency: 엔진 전체에서 동시에 진행하는 translate 호출 수.
+    min_length: 이보다 짧은 (공백 제외) 조각은 더 나누지 않고 실패로 남깁니다.
+    deadline_seconds: 최상위 청크 하나에 쓰는 최대 시간. 넘으면 남은 조각은 시간 초과 표시로 남깁니다.
+    """
+
+    def __init__(self, translate, max_concurrency=4, min_length=50, deadline_seconds=600, clock=time.monotonic):
+        self._translate = translate
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.min_length = min_length
+        self.deadline_seconds = deadline_seconds
+        self.clock = clock
+        # 텍스트 조각 -> 결과 Future (성공한 번역 또는 실패 예외). 진행 중인 같은 조각은 그 결과를 기다림
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.memo_hits = 0
+
+    def retry(self, text):
+        """청크 하나를 다시 번역해 RetryResult를 반환합니다."""
+        translated, failed = self._solve(text, self.clock() + self.deadline_seconds)
+        return RetryResult(translated, failed)
+
+    def retry_many(self, texts):
+        """{키: 청크 텍스트}를 모두 동시에 다시 번역해 {키: RetryResult}를 반환합니다 (호출 수는 max_concurrency로 제한)."""
+        if not texts:
+            return {}
+        # 작업 스레드는 호출 차례를 기다리기만 하므로 청크 수만큼 만들어도 API 동시 호출 수는 늘지 않음
+        with ThreadPoolExecutor(max_workers=min(len(texts), 64), thread_name_prefix="chunk-retry") as pool:
+            futures = {key: pool.submit(self.retry, text) for key, text in texts.items()}
+            return {key: future.result() for key, future in futures.items()}
+
+    def _attempt(self, text, deadline):
+        """조각 하나를 번역합니다. 같은 조각의 이전(또는 진행 중인) 결과가 있으면 그것을 씁니다."""
+        with self._lock:
+            future = self._memo.get(text)
+            owner = future is None
+            if owner:
+                future = self._memo[text] = Future()
+            else:
+                self.memo_hits += 1
+        if not owner:
+            try:
+                return future.result(timeout=max(0, deadline - self.clock()))
+            except FutureTimeoutError:
+                raise DeadlineExceeded() from None
+
+        remaining = deadline - self.clock()
+        if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+            # 시간 초과는 이 청크의 사정이므로 기억하지 않음 (다른 청크의 같은 조각은 다시 시도할 수 있음)
+            with self._lock:
+                del self._memo[text]
+            future.set_exception(DeadlineExceeded())
+            raise DeadlineExceeded()
+        try:
+            with self._lock:
+                self.calls += 1
+            translated = self._translate(text)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._slots.release()
+        future.set_result(translated)
+        return translated
+
+    def _solve(self, text, deadline):
+        """(번역, 끝내 실패한 조각 수)를 반환합니다. 실패하면 나눠서 두 조각을 동시에 시도합니다."""
+        try:
+            return self._attempt(text, deadline), 0
+        except DeadlineExceeded:
+            logger.warning(f"Retry deadline reached, leaving a piece untranslated: '{text[:30]}...'")
+            return f"{DEADLINE_MARKER} {text}", 1
+        except Exception as e:
+            error = e
+
+        if self.clock() >= deadline:
+            logger.warning(f"Retry deadline reached after a failure, leaving a piece untranslated: '{text[:30]}...' ({error})")
+            return f"{DEADLINE_MARKER} {text}", 1
+        parts = split_text(text) if len(text.strip()) >= self.min_length else None
+        if parts is None:
+            logger.error(f"Chunk is too short to split further and failed: '{text}' ({error})")
+            return f"{GAVE_UP_MARKER} {text}", 1
+        head, separator, tail = parts
+        logger.warning(f"Sub-chunk failed, splitting into {len(head)} + {len(tail)} chars. Error: {error}. Text: '{text[:30]}...'")
+
+        # 앞 조각은 새 스레드에서, 뒤 조각은 이 스레드에서 동시에 시도
+        head_result = {}
+        head_thread = threading.Thread(
+            target=lambda: head_result.update(value=self._solve(head, deadline)), name="chunk-retry-half", daemon=True
+        )
+        head_thread.start()
+        tail_translated, tail_failed = self._solve(tail, deadline)
+        head_thread.join()
+        head_translated, head_failed = head_result['value']
+        return head_translated + separator + tail_translated, head_failed + tail_failed
+
+
+if __name__ == '__main__':
+    # 가짜 클라이언트: 'BLOCK'이 든 조각은 길이가 120자를 넘으면 실패하고, 'FLAKY'가 든 500자 넘는 조각은 처음 한 번만 실패합니다.
+    # 호출마다 0.05초가 걸립니다. 이전 구현(가운데 글자 위치에서 자르고 두 조각을 차례로 재귀)과 비교합니다.
+    import random
+    import sys
+
+    CALL_SECONDS = 0.05
+    logging.basicConfig(level=logging.CRITICAL)
+
+    class ScriptedTranslator:
+        def __init__(self):
+            self.calls = []
+            self.flaky_seen = set()
+            self.active = 0
+            self.peak = 0
+            self._lock = threading.Lock()
+
+        def __call__(self, text):
+            with self._lock:
+                self.calls.append(text)
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            try:
+                time.sleep(CALL_SECONDS)
+                if 'BLOCK' in text and len(text) > 120:
+                    raise ValueError("blocked (SAFETY)")
+                if 'FLAKY' in text and len(text) > 500:
+                    with self._lock:
+                        first = text not in self.flaky_seen
+                        self.flaky_seen.add(text)
+                    if first:
+                        raise ValueError("transient error")
+                return text.upper()
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+    def old_retry(translate, text):
+        """이전 구현: len // 2에서 자르고 앞 조각의 재귀가 모두 끝난 뒤 뒤 조각을 시도."""
+        if len(text) < 50:
+            return f"{GAVE_UP_MARKER} {text}"
+        try:
+            return translate(text)
+        except Exception:
+            mid = len(text) // 2
+            return old_retry(translate, text[:mid]) + old_retry(translate, text[mid:])
+
+    sentences = [f"Sentence {i} walks quietly through the rain." for i in range(40)]
+    sentences[7] = sentences[7].replace("walks", "BLOCK walks")
+    sentences[29] = sentences[29].replace("walks", "BLOCK walks")
+    sentences[18] = sentences[18].replace("walks", "FLAKY walks")
+    chunk = " ".join(sentences[:20]) + "\n" + " ".join(sentences[20:])
+    chunks = {1: chunk, 2: chunk.replace("rain", "snow"), 3: chunk}
+
+    print(f"{len(chunks)} failed chunks of {len(chunk)} chars, {CALL_SECONDS * 1000:.0f} ms per call")
+    print(f"{'':24}{'wall s':>8}{'calls':>7}{'peak':>6}{'memo':>6}{'cut mid-sentence':>18}")
+
+    translator = ScriptedTranslator()
+    started = time.perf_counter()
+    old_results = {key: old_retry(translator, text) for key, text in chunks.items()}
+    old_seconds = time.perf_counter() - started
+    cut = sum(1 for text in translator.calls if not re.search(r'[.!?]$', text.rstrip()))
+    print(f"{'sequential (before)':24}{old_seconds:8.2f}{len(translator.calls):7}{translator.peak:6}{'-':>6}{cut:18}")
+
+    translator = ScriptedTranslator()
+    max_concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    engine = ChunkRetryEngine(translator, max_concurrency=max_concurrency)
+    started = time.perf_counter()
+    results = engine.retry_many(chunks)
+    new_seconds = time.perf_counter() - started
+    cut = sum(1 for text in translator.calls if not re.search(r'[.!?]$', text.rstrip()))
+    print(f"{'concurrent + memo':24}{new_seconds:8.2f}{engine.calls:7}{translator.peak:6}{engine.memo_hits:6}{cut:18}")
+
+    # 확인: 실패 조각 없이 원문 경계(공백/줄바꿈)를 그대로 유지해 다시 합쳐짐
+    for key, text in chunks.items():
+        assert results[key].succeeded, results[key].text
+        assert results[key].text == text.upper(), key
+    assert translator.peak <= max_concurrency
+    assert cut == 0
+    # 같은 청크(1번과 3번)의 조각은 다시 호출하지 않고 재사용
+    assert engine.memo_hits > 0
+
+    # 끝내 실패하는 문장은 그 문장만 실패 표시로 남고, 나머지 조각은 번역되어 원래 순서대로 합쳐짐
+    def reject_poison(text):
+        if 'POISON' in text:
+            raise ValueError("blocked (SAFETY)")
+        return text.upper()
+
+    poisoned = " ".join(f"Sentence {i} is fine." if i != 13 else "POISON." for i in range(30))
+    partial = ChunkRetryEngine(reject_poison, max_concurrency=2, min_length=20).retry(poisoned)
+    assert partial.failed_pieces == 1 and not partial.succeeded
+    assert partial.text == poisoned.upper().replace("POISON.", f"{GAVE_UP_MARKER} POISON.")
+
+    # 문자소 경계: 결합 문자, 이모지 시퀀스, 국기, 한글 자모를 자르지 않음
+    for sample in ("é" * 40, "👩‍👩‍👧" * 20, "🇰🇷🇯🇵" * 20, "각" * 30):
+        head, separator, tail = split_text(sample)
+        assert unicodedata.normalize('NFC', head + tail) == unicodedata.normalize('NFC', sample)
+        assert is_grapheme_boundary(sample, len(head)), sample
+
+    # 분할 동치: 어떤 텍스트든 앞 조각 + 경계 + 뒤 조각이 원문과 같고, 나눈 위치가 문자소 경계
+    rng = random.Random(21)
+    alphabet = ["a", "b", " ", "\n", ".", "!", "。", "e\u0301", "👩‍👩‍👧", "🇰🇷", "\u1100\u1161", "각", "\t"]
+    for _ in range(2000):
+        sample = "".join(rng.choice(alphabet) for _ in range(rng.randint(2, 80)))
+        parts = split_text(sample)
+        if parts is None:
+            continue
+        head, separator, tail = parts
+        assert head + separator + tail == sample, repr(sample)
+        assert head and tail, repr(sample)
+        assert is_grapheme_boundary(sample, len(head)) and is_grapheme_boundary(sample, len(head) + len(separator)), repr(sample)
+
+    # 제한 시간: 호출 차례를 얻지 못한 조각은 시간 초과 표시로 남음
+    slow = ChunkRetryEngine(lambda text: time.sleep(0.2) or text, max_concurrency=1, deadline_seconds=0.3)
+    timed = slow.retry_many({i: f"piece {i} of text" for i in range(4)})
+    assert any(result.text.startswith(DEADLINE_MARKER) for result in timed.values())
+    print(f"speed-up {old_seconds / new_seconds:.1f}x; outputs, memoization, partial failure, split equivalence and deadline checks passed")
@@ -22,6 +22,41 @@ class ConfigManager:
             "temperature": 1.8,
             "top_p": 0.95,
             "chunk_size": 5000,
+            "chunking_mode": "chars",
+            "chunk_token_budget": 2000,
+            "token_estimator_calibration": True,
+            "translation_cache_enabled": True,
+            "translation_cache_max_mb": 512,
+            "multi_file_max_request_mb": 1024,
+            "revision_snapshots_enabled": True,
+            "context_cache_enabled": False,
+            "context_cache_ttl_hours": 48,
+            "request_staging_memory_mb": 64,
+            "keep_request_files": False,
+            "resumable_upload_enabled": True,
+            "upload_chunk_mb": 8,
+            "requests_per_minute": 60,
+            "upload_mb_per_minute": 0,
+            "max_concurrent_submissions": 2,
+            "fanout_jobs": 1,
+            "fanout_target_minutes": 0,
+            "fanout_chunks_per_minute": 300,
+            "fanout_max_jobs": 8,
+            "poll_min_seconds": 15,
+            "poll_max_seconds": 600,
+            "poll_backoff": 1.5,
+            "job_list_page_size": 50,
+            "express_max_chunks": 20,
+            "express_concurrency": 8,
+            "express_max_attempts": 4,
+            "express_backoff_seconds": 2.0,
+            "preview_chunks": 3,
+            "inline_batch_max_mb": 2,
+            "repair_enabled": True,
+            "repair_sync_max_chunks": 20,
+            "repair_concurrency": 4,
+            "repair_min_chunk_chars": 50,
+            "repair_deadline_seconds": 600,
             "thinking_budget": 128,
             "prefill_cached_history": [
                 {
@@ -0,0 +1,100 @@
+"""
+작은 파일을 배치 작업 없이 바로 번역하는 빠른(express) 모드의 요청 풀입니다.
+
+배치 작업은 시작까지 몇 시간이 걸리기도 하므로, 청크 수가 적은 파일은 청크마다 비동기
+generate_content 호출을 보내 몇 초 안에 끝냅니다. 동시에 진행하는 요청 수는 concurrency로 제한하고,
+일시적인 오류(요청 한도 초과, 서버 오류, 연결 끊김)는 지수 백오프(지터 포함)로 다시 시도합니다.
+차단되거나 빈 응답은 다시 보내도 같은 결과이므로 재시도하지 않고 실패로 돌려주며,
+호출하는 쪽(GeminiApiService)이 복구 단계에서 나눠서 다시 번역합니다.
+
+실행 예 (요청마다 지연과 일시적 오류가 있는 로컬 클라이언트로 동시 요청 수별 소요 시간 측정):
+    python -m model.express [청크 수]
+"""
+import asyncio
+import logging
+import random
+import sys
+
+from .result_repair import BlockedResponseError
+from .submission_queue import is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+# 다시 보내면 성공할 수 있는 서버 쪽 상태 (요청 한도 초과는 is_rate_limit_error로 판별)
+TRANSIENT_STATUSES = ('UNAVAILABLE', 'INTERNAL', 'DEADLINE_EXCEEDED')
+
+
+def is_transient_error(error):
+    """
+    다시 시도할 만한 일시적 오류(요청 한도 초과, 5xx 서버 오류, 연결 끊김/시간 초과)인지 판별합니다.
+    잘못된 요청(4xx), 인증 오류, 코드 오류 등은 다시 보내도 같은 결과이므로 False입니다.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    # httpx 연결 오류 (SDK가 httpx를 불러왔을 때만 생길 수 있으므로 여기서 불러오지 않음)
+    httpx = sys.modules.get('httpx')
+    if httpx and isinstance(error, httpx.TransportError):
+        return True
+    code = getattr(error, 'code', None)
+    if isinstance(code, int) and 500 <= code < 600:
+        return True
+    return getattr(error, 'status', None) in TRANSIENT_STATUSES or is_rate_limit_error(error)
+
+
+async def translate_chunks(chunks, generate, concurrency=8, max_attempts=4, backoff_seconds=2.0, max_backoff_seconds=60.0):
+    """
+    {키: 청크 텍스트}를 generate(텍스트) 코루틴으로 번역합니다. 동시에 진행하는 호출은 concurrency개까지입니다.
+    {키: (번역 또는 None, 오류 또는 None, 시도 횟수)}를 반환합니다.
+    일시적 오류(is_transient_error)만 max_attempts번까지 지수 백오프로 다시 시도하고,
+    BlockedResponseError와 그 밖의 오류는 바로 실패로 처리합니다.
+    """
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(key, text):
+        for attempt in range(1, max_attempts + 1):
+            async with slots:
+                try:
+                    return key, (await generate(text), None, attempt)
+                except BlockedResponseError as e:
+                    return key, (None, e, attempt)
+                except Exception as e:
+                    if not is_transient_error(e):
+                        logger.warning(f"Express request for chunk {key} failed with a non-retryable error: {e}")
+                        return key, (None, e, attempt)
+                    error = e
+            if attempt < max_attempts:
+                # 재시도 대기 중에는 자리를 비워 다른 청크가 진행되도록 함
+                delay = min(max_backoff_seconds, backoff_seconds * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                logger.warning(f"Express request for chunk {key} failed (attempt {attempt}/{max_attempts}), retrying in {delay:.1f}s: {error}")
+                await asyncio.sleep(delay)
+        return key, (None, error, max_attempts)
+
+    return dict(await asyncio.gather(*(run(key, text) for key, text in chunks.items())))
+
+
+if __name__ == '__main__':
+    # 요청 하나에 0.3~1.5초가 걸리고 10%는 일시적 오류(429)를 내는 가짜 비동기 호출로,
+    # 동시 요청 수별로 짧은 소설(청크 N개) 전체를 번역하는 데 걸리는 시간을 잽니다.
+    import sys
+    import time
+
+    logging.basicConfig(level=logging.ERROR)
+    chunk_count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    chunks = {i: f"chunk {i} text" for i in range(1, chunk_count + 1)}
+
+    async def fake_generate(text):
+        await asyncio.sleep(random.uniform(0.3, 1.5))
+        if random.random() < 0.1:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        return text.upper()
+
+    print(f"{chunk_count} chunks, 0.3-1.5 s per request, 10% transient errors (backoff 0.5 s)")
+    print(f"{'concurrency':>12}{'seconds':>9}{'failed':>8}")
+    for concurrency in (1, 4, 8, 16):
+        random.seed(7)
+        started = time.perf_counter()
+        results = asyncio.run(translate_chunks(chunks, fake_generate, concurrency=concurrency, backoff_seconds=0.5))
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for text, _, _ in results.values() if text is None)
+        assert all(text == chunks[key].upper() for key, (text, _, _) in results.items() if text is not None)
+        print(f"{concurrency:12}{elapsed:9.2f}{failed:8}")
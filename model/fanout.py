@@ -0,0 +1,97 @@
+"""
+소스 파일 하나를 여러 배치 작업으로 나눠 제출(분산 제출)할 때의 파트 수와 파트별 청크 수를 정합니다.
+
+배치 작업은 한 단위로 끝나므로, 큰 책을 작업 하나로 제출하면 느린 작업 하나가 책 전체를 붙잡습니다.
+청크를 순서대로 N개 파트로 나눠 각각 작업으로 제출하면 파트들이 병렬로 처리되고,
+모든 파트가 SUCCEEDED가 되는 즉시 결과를 합칩니다 (청크 번호는 파트와 관계없이 전체 순서를 따름).
+
+실행 예 (임의 지연이 있는 로컬 클라이언트로 N별 완료 시간 분포 측정):
+    python -m model.fanout [시행 횟수] [소스 크기_MB]
+"""
+import math
+
+
+def plan_shard_sizes(chunk_count, shard_count):
+    """chunk_count개의 청크를 shard_count개 파트에 순서대로 고르게 나눈 파트별 청크 수 목록을 반환합니다."""
+    shard_count = max(1, min(shard_count, chunk_count))
+    base, extra = divmod(chunk_count, shard_count)
+    return [base + (1 if i < extra else 0) for i in range(shard_count)]
+
+
+def choose_shard_count(chunk_count, fixed_jobs=1, target_minutes=0, chunks_per_minute=300, max_jobs=8):
+    """
+    분산 제출할 파트 수를 정합니다.
+    fixed_jobs: 청크 수로 나눌 고정 파트 수.
+    target_minutes: 0보다 크면 작업 하나가 처리하는 속도(chunks_per_minute)로 추정한 처리 시간이
+    이 값 이하가 되도록 파트 수를 늘립니다. 결과는 max_jobs와 청크 수를 넘지 않습니다.
+    """
+    shard_count = max(1, fixed_jobs)
+    if target_minutes > 0 and chunks_per_minute > 0:
+        shard_count = max(shard_count, math.ceil(chunk_count / (target_minutes * chunks_per_minute)))
+    return max(1, min(shard_count, max_jobs, chunk_count))
+
+
+if __name__ == '__main__':
+    # 작업 대기 시간(로그정규 분포)과 요청 수에 비례하는 처리 시간을 갖는 로컬 클라이언트로
+    # 제출 -> 1분 간격 폴링 -> 병합까지의 전체 시간을 N별로 측정합니다.
+    # 작업 시간은 모의 시계(분 단위)로 흐르므로 로컬에서 요청을 만드는 시간은 포함되지 않습니다.
+    import logging
+    import os
+    import random
+    import statistics
+    import sys
+    import tempfile
+    from .config_manager import ConfigManager
+    from .gemini_api_service import GeminiApiService
+    from .local_client import LocalGenaiClient
+
+    QUEUE_MEDIAN_MINUTES = 10
+    QUEUE_SIGMA = 0.6
+    REQUESTS_PER_MINUTE = 10
+
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+    logging.basicConfig(level=logging.WARNING)
+    random.seed(12)
+    os.chdir(tempfile.mkdtemp())
+    source_path = os.path.abspath('novel.txt')
+    with open(source_path, 'w', encoding='utf-8') as f:
+        line = "The rain had not stopped for three days, and the village was quiet.\n"
+        f.write(line * int(size_mb * 1024 * 1024 / len(line)))
+
+    def job_latency(request_count):
+        queue_minutes = QUEUE_MEDIAN_MINUTES * random.lognormvariate(0, QUEUE_SIGMA)
+        return queue_minutes + request_count / REQUESTS_PER_MINUTE
+
+    config_manager = ConfigManager('config.json')
+    config_manager.config.update(
+        gemini_api_key='local', translation_cache_enabled=False, revision_snapshots_enabled=False,
+        resumable_upload_enabled=False, requests_per_minute=0, fanout_max_jobs=64,
+    )
+
+    print(f"{'N':>3} {'p50':>8} {'p90':>8} {'max':>8}  (simulated minutes, {trials} trials, {size_mb:g} MB source)")
+    for shard_count in (1, 2, 4, 8, 16):
+        config_manager.config['fanout_jobs'] = shard_count
+        durations = []
+        for trial in range(trials):
+            now = [0.0]
+            service = GeminiApiService(config_manager)
+            service.client = LocalGenaiClient(job_latency=job_latency, clock=lambda: now[0])
+            jobs = service.create_batch_jobs(source_path)
+            while True:
+                for job in service.list_batch_jobs():
+                    service.release_finished_job_resources(job.name, job.state.name)
+                if shard_count == 1:
+                    if service.client.batches.get(jobs[0].name).state.name.endswith('SUCCEEDED'):
+                        service.download_and_process_results(service.client.batches.get(jobs[0].name), 'out.txt')
+                        break
+                elif service.ready_fanout_groups():
+                    service.merge_fanout_group(service.ready_fanout_groups()[0], 'out.txt')
+                    break
+                now[0] += 1
+            durations.append(now[0])
+            for job in jobs:
+                service.delete_batch_job(job.name)
+        durations.sort()
+        p90 = durations[min(len(durations) - 1, int(len(durations) * 0.9))]
+        print(f"{shard_count:>3} {statistics.median(durations):8.1f} {p90:8.1f} {durations[-1]:8.1f}")
@@ -2,53 +2,210 @@ import json
 import os
 import logging
 import urllib.request
-import re
-from google import genai
-from google.genai import types
+import gzip
+import contextlib
+import itertools
+import tempfile
+import threading
+import uuid
 
 from .job_tracker import JobTracker
+from .token_estimator import TokenEstimator
+from .translation_cache import TranslationCache
+from .revision_planner import plan_revision, iter_chunk_texts
+from .request_template import RequestLineTemplate
+from .request_staging import RequestStaging
+from .resumable_upload import ResumableUpload, UploadInterruptedError, UPLOAD_URL
+from .rate_limiter import TokenBucket
+from .fanout import plan_shard_sizes, choose_shard_count
+from .poll_scheduler import TERMINAL_STATES as TERMINAL_JOB_STATES
+from .result_stream import DOWNLOAD_URL, StitchedOutputWriter, download_file, iter_result_lines, iter_results
+from .chunk_retry import ChunkRetryEngine
+from .result_repair import (
+    BlockedResponseError, RepairReport, failure_reason, patch_output, repair_report_path, span_digest,
+    REPAIRED, PARTIAL, PENDING, FAILED, SKIPPED,
+)
 
 logger = logging.getLogger(__name__)
 
+# 소스 파일을 스트리밍으로 읽을 때 사용하는 블록 크기 (문자 수)
+READ_BLOCK_SIZE = 1024 * 1024
+# str.splitlines()가 줄 경계로 인식하는 문자들
+LINE_BREAK_CHARS = frozenset('\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029')
+# 토큰 모드에서 아직 끝나지 않은 긴 줄을 미리 잘라낼 때의 토큰당 글자 수 상한
+TOKEN_MODE_CHARS_PER_TOKEN = 8
+# 수정본 재번역을 위해 작업별 원문 스냅샷을 저장하는 폴더
+SNAPSHOT_DIR = 'job_snapshots'
+
+# 결과를 처리하면서 번역 캐시에 한 번에 저장할 청크 수
+CACHE_WRITE_BATCH = 256
+
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
+
+
+def normalize_job_state(state_name):
+    """'JOB_STATE_SUCCEEDED', 'BATCH_STATE_RUNNING' 같은 상태 이름에서 접두사를 뗍니다."""
+    for prefix in ('JOB_STATE_', 'BATCH_STATE_'):
+        if state_name.startswith(prefix):
+            return state_name[len(prefix):]
+    return state_name
+
+
+def _response_dict(obj):
+    """SDK 응답/오류 객체(pydantic 모델)를 결과 JSONL 라인과 같은 형태의 dict로 바꿉니다."""
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(mode='json', exclude_none=True)
+    return obj
+
+
+def _call_config(request):
+    """배치 요청 객체의 프롬프트, 생성 설정과 안전 설정을 SDK 호출의 config 인자 하나로 모읍니다."""
+    config = {name: request[name] for name in ('system_instruction', 'cached_content', 'safety_settings') if name in request}
+    config.update(request.get('generation_config', {}))
+    return config
+
+
+def _job_status(job):
+    """API 작업 객체에서 작업 목록에 보여 줄 상태 정보를 뽑아 JobTracker.record_job_statuses 형식으로 반환합니다."""
+    create_time = getattr(job, 'create_time', None)
+    update_time = getattr(job, 'update_time', None)
+    return {
+        'job_name': job.name,
+        'display_name': getattr(job, 'display_name', None),
+        'state': job.state.name,
+        'create_time': create_time.isoformat() if create_time else None,
+        'update_time': update_time.isoformat() if update_time else None,
+    }
+
+
 class GeminiApiService:
     def __init__(self, config_manager):
         self.config = config_manager
-        self.client = None
+        self._client = None
+        self._client_lock = threading.Lock()
+        # API 키로 만든 SDK 클라이언트이면 결과 파일을 HTTP로 직접 스트리밍해 내려받음
+        self._client_from_api_key = False
         self.job_tracker = JobTracker()
-        api_key = self.config.get('gemini_api_key')
-        if api_key and api_key != "YOUR_GEMINI_API_KEY":
-            self.client = genai.Client(api_key=api_key)
+        self._translation_cache = None
+        self._translation_cache_lock = threading.Lock()
+        self.reload_settings()
+
+    def reload_settings(self):
+        """설정 변경을 반영합니다. 요청 한도를 다시 만들고, API 클라이언트는 다음 사용 시 새 API 키로 만듭니다."""
+        # 업로드/작업 생성 요청 수와 업로드 바이트 수의 분당 한도 (0이면 제한 없음)
+        self.request_limiter = TokenBucket(self.config.get('requests_per_minute', 60))
+        self.upload_limiter = TokenBucket(self.config.get('upload_mb_per_minute', 0) * 1024 * 1024)
+        with self._client_lock:
+            self._client = None
+            self._client_from_api_key = False
 
-    def _split_text_into_chunks(self, text, max_chunk_size):
+    @property
+    def client(self):
         """
-        줄바꿈을 존중하면서 텍스트를 지정된 최대 크기의 청크로 분할합니다.
+        genai.Client를 처음 사용할 때 만듭니다. google.genai 임포트와 클라이언트 생성이 느리므로
+        창을 띄우기 전에 하지 않고 처음 API를 호출하는 작업 스레드에서 합니다. API 키가 없으면 None입니다.
+        """
+        if self._client is None:
+            with self._client_lock:
+                api_key = self.config.get('gemini_api_key')
+                if self._client is None and api_key and api_key != "YOUR_GEMINI_API_KEY":
+                    from google import genai
+                    self._client = genai.Client(api_key=api_key)
+                    self._client_from_api_key = True
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+        self._client_from_api_key = False
+
+    def _iter_file_blocks(self, source_file, block_size=READ_BLOCK_SIZE):
+        """소스 파일을 고정 크기 블록 단위로 읽어 반환합니다 (전체 파일을 메모리에 올리지 않음)."""
+        with open(source_file, 'r', encoding='utf-8') as f_in:
+            while True:
+                block = f_in.read(block_size)
+                if not block:
+                    return
+                yield block
+
+    def _iter_lines(self, blocks, max_piece_size):
+        """
+        텍스트 블록 스트림을 str.splitlines(keepends=True)와 동일한 규칙으로 줄 단위로 나눕니다.
+        (segment, line_done) 튜플을 반환하며, 아직 끝나지 않은 줄이 max_piece_size를 넘으면
+        줄의 시작부터 max_piece_size 단위로 잘라 line_done=False로 먼저 내보냅니다.
+        """
+        pending = ""
+        for block in blocks:
+            lines = (pending + block).splitlines(keepends=True)
+            pending = lines.pop() if lines else ""
+            # 마지막 줄이 줄바꿈으로 끝나더라도 '\r'이면 다음 블록의 '\n'과 이어질 수 있으므로 보류
+            if pending and pending[-1] in LINE_BREAK_CHARS and pending[-1] != '\r':
+                lines.append(pending)
+                pending = ""
+            for line in lines:
+                yield line, True
+            while len(pending) > max_piece_size:
+                yield pending[:max_piece_size], False
+                pending = pending[max_piece_size:]
+        if pending:
+            yield pending, True
+
+    def _split_long_line(self, line, max_size, measure):
+        """한 줄을 measure 기준 max_size 이하의 조각들로 강제 분할합니다."""
+        if measure is len:
+            for i in range(0, len(line), max_size):
+                yield line[i:i + max_size]
+            return
+
+        start = 0
+        while start < len(line):
+            rest = line[start:]
+            rest_size = measure(rest)
+            if rest_size <= max_size:
+                yield rest
+                return
+            # 남은 부분의 평균 밀도로 조각 길이를 추정한 뒤, 예산을 넘으면 줄여 나감
+            take = max(1, len(rest) * max_size // rest_size)
+            while take > 1 and measure(rest[:take]) > max_size:
+                take = take * 3 // 4
+            yield rest[:take]
+            start += take
+
+    def _iter_text_chunks(self, blocks, max_chunk_size, measure=len, max_piece_size=None):
+        """
+        줄바꿈을 존중하면서 텍스트 블록 스트림을 지정된 최대 크기의 청크로 분할합니다.
         한 줄이 최대 크기를 초과하면 강제로 분할합니다.
+        크기는 measure 함수로 측정하며 (기본값: 글자 수), 토큰 추정 함수를 넘기면 토큰 예산 기준으로 묶습니다.
+        메모리 사용량은 파일 크기가 아닌 max_chunk_size에 비례합니다.
         """
-        chunks = []
         current_chunk_lines = []
         current_chunk_size = 0
-        
-        lines = text.splitlines(keepends=True)
+        in_long_line = False
 
-        for line in lines:
-            line_len = len(line)
+        for line, line_done in self._iter_lines(blocks, max_piece_size or max_chunk_size):
+            line_len = measure(line)
 
             # 한 줄이 max_chunk_size보다 큰 경우 강제 분할
-            if line_len > max_chunk_size:
+            if in_long_line or not line_done or line_len > max_chunk_size:
                 # 현재까지의 청크를 먼저 추가
                 if current_chunk_lines:
-                    chunks.append("".join(current_chunk_lines))
+                    yield "".join(current_chunk_lines)
                     current_chunk_lines = []
                     current_chunk_size = 0
-                
+
                 # 긴 라인을 max_chunk_size에 맞춰 분할
-                for i in range(0, line_len, max_chunk_size):
-                    chunks.append(line[i:i + max_chunk_size])
+                yield from self._split_long_line(line, max_chunk_size, measure)
+                in_long_line = not line_done
                 continue
 
             # 이 줄을 추가하면 청크가 너무 커지는 경우, 현재 청크를 완료하고 새 청크 시작
             if current_chunk_size + line_len > max_chunk_size and current_chunk_lines:
-                chunks.append("".join(current_chunk_lines))
+                yield "".join(current_chunk_lines)
                 current_chunk_lines = [line]
                 current_chunk_size = line_len
             # 그렇지 않으면 현재 청크에 줄 추가
@@ -58,200 +215,1521 @@ class GeminiApiService:
 
         # 마지막 남은 청크 추가
         if current_chunk_lines:
-            chunks.append("".join(current_chunk_lines))
-            
-        return chunks
-
-    def _prepare_requests(self, source_file, model_id):
-        """ConfigManager의 설정을 사용하여 요청 파일을 생성합니다."""
-        requests_file = "temp_requests.jsonl"
-
-        system_instruction = {"parts": [{"text": self.config.get('system_instruction')}]}
-        prefill = self.config.get('prefill_cached_history', [])
-        generation_config = {
-            'temperature': self.config.get('temperature', 1.0),
-            'top_p': self.config.get('top_p', 0.95),
-            'thinkingConfig': {'thinking_budget': self.config.get('thinking_budget', 128) },
+            yield "".join(current_chunk_lines)
+
+    def _split_text_into_chunks(self, text, max_chunk_size, mode='chars', model_id=None):
+        """
+        줄바꿈을 존중하면서 텍스트를 지정된 최대 크기의 청크로 분할합니다.
+        한 줄이 최대 크기를 초과하면 강제로 분할합니다.
+        mode='tokens'이면 max_chunk_size를 토큰 예산으로 보고 추정 토큰 수 기준으로 줄을 묶습니다.
+        """
+        return list(self._iter_text_chunks([text], max_chunk_size, **self._chunk_measure_options(mode, max_chunk_size, model_id)))
+
+    def _chunk_measure_options(self, mode, max_chunk_size, model_id):
+        """청크 분할 모드에 맞는 크기 측정 옵션을 반환합니다."""
+        if mode != 'tokens':
+            return {}
+        estimator = TokenEstimator.for_model(model_id or self.config.get('model_name', 'gemini-2.5-flash'))
+        # 토큰 모드에서도 한 줄을 메모리에 무한정 쌓지 않도록 글자 수 상한을 둠
+        return {'measure': estimator.estimate, 'max_piece_size': max_chunk_size * TOKEN_MODE_CHARS_PER_TOKEN}
+
+    def _iter_source_chunks(self, source_file, model_id=None):
+        """설정된 분할 모드에 따라 소스 파일을 스트리밍으로 읽으며 청크를 하나씩 반환합니다."""
+        mode, max_size = self._chunking_settings()
+        return self._iter_text_chunks(
+            self._iter_file_blocks(source_file), max_size,
+            **self._chunk_measure_options(mode, max_size, model_id)
+        )
+
+    def _chunking_settings(self):
+        """(분할 모드, 청크 최대 크기)를 반환합니다. 토큰 모드의 크기 단위는 토큰입니다."""
+        if self.config.get('chunking_mode', 'chars') == 'tokens':
+            return 'tokens', self.config.get('chunk_token_budget', 2000)
+        return 'chars', self.config.get('chunk_size', 6000)
+
+    def _get_translation_cache(self):
+        """설정에서 번역 캐시가 켜져 있으면 캐시 인스턴스를 반환합니다 (처음 사용할 때 생성)."""
+        if not self.config.get('translation_cache_enabled', True):
+            return None
+        # 여러 작업이 동시에 실행될 수 있으므로 인스턴스는 하나만 만듦
+        with self._translation_cache_lock:
+            if self._translation_cache is None:
+                max_mb = self.config.get('translation_cache_max_mb', 512)
+                self._translation_cache = TranslationCache(max_bytes=max_mb * 1024 * 1024)
+        return self._translation_cache
+
+    def _request_settings(self):
+        """모든 청크 요청에 공통으로 들어가는 설정(시스템 명령어, prefill, 생성 설정)을 반환합니다."""
+        return {
+            'system_instruction': {"parts": [{"text": self.config.get('system_instruction')}]},
+            'prefill': self.config.get('prefill_cached_history', []),
+            'generation_config': {
+                'temperature': self.config.get('temperature', 1.0),
+                'top_p': self.config.get('top_p', 0.95),
+                'thinkingConfig': {'thinking_budget': self.config.get('thinking_budget', 128) },
+            },
         }
-        
-        max_chunk_size = self.config.get('chunk_size', 6000)
 
-        with open(source_file, 'r', encoding='utf-8') as f_in:
-            content = f_in.read()
-
-        chunks = self._split_text_into_chunks(content, max_chunk_size)
-        logger.info(f"Content split into {len(chunks)} chunks with max size {max_chunk_size}, respecting newlines.")
-
-        with open(requests_file, 'w', encoding='utf-8') as f_out:
-            for i, chunk in enumerate(chunks):
-                if not chunk: continue # Skip empty chunks
-                
-                request_contents = prefill + [{'role': 'user', 'parts': [{'text': chunk}]}]
-                request = {
-                    "model": f"models/{model_id}",
-                    "contents": request_contents,
-                    "system_instruction": system_instruction,
-                    "generation_config": generation_config,
-                    "safety_settings": [
-                        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                        {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-                    ]
-                }
-                f_out.write(json.dumps({"key": f"chunk_{i+1}", "request": request}, ensure_ascii=False) + '\n')
+    def _build_request(self, model_id, settings, chunk):
+        """
+        청크 하나에 대한 배치 요청 객체를 만듭니다.
+        settings에 컨텍스트 캐시가 있으면 시스템 명령어와 prefill 대신 캐시를 참조합니다.
+        """
+        if settings.get('cached_content'):
+            return {
+                "model": f"models/{model_id}",
+                "contents": [{'role': 'user', 'parts': [{'text': chunk}]}],
+                "cached_content": settings['cached_content'],
+                "generation_config": settings['generation_config'],
+                "safety_settings": SAFETY_SETTINGS,
+            }
+        request_contents = settings['prefill'] + [{'role': 'user', 'parts': [{'text': chunk}]}]
+        return {
+            "model": f"models/{model_id}",
+            "contents": request_contents,
+            "system_instruction": settings['system_instruction'],
+            "generation_config": settings['generation_config'],
+            "safety_settings": SAFETY_SETTINGS,
+        }
 
-        return requests_file
+    def _with_context_cache(self, settings, model_id, display_name):
+        """
+        context_cache_enabled가 켜져 있으면 공유 프리픽스(시스템 명령어 + prefill)에 대한
+        명시적 컨텍스트 캐시를 만들고, 이를 참조하는 설정 사본을 반환합니다.
+        캐시를 만들 수 없으면 (예: 최소 토큰 수 미달) 원래 설정을 그대로 반환합니다.
+        """
+        if not self.config.get('context_cache_enabled', False):
+            return settings
+        from google.genai import types
+        ttl_seconds = int(self.config.get('context_cache_ttl_hours', 48) * 3600)
+        try:
+            cached_content = self.client.caches.create(
+                model=f"models/{model_id}",
+                config=types.CreateCachedContentConfig(
+                    display_name=display_name,
+                    system_instruction=settings['system_instruction'],
+                    contents=settings['prefill'] or None,
+                    ttl=f"{ttl_seconds}s",
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Could not create a context cache for the shared prompt prefix, sending it inline instead: {e}")
+            return settings
+        usage = getattr(cached_content, 'usage_metadata', None)
+        logger.info(f"Context cache created: {cached_content.name} ({getattr(usage, 'total_token_count', '?')} tokens, ttl {ttl_seconds}s).")
+        return dict(settings, cached_content=cached_content.name)
 
-    def create_batch_job(self, source_file_path):
-        """소스 파일로부터 배치 번역 작업을 생성하고 실행합니다."""
-        if not self.client:
-            raise ValueError("API client is not initialized. Check your API key.")
+    def _delete_context_cache(self, cached_content_name):
+        try:
+            self.client.caches.delete(name=cached_content_name)
+            logger.info(f"Context cache '{cached_content_name}' deleted.")
+        except Exception as e:
+            logger.warning(f"Failed to delete context cache '{cached_content_name}': {e}")
 
-        model_id = self.config.get('model_name', 'gemini-2.5-flash')
-        requests_file = self._prepare_requests(source_file_path, model_id)
+    def release_finished_job_resources(self, job_name, state_name):
+        """
+        작업이 끝난 상태(성공/실패/취소/만료)이면 그 작업만 쓰던 서버 측 리소스(컨텍스트 캐시)를 정리합니다.
+        작업 목록을 새로고침할 때마다 호출해도 되도록, 이미 정리한 작업은 건너뜁니다.
+        """
+        state = normalize_job_state(state_name)
+        if state not in TERMINAL_JOB_STATES:
+            return
+        job_info = self.job_tracker.get_job(job_name, include_manifest=False)
+        if job_info.get('fanout_group'):
+            self._record_part_state(job_name, job_info, state)
+            return
+        if job_info.get('repair_of') and job_info.get('state') != state:
+            # 복구용 배치 작업은 성공하면 ready_repair_jobs()로 찾아 결과 파일에 반영
+            self.job_tracker.update_job(job_name, state=state)
+        cached_content_name = job_info.get('cached_content')
+        if cached_content_name:
+            self._delete_context_cache(cached_content_name)
+            self.job_tracker.update_job(job_name, cached_content=None)
+
+    def _record_part_state(self, job_name, job_info, state):
+        """분산 제출 파트의 끝난 상태를 기록하고, 모든 파트가 끝났으면 그룹이 공유하던 컨텍스트 캐시를 정리합니다."""
+        if job_info.get('state') != state:
+            self.job_tracker.update_job(job_name, state=state)
+        group_id = job_info['fanout_group']
+        group = self.job_tracker.get_group(group_id)
+        if not group.get('cached_content'):
+            return
+        parts = self.job_tracker.get_group_jobs(group_id)
+        if len(parts) >= group['part_count'] and all(info.get('state') in TERMINAL_JOB_STATES for info in parts.values()):
+            self._delete_context_cache(group['cached_content'])
+            self.job_tracker.update_group(group_id, cached_content=None)
+
+    def _cache_namespace(self, model_id, settings):
+        """번역 캐시 키에 쓰이는 요청 설정 해시를 반환합니다."""
+        return TranslationCache.make_namespace(
+            model_id, settings['system_instruction'], settings['prefill'], settings['generation_config']
+        )
+
+    def _write_chunk_requests(self, f_out, chunks, model_id, settings, key_prefix="", cached_keys=None, snapshot=None, first_index=0, preview_chunks=0):
+        """
+        청크들의 요청을 열린 요청 파일(바이너리 모드)에 씁니다.
+        캐시에 번역이 있는 청크는 건너뛰고 그 캐시 키를 cached_keys에 추가합니다.
+        처음 preview_chunks개 청크는 미리보기가 번역해 캐시에 넣으므로 요청을 쓰지 않고 캐시 키만 cached_keys에 추가합니다.
+        snapshot 파일이 주어지면 청크 텍스트를 그대로 이어 써서 수정본 재번역에 쓸 원문을 남깁니다.
+        청크 번호(결과 키)는 first_index 다음부터 매깁니다 (분산 제출의 두 번째 이후 파트).
+        (청크 순서대로의 캐시 키 목록, 청크 길이 목록, 쓴 요청 수)를 반환합니다.
+        """
+        cache = self._get_translation_cache()
+        cache_namespace = self._cache_namespace(model_id, settings) if cache else None
+        # 청크와 무관한 요청 골격은 한 번만 직렬화하고, 라인마다 키와 청크 텍스트만 끼워 넣습니다.
+        template = RequestLineTemplate(lambda chunk: self._build_request(model_id, settings, chunk))
+        manifest = []
+        chunk_lengths = []
+        request_count = 0
+        for i, chunk in enumerate(chunks):
+            chunk_lengths.append(len(chunk))
+            if snapshot:
+                snapshot.write(chunk)
+            if cache:
+                cache_key = TranslationCache.make_key(cache_namespace, chunk)
+                manifest.append(cache_key)
+                if first_index + i < preview_chunks or cache.contains(cache_key):
+                    cached_keys.append(cache_key)
+                    continue
+            if not chunk: continue # Skip empty chunks
+
+            f_out.write(template.render(f"{key_prefix}chunk_{first_index + i + 1}", chunk).encode('utf-8'))
+            request_count += 1
+        return manifest, chunk_lengths, request_count
+
+    def _write_source_requests(self, f_out, source_file, model_id, settings, key_prefix="", cached_keys=None, snapshot=None):
+        """
+        소스 파일 하나의 청크 요청들을 열린 요청 파일(바이너리 모드)에 씁니다.
+        읽기 -> 분할 -> JSONL 쓰기를 청크 단위로 흘려보내 파일 전체를 메모리에 올리지 않습니다.
+        """
+        manifest, chunk_lengths, request_count = self._write_chunk_requests(
+            f_out, self._iter_source_chunks(source_file, model_id), model_id, settings,
+            key_prefix=key_prefix, cached_keys=cached_keys, snapshot=snapshot
+        )
+        self._log_chunking(source_file, len(chunk_lengths))
+        return manifest, chunk_lengths, request_count
+
+    def _log_chunking(self, source_file, chunk_count):
+        chunking_mode, max_chunk_size = self._chunking_settings()
+        unit = "tokens" if chunking_mode == 'tokens' else "chars"
+        logger.info(f"'{os.path.basename(source_file)}' split into {chunk_count} chunks with max size {max_chunk_size} {unit}, respecting newlines.")
+
+    def _finish_cache_preparation(self, cached_keys, cache_owner, request_count):
+        """요청 준비 중 캐시에서 찾은 청크를 고정하고 적중 통계를 남깁니다."""
+        cache = self._get_translation_cache()
+        if not cache:
+            return
+        if cached_keys and cache_owner:
+            cache.pin(cache_owner, cached_keys)
+        cache.log_stats("request preparation")
+        logger.info(f"{len(cached_keys)} chunks served from the translation cache, {request_count} requests to submit.")
+
+    def _new_request_staging(self, label):
+        """
+        작업 하나의 요청 JSONL을 담을 버퍼를 만듭니다 (작은 작업은 메모리, 큰 작업은 고유한 임시 파일).
+        resumable_upload_enabled가 켜져 있으면 임시 파일로 옮겨 쓰는 순간부터 재개 가능한 업로드를 함께 진행합니다.
+        """
+        return RequestStaging(
+            int(self.config.get('request_staging_memory_mb', 64) * 1024 * 1024),
+            keep_file=self.config.get('keep_request_files', False),
+            label=label,
+            on_spill=self._start_pipelined_upload if self._resumable_upload_enabled() else None,
+        )
+
+    def _resumable_upload_enabled(self):
+        api_key = self.config.get('gemini_api_key')
+        return bool(self.config.get('resumable_upload_enabled', True) and api_key and api_key != "YOUR_GEMINI_API_KEY")
+
+    def _upload_options(self):
+        """ResumableUpload 생성 옵션 (업로드 주소, 조각 크기, 진행 상황 로그)."""
+        def log_progress(sent, total):
+            if total:
+                logger.info(f"Request upload progress: {sent / (1024 * 1024):.1f} / {total / (1024 * 1024):.1f} MB ({sent / total * 100:.0f}%).")
+            else:
+                logger.info(f"Request upload progress: {sent / (1024 * 1024):.1f} MB sent while requests are still being written.")
+        return {
+            'upload_url': self.config.get('upload_url', UPLOAD_URL),
+            'chunk_size': int(self.config.get('upload_chunk_mb', 8) * 1024 * 1024),
+            'progress_callback': log_progress,
+            'throttle': self.upload_limiter.acquire,
+        }
+
+    def _start_pipelined_upload(self, staging):
+        """요청 파일을 계속 쓰는 동안 완성된 부분부터 백그라운드에서 업로드하기 시작합니다."""
+        staging.upload = ResumableUpload(
+            staging.path, self.config.get('gemini_api_key'),
+            display_name=os.path.basename(staging.path), **self._upload_options()
+        ).start(staging.finished)
+        logger.info(f"Started a resumable upload of '{staging.path}' while the requests are being written.")
+
+    def _prepare_requests(self, source_file, model_id, cache_owner=None, chunks=None, shard_sizes=None, preview_chunks=0):
+        """
+        ConfigManager의 설정을 사용하여 요청 JSONL을 작업별 버퍼(RequestStaging)에 생성합니다.
+        번역 캐시가 켜져 있으면 캐시에 이미 번역이 있는 청크와 미리보기가 번역하는 처음 preview_chunks개 청크는
+        요청 파일에 넣지 않고 cache_owner로 고정합니다.
+        chunks가 주어지면 소스 파일을 다시 나누지 않고 그 청크들을 사용합니다 (수정본 재번역).
+        shard_sizes(파트별 청크 수 목록)가 주어지면 청크를 순서대로 나눠 파트마다 별도의 버퍼에 씁니다 (분산 제출).
+        {'shards'([{'staging', 'first_chunk', 'request_count'}]), 'chunks'(캐시 키 목록), 'chunk_lengths',
+        'request_count', 'snapshot', 'cached_content'} 딕셔너리를 반환합니다.
+        """
+        settings = self._with_context_cache(
+            self._request_settings(), model_id, f"prefix-{os.path.basename(source_file)}"
+        )
+        cached_keys = []
+
+        snapshot_path = None
+        if self.config.get('revision_snapshots_enabled', True):
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            snapshot_path = os.path.join(SNAPSHOT_DIR, f"{uuid.uuid4().hex}.txt.gz")
+
+        label = f"requests-{os.path.splitext(os.path.basename(source_file))[0]}"
+        chunk_iter = iter(chunks) if chunks is not None else self._iter_source_chunks(source_file, model_id)
+        shard_sizes = shard_sizes or [None]
+        shards = []
+        manifest = []
+        chunk_lengths = []
+        try:
+            with (gzip.open(snapshot_path, 'wt', encoding='utf-8', compresslevel=3) if snapshot_path else contextlib.nullcontext()) as snapshot:
+                for shard_index, shard_size in enumerate(shard_sizes):
+                    is_last = shard_index == len(shard_sizes) - 1
+                    staging = self._new_request_staging(label if len(shard_sizes) == 1 else f"{label}-part{shard_index + 1}")
+                    shard = {'staging': staging, 'first_chunk': len(chunk_lengths), 'request_count': 0}
+                    shards.append(shard)
+                    # 마지막 파트는 남은 청크를 모두 받음 (청크 수를 센 뒤 소스 파일이 바뀐 경우에도 빠짐없이)
+                    shard_chunks = chunk_iter if is_last else itertools.islice(chunk_iter, shard_size)
+                    with staging as f_out:
+                        shard_manifest, shard_lengths, shard['request_count'] = self._write_chunk_requests(
+                            f_out, shard_chunks, model_id, settings, cached_keys=cached_keys, snapshot=snapshot,
+                            first_index=len(chunk_lengths), preview_chunks=preview_chunks
+                        )
+                    manifest.extend(shard_manifest)
+                    chunk_lengths.extend(shard_lengths)
+        except Exception:
+            for shard in shards:
+                shard['staging'].cleanup()
+            self._remove_snapshot(snapshot_path)
+            if settings.get('cached_content'):
+                self._delete_context_cache(settings['cached_content'])
+            raise
 
+        if chunks is None:
+            self._log_chunking(source_file, len(chunk_lengths))
+        request_count = sum(shard['request_count'] for shard in shards)
+        self._finish_cache_preparation(cached_keys, cache_owner, request_count)
+        cached_content = settings.get('cached_content')
+        if cached_content and request_count == 0:
+            self._delete_context_cache(cached_content)
+            cached_content = None
+        return {
+            'shards': shards,
+            'chunks': manifest,
+            'chunk_lengths': chunk_lengths,
+            'request_count': request_count,
+            'snapshot': snapshot_path,
+            'cached_content': cached_content,
+        }
+
+    def _prepare_multi_file_requests(self, source_files, model_id):
+        """
+        여러 소스 파일의 청크를 'file_<파일 번호>/chunk_<청크 번호>' 키로 요청 파일에 모읍니다.
+        요청 파일이 multi_file_max_request_mb를 넘으면 다음 파일부터 새 요청 파일(파트)을 시작합니다.
+        한 소스 파일의 청크는 항상 한 파트에만 들어갑니다.
+        파트마다 {'staging', 'source_files', 'chunks', 'request_count', 'cache_owner', 'cached_content'} 딕셔너리를 반환합니다.
+        """
+        max_part_bytes = self.config.get('multi_file_max_request_mb', 1024) * 1024 * 1024
+        settings = self._request_settings()
+        parts = []
+        part = None
+        f_out = None
         try:
-            # 1. 파일 업로드
-            logger.info(f"Uploading request file ('{requests_file}') to the File API.")
+            for file_index, source_file in enumerate(source_files):
+                if part is None or f_out.tell() >= max_part_bytes:
+                    if f_out:
+                        f_out.close()
+                    f_out = self._new_request_staging(f"requests-part{len(parts) + 1}")
+                    part_settings = self._with_context_cache(settings, model_id, f"prefix-part{len(parts) + 1}-{os.path.basename(source_file)}")
+                    part = {
+                        'staging': f_out,
+                        'cached_content': part_settings.get('cached_content'),
+                        'source_files': {},
+                        'chunks': {},
+                        'request_count': 0,
+                        'cache_owner': uuid.uuid4().hex,
+                        'cached_keys': [],
+                    }
+                    parts.append(part)
+
+                manifest, _, request_count = self._write_source_requests(
+                    f_out, source_file, model_id, part_settings,
+                    key_prefix=f"file_{file_index}/", cached_keys=part['cached_keys']
+                )
+                part['source_files'][str(file_index)] = source_file
+                part['chunks'][str(file_index)] = manifest
+                part['request_count'] += request_count
+        except Exception:
+            for part in parts:
+                part['staging'].cleanup()
+                if part['cached_content']:
+                    self._delete_context_cache(part['cached_content'])
+            raise
+        finally:
+            if f_out:
+                f_out.close()
+
+        for part in parts:
+            self._finish_cache_preparation(part.pop('cached_keys'), part['cache_owner'], part['request_count'])
+            if part['cached_content'] and part['request_count'] == 0:
+                self._delete_context_cache(part['cached_content'])
+                part['cached_content'] = None
+        logger.info(f"{len(source_files)} source files packed into {len(parts)} request file(s).")
+        return parts
+
+    def _default_output_path(self, source_file_path):
+        """소스 파일 옆에 '<이름>_translated.txt' 경로를 만듭니다."""
+        return f"{os.path.splitext(source_file_path)[0]}_translated.txt"
+
+    def _submit_requests_file(self, staging, model_id, display_name, submission):
+        """
+        작업별 버퍼(RequestStaging)의 요청 JSONL을 File API에 업로드하고 배치 작업을 생성합니다.
+        submission({'source_file', 'details'})은 재개 가능한 업로드가 중단되었을 때 체크포인트에 함께 저장되어,
+        다음 실행의 resume_pending_uploads()가 업로드를 마치고 같은 작업을 만들 수 있게 합니다.
+        요청 JSONL이 inline_batch_max_mb 이하이면 업로드 없이 인라인 요청으로 작업을 만들고,
+        결과를 요청 순서대로 키에 맞추기 위해 submission['details']에 키 목록(inline_keys)을 추가합니다.
+        """
+        if self._use_inline_requests(staging):
+            keys, requests = self._inline_requests(staging)
+            submission['details']['inline_keys'] = keys
+            return self._create_inline_batch(model_id, requests, display_name)
+
+        # 1. 파일 업로드
+        if staging.upload:
+            logger.info(f"Waiting for the resumable upload of {staging.describe()} to finish.")
+            try:
+                file_name = staging.upload.result()
+            except UploadInterruptedError:
+                staging.upload.save_checkpoint(submission=dict(submission, model_id=model_id, display_name=display_name))
+                staging.retain()
+                raise
+        else:
+            logger.info(f"Uploading requests ({staging.describe()}) to the File API.")
+            self.request_limiter.acquire()
+            self.upload_limiter.acquire(staging.size())
+            from google.genai import types
             uploaded_file = self.client.files.upload(
-                file=requests_file,
+                file=staging.upload_source(),
                 config=types.UploadFileConfig(mime_type='application/json')
             )
-            logger.info(f"File uploaded successfully: {uploaded_file.name}")
-
-            # 2. 배치 작업 생성
-            logger.info("Creating the batch translation job.")
-            model_name = f"models/{model_id}"
-            batch_job = self.client.batches.create(
-                model=model_name,
-                src=uploaded_file.name,
-                config={'display_name': f'translation-{os.path.basename(source_file_path)}'}
+            file_name = uploaded_file.name
+        logger.info(f"File uploaded successfully: {file_name}")
+
+        # 2. 배치 작업 생성
+        return self._create_batch_from_file(model_id, file_name, display_name)
+
+    def _create_batch_from_file(self, model_id, file_name, display_name):
+        self.request_limiter.acquire()
+        logger.info("Creating the batch translation job.")
+        model_name = f"models/{model_id}"
+        batch_job = self.client.batches.create(
+            model=model_name,
+            src=file_name,
+            config={'display_name': display_name}
+        )
+        logger.info(f"Batch job created successfully: {batch_job.name}")
+        return batch_job
+
+    def _use_inline_requests(self, staging):
+        """요청 JSONL이 inline_batch_max_mb 이하이고 업로드가 아직 시작되지 않았으면 True (0이면 항상 File API를 사용)."""
+        max_mb = self.config.get('inline_batch_max_mb', 2)
+        return max_mb > 0 and not staging.upload and staging.size() <= max_mb * 1024 * 1024
+
+    def _inline_requests(self, staging):
+        """요청 JSONL을 인라인 요청 목록으로 바꿉니다. (결과 키 목록, [{'contents', 'config'}])를 반환합니다."""
+        keys = []
+        requests = []
+        source = staging.upload_source()
+        with (open(source, 'rb') if isinstance(source, str) else contextlib.nullcontext(source)) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                keys.append(entry['key'])
+                requests.append({'contents': entry['request']['contents'], 'config': _call_config(entry['request'])})
+        return keys, requests
+
+    def _create_inline_batch(self, model_id, requests, display_name):
+        self.request_limiter.acquire()
+        logger.info(f"Creating the batch translation job with {len(requests)} inline requests (no File API upload).")
+        batch_job = self.client.batches.create(
+            model=f"models/{model_id}",
+            src=requests,
+            config={'display_name': display_name}
+        )
+        logger.info(f"Batch job created successfully: {batch_job.name}")
+        return batch_job
+
+    def resume_pending_uploads(self):
+        """
+        이전 실행에서 연결이 끊겨 멈춘 요청 업로드를 체크포인트에서 이어 올리고 배치 작업을 만듭니다.
+        요청 파일을 다 쓰기 전에 중단된 세션(제출 정보가 없는 체크포인트)은 이어 올릴 수 없으므로 삭제합니다.
+        만들어진 배치 작업 목록을 반환합니다.
+        """
+        # 이어 올릴 업로드가 없으면 시작 시 API 클라이언트를 만들지 않음
+        checkpoints = ResumableUpload.list_checkpoints()
+        if not checkpoints or not self.client:
+            return []
+        batch_jobs = []
+        for checkpoint_path in checkpoints:
+            try:
+                upload = ResumableUpload.from_checkpoint(checkpoint_path, self.config.get('gemini_api_key'), **self._upload_options())
+            except (json.JSONDecodeError, OSError, KeyError) as e:
+                logger.warning(f"Skipping unreadable upload checkpoint '{checkpoint_path}': {e}")
+                continue
+            submission = upload.submission
+            if not submission:
+                if upload.owner_pid != os.getpid():
+                    logger.warning(f"Discarding upload session for '{upload.path}': the request file was never completed.")
+                    upload.discard()
+                continue
+            logger.info(f"Resuming the request upload of '{upload.path}' from {upload.offset} bytes.")
+            try:
+                file_name = upload.run()
+                batch_job = self._create_batch_from_file(submission['model_id'], file_name, submission['display_name'])
+            except ValueError as e:
+                # 업로드 세션이 만료되는 등 이어 올릴 수 없는 경우: 작업이 쓰려던 리소스도 정리
+                logger.error(f"Upload of '{upload.path}' cannot be resumed and was discarded: {e}", exc_info=True)
+                self._release_job_resources(submission['details'])
+                upload.discard()
+                continue
+            except Exception as e:
+                logger.error(f"Failed to resume the upload of '{upload.path}', will retry on the next start: {e}", exc_info=True)
+                continue
+            self.job_tracker.add_job(batch_job.name, submission['source_file'], **submission['details'])
+            upload.discard(remove_file=not self.config.get('keep_request_files', False))
+            batch_jobs.append(batch_job)
+        return batch_jobs
+
+    def _release_job_resources(self, job_info):
+        """작업이 쓰던 번역 캐시 고정(pin), 원문 스냅샷과 컨텍스트 캐시를 정리합니다."""
+        cache_owner = job_info.get('cache_owner')
+        cache = self._get_translation_cache()
+        if cache_owner and cache:
+            cache.unpin(cache_owner)
+        self._remove_snapshot(job_info.get('snapshot'))
+        if job_info.get('cached_content'):
+            self._delete_context_cache(job_info['cached_content'])
+
+    def create_batch_jobs(self, source_file_path, save_path=None, on_preview=None):
+        """
+        소스 파일을 번역하는 배치 작업 목록을 만듭니다.
+        분산 제출(fanout_jobs / fanout_target_minutes)이 켜져 있으면 청크를 여러 작업으로 나눠 제출하고,
+        아니면 create_batch_job과 같습니다. 모든 청크가 번역 캐시에 있으면 결과 파일을 바로 쓰고 빈 목록을 반환합니다.
+        청크 수가 express_max_chunks 이하인 작은 파일은 배치 작업 없이 빠른 모드로 바로 번역하고 빈 목록을 반환합니다.
+        on_preview(청크 번호, 텍스트 조각)가 주어지면 처음 preview_chunks개 청크를 스트리밍 호출로 번역하는 미리보기를
+        배치 작업 제출과 동시에 진행합니다 (start_preview 참고).
+        """
+        if not self.client:
+            raise ValueError("API client is not initialized. Check your API key.")
+        model_id = self.config.get('model_name', 'gemini-2.5-flash')
+        if self._use_express_mode(source_file_path, model_id):
+            self.translate_express(source_file_path, save_path)
+            return []
+        preview_chunks = self.start_preview(source_file_path, on_preview) if on_preview else 0
+        chunk_count = self._fanout_chunk_count(source_file_path, model_id)
+        shard_count = choose_shard_count(
+            chunk_count,
+            fixed_jobs=self.config.get('fanout_jobs', 1),
+            target_minutes=self.config.get('fanout_target_minutes', 0),
+            chunks_per_minute=self.config.get('fanout_chunks_per_minute', 300),
+            max_jobs=self.config.get('fanout_max_jobs', 8),
+        ) if chunk_count else 1
+        if shard_count <= 1:
+            batch_job = self.create_batch_job(source_file_path, save_path, preview_chunks)
+            return [batch_job] if batch_job else []
+        return self._create_fanout_batch_jobs(
+            source_file_path, model_id, plan_shard_sizes(chunk_count, shard_count), save_path, preview_chunks
+        )
+
+    def _use_express_mode(self, source_file_path, model_id):
+        """청크 수가 express_max_chunks 이하이면 True (0이면 빠른 모드를 쓰지 않음). 상한을 넘는 순간 세기를 멈춥니다."""
+        max_chunks = self.config.get('express_max_chunks', 20)
+        if max_chunks <= 0:
+            return False
+        chunk_count = sum(1 for _ in itertools.islice(self._iter_source_chunks(source_file_path, model_id), max_chunks + 1))
+        return 0 < chunk_count <= max_chunks
+
+    def translate_express(self, source_file_path, save_path=None):
+        """
+        배치 작업 없이 청크마다 비동기 generate_content 호출을 보내 바로 번역하고 결과 파일을 씁니다 (빠른 모드).
+        동시 요청 수는 express_concurrency로 제한하고, 일시적인 오류는 지수 백오프로 다시 시도합니다.
+        번역 캐시에 있는 청크는 요청하지 않으며, 차단되거나 끝내 실패한 청크는 복구 단계에서 다시 번역합니다.
+        결과 파일 경로를 반환합니다.
+        """
+        if not self.client:
+            raise ValueError("API client is not initialized. Check your API key.")
+        # asyncio와 요청 풀은 빠른 모드에서만 쓰므로 시작 시간에 포함되지 않도록 여기서 불러옴
+        import asyncio
+        from .express import translate_chunks
+
+        model_id = self.config.get('model_name', 'gemini-2.5-flash')
+        settings = self._request_settings()
+        chunks = list(self._iter_source_chunks(source_file_path, model_id))
+        self._log_chunking(source_file_path, len(chunks))
+        cache = self._get_translation_cache()
+        manifest = []
+        if cache:
+            namespace = self._cache_namespace(model_id, settings)
+            manifest = [TranslationCache.make_key(namespace, chunk) for chunk in chunks]
+        pending = {
+            key_num: chunk for key_num, chunk in enumerate(chunks, 1)
+            if chunk and not (cache and cache.contains(manifest[key_num - 1]))
+        }
+        concurrency = self.config.get('express_concurrency', 8)
+        logger.info(f"Express mode: translating {len(pending)} of {len(chunks)} chunks of '{os.path.basename(source_file_path)}' "
+                    f"with up to {concurrency} concurrent requests.")
+        results = asyncio.run(translate_chunks(
+            pending, lambda text: self._generate_text_async(model_id, settings, text),
+            concurrency=concurrency,
+            max_attempts=self.config.get('express_max_attempts', 4),
+            backoff_seconds=self.config.get('express_backoff_seconds', 2.0),
+        ))
+
+        output_path = save_path or self._default_output_path(source_file_path)
+        logger.info(f"결과를 '{output_path}' 파일에 저장합니다.")
+        writer = StitchedOutputWriter(output_path, manifest, cache)
+        failure_reasons = {}
+        try:
+            for key_num, chunk in enumerate(chunks, 1):
+                if key_num in results:
+                    text, error, _ = results[key_num]
+                    if text is None:
+                        failure_reasons[(0, key_num)] = f"빠른 모드 요청 실패: {error}"
+                        writer.add(key_num, f"[번역 실패 (빠른 모드) - {error}]", failed=True)
+                    else:
+                        writer.add(key_num, text)
+                elif not chunk:
+                    writer.add(key_num, chunk)
+            writer.finish(len(chunks))
+        except BaseException:
+            writer.abort()
+            raise
+        if cache:
+            cache.put_many([(manifest[key_num - 1], text) for key_num, (text, _, _) in results.items() if text])
+            cache.log_stats("express translation")
+        failed = sum(1 for text, _, _ in results.values() if text is None)
+        logger.info(f"Express mode finished '{output_path}': {len(results) - failed} chunks translated, {failed} failed.")
+        self._repair_results(
+            f"express:{os.path.basename(source_file_path)}", {'source_file': source_file_path, 'chunks': manifest},
+            output_path, {0: writer}, failure_reasons, model_id
+        )
+        return output_path
+
+    def start_preview(self, source_file_path, on_preview):
+        """
+        처음 preview_chunks개 청크를 스트리밍 호출(generate_content_stream)로 번역하는 미리보기를 백그라운드 스레드에서
+        시작합니다. 텍스트 조각이 도착할 때마다 워커 스레드에서 on_preview(청크 번호, 텍스트 조각)를 호출합니다.
+        미리보기 번역은 번역 캐시에 저장되어 결과 파일을 쓸 때 캐시에서 채워지므로, 배치 요청에서 빼야 하는 앞쪽 청크 수를
+        반환합니다. 미리보기가 실패한 청크는 결과 파일에 누락 표시로 남고 복구 단계에서 다시 번역합니다.
+        preview_chunks가 0이거나 번역 캐시가 꺼져 있으면 (미리보기를 결과에 재사용할 수 없으므로) 아무것도 하지 않고 0을 반환합니다.
+        """
+        count = self.config.get('preview_chunks', 3)
+        if count <= 0 or not self._get_translation_cache():
+            return 0
+        model_id = self.config.get('model_name', 'gemini-2.5-flash')
+        settings = self._request_settings()
+        chunks = list(itertools.islice(self._iter_source_chunks(source_file_path, model_id), count + 1))
+        if len(chunks) <= count:
+            # 파일 전체가 미리보기 범위: 미리보기를 먼저 끝내고, 실패한 청크만 배치 요청으로 보냄
+            self._stream_preview(model_id, settings, chunks, on_preview)
+            return 0
+        threading.Thread(
+            target=self._stream_preview, args=(model_id, settings, chunks[:count], on_preview),
+            name=f"preview-{os.path.basename(source_file_path)}", daemon=True
+        ).start()
+        logger.info(f"Streaming a preview of the first {count} chunks of '{os.path.basename(source_file_path)}' while the batch job is submitted.")
+        return count
+
+    def _stream_preview(self, model_id, settings, chunks, on_preview):
+        """미리보기 청크들을 순서대로 스트리밍 번역하고 끝난 번역을 번역 캐시에 저장합니다. 캐시에 있는 청크는 요청하지 않습니다."""
+        cache = self._get_translation_cache()
+        namespace = self._cache_namespace(model_id, settings)
+        for key_num, chunk in enumerate(chunks, 1):
+            if not chunk:
+                continue
+            cache_key = TranslationCache.make_key(namespace, chunk)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                on_preview(key_num, cached)
+                continue
+            try:
+                text = self._stream_text(model_id, settings, chunk, lambda delta, key_num=key_num: on_preview(key_num, delta))
+            except Exception as e:
+                logger.warning(f"Preview of chunk {key_num} failed, the chunk will be repaired after the batch job: {e}", exc_info=True)
+                on_preview(key_num, f"\n[미리보기 실패 - {e}]")
+                continue
+            cache.put_many([(cache_key, text)])
+        logger.info(f"Preview of {len(chunks)} chunks finished.")
+
+    def _fanout_chunk_count(self, source_file_path, model_id):
+        """분산 제출이 켜져 있으면 파트를 나누기 위해 소스 파일의 청크 수를 미리 셉니다 (꺼져 있으면 0)."""
+        if self.config.get('fanout_jobs', 1) <= 1 and self.config.get('fanout_target_minutes', 0) <= 0:
+            return 0
+        return sum(1 for _ in self._iter_source_chunks(source_file_path, model_id))
+
+    def _create_fanout_batch_jobs(self, source_file_path, model_id, shard_sizes, save_path=None, preview_chunks=0):
+        """
+        청크를 순서대로 파트로 나눠 파트마다 배치 작업을 만들고, 작업들을 하나의 번역(그룹)으로 추적합니다.
+        청크 목록, 스냅샷, 캐시 고정, 컨텍스트 캐시는 그룹에 저장되고 파트 작업에는 그룹 id와 파트 번호만 저장됩니다.
+        모든 파트가 SUCCEEDED가 되면 merge_fanout_group()으로 결과를 합칩니다.
+        """
+        cache_owner = uuid.uuid4().hex
+        group_id = uuid.uuid4().hex
+        prepared = self._prepare_requests(source_file_path, model_id, cache_owner, shard_sizes=shard_sizes, preview_chunks=preview_chunks)
+        shards = [shard for shard in prepared['shards'] if shard['request_count']]
+        base_name = os.path.basename(source_file_path)
+        batch_jobs = []
+        interrupted = None
+        try:
+            if not shards:
+                self._write_cached_output(prepared, source_file_path, cache_owner, save_path)
+                return []
+
+            group = {'source_file': source_file_path, 'part_count': len(shards), 'save_path': save_path}
+            if prepared['chunks']:
+                group.update(chunks=prepared['chunks'], cache_owner=cache_owner)
+            if prepared['snapshot']:
+                group.update(snapshot=prepared['snapshot'], chunk_lengths=prepared['chunk_lengths'])
+            if prepared['cached_content']:
+                group.update(cached_content=prepared['cached_content'])
+            self.job_tracker.add_group(group_id, **group)
+
+            for part_number, shard in enumerate(shards, 1):
+                details = {'fanout_group': group_id, 'fanout_part': part_number}
+                try:
+                    batch_job = self._submit_requests_file(
+                        shard['staging'], model_id, f'translation-{base_name}-part{part_number}of{len(shards)}',
+                        {'source_file': source_file_path, 'details': details}
+                    )
+                except UploadInterruptedError as e:
+                    # 이 파트는 다음 실행에서 이어서 제출되므로 나머지 파트는 계속 제출
+                    interrupted = interrupted or e
+                    continue
+                self.job_tracker.add_job(batch_job.name, source_file_path, **details)
+                batch_jobs.append(batch_job)
+            logger.info(f"'{base_name}' fanned out into {len(batch_jobs)} batch jobs (group {group_id}).")
+            if interrupted:
+                raise interrupted
+            return batch_jobs
+
+        except UploadInterruptedError as e:
+            logger.error(f"A request upload of group {group_id} was interrupted and will resume on the next start: {e}", exc_info=True)
+            raise e
+        except Exception as e:
+            logger.error(f"An error occurred during fan-out batch job creation: {e}", exc_info=True)
+            # 일부 파트만 있는 번역은 합칠 수 없으므로 이미 만든 파트 작업을 지우고 리소스를 정리
+            for batch_job in batch_jobs:
+                try:
+                    self.client.batches.delete(name=batch_job.name)
+                except Exception as delete_error:
+                    logger.warning(f"Failed to delete part job '{batch_job.name}': {delete_error}")
+                self.job_tracker.remove_job(batch_job.name)
+            self.job_tracker.remove_group(group_id)
+            self._release_job_resources({
+                'cache_owner': cache_owner, 'snapshot': prepared['snapshot'], 'cached_content': prepared['cached_content'],
+            })
+            raise e
+        finally:
+            for shard in prepared['shards']:
+                shard['staging'].cleanup()
+
+    def create_batch_job(self, source_file_path, save_path=None, preview_chunks=0):
+        """
+        소스 파일로부터 배치 번역 작업을 생성하고 실행합니다.
+        모든 청크가 번역 캐시에 있으면 배치 작업 없이 바로 결과 파일(save_path 또는 기본 경로)을 쓰고 None을 반환합니다.
+        처음 preview_chunks개 청크는 미리보기가 번역하므로 요청에 넣지 않습니다.
+        """
+        if not self.client:
+            raise ValueError("API client is not initialized. Check your API key.")
+
+        model_id = self.config.get('model_name', 'gemini-2.5-flash')
+        cache_owner = uuid.uuid4().hex
+        prepared = self._prepare_requests(source_file_path, model_id, cache_owner, preview_chunks=preview_chunks)
+        return self._submit_prepared_requests(
+            prepared, source_file_path, model_id, cache_owner,
+            f'translation-{os.path.basename(source_file_path)}', save_path
+        )
+
+    def _submit_prepared_requests(self, prepared, source_file_path, model_id, cache_owner, display_name, save_path=None, **extra_details):
+        """준비된 요청으로 배치 작업을 만들고 추적 정보(청크 목록, 스냅샷 등)를 저장합니다. 요청 버퍼는 항상 정리됩니다."""
+        manifest = prepared['chunks']
+        staging = prepared['shards'][0]['staging']
+        try:
+            if prepared['request_count'] == 0 and manifest:
+                self._write_cached_output(prepared, source_file_path, cache_owner, save_path)
+                return None
+
+            # Track the new job with its source file, the chunk manifest used to stitch cached chunks
+            # and the chunk boundaries/source snapshot used by revision jobs
+            details = dict(extra_details)
+            if manifest:
+                details.update(chunks=manifest, cache_owner=cache_owner)
+            if prepared['snapshot']:
+                details.update(snapshot=prepared['snapshot'], chunk_lengths=prepared['chunk_lengths'])
+            if prepared['cached_content']:
+                details.update(cached_content=prepared['cached_content'])
+
+            batch_job = self._submit_requests_file(
+                staging, model_id, display_name,
+                {'source_file': source_file_path, 'details': details}
             )
-            logger.info(f"Batch job created successfully: {batch_job.name}")
-            
-            # Track the new job with its source file
-            self.job_tracker.add_job(batch_job.name, source_file_path)
+            self.job_tracker.add_job(batch_job.name, source_file_path, **details)
             
             return batch_job
 
+        except UploadInterruptedError as e:
+            # 리소스는 유지: 다음 실행의 resume_pending_uploads()가 업로드를 마치고 작업을 만듦
+            logger.error(f"Request upload was interrupted and will resume on the next start: {e}", exc_info=True)
+            raise e
         except Exception as e:
             logger.error(f"An error occurred during batch job creation: {e}", exc_info=True)
+            self._release_job_resources({
+                'cache_owner': cache_owner, 'snapshot': prepared['snapshot'], 'cached_content': prepared['cached_content'],
+            })
             # Re-raise the exception to be caught by the ViewModel
             raise e
         finally:
-            # 3. 임시 파일 삭제
-            if os.path.exists(requests_file):
-                # os.remove(requests_file) # 디버깅을 위해 임시 주석 처리
-                logger.info(f"Debugging: Temporary request file '{requests_file}' was not deleted.")
+            # 3. 요청 버퍼/임시 파일 정리 (keep_request_files가 켜져 있으면 파일은 남김)
+            staging.cleanup()
+
+    def _write_cached_output(self, prepared, source_file_path, cache_owner, save_path=None):
+        """모든 청크가 번역 캐시에 있을 때 배치 작업 없이 결과 파일을 쓰고 준비 중에 잡은 리소스를 정리합니다."""
+        manifest = prepared['chunks']
+        output_path = save_path or self._default_output_path(source_file_path)
+        logger.info(f"All {len(manifest)} chunks were found in the translation cache. Writing '{output_path}' without a batch job.")
+        self._write_stitched_output(output_path, {}, manifest, len(manifest))
+        self._get_translation_cache().unpin(cache_owner)
+        self._remove_snapshot(prepared['snapshot'])
+
+    def _remove_snapshot(self, snapshot_path):
+        if snapshot_path and os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+    def create_revision_job(self, previous_job_name, source_file_path=None, save_path=None):
+        """
+        수정된 소스 파일에서 바뀐 청크만 다시 번역하는 배치 작업을 만듭니다.
+        이전 작업의 청크 경계와 원문 스냅샷을 기준으로 새 소스와 비교하여, 바뀌지 않은 청크는
+        번역 캐시(없으면 이전 작업의 결과 파일)의 번역을 재사용합니다.
+        최종 결과는 일반 작업처럼 download_and_process_results로 받으며, 이전 번역과 새 번역이 합쳐집니다.
+        바뀐 청크가 없으면 바로 결과 파일을 쓰고 None을 반환합니다.
+        """
+        if not self.client:
+            raise ValueError("API client is not initialized. Check your API key.")
+        previous = self._tracked_job_info(previous_job_name)
+        if not previous.get('snapshot') or not os.path.exists(previous['snapshot']):
+            raise ValueError(f"No source snapshot is stored for job '{previous_job_name}'. It cannot be revised.")
+        cache = self._get_translation_cache()
+        if not cache or not previous.get('chunks'):
+            raise ValueError("Revision jobs need the translation cache (translation_cache_enabled).")
+
+        source_file_path = source_file_path or previous.get('source_file')
+        model_id = self.config.get('model_name', 'gemini-2.5-flash')
+        chunking_mode, max_chunk_size = self._chunking_settings()
+
+        with gzip.open(previous['snapshot'], 'rt', encoding='utf-8') as f:
+            old_text = f.read()
+        old_chunks = list(iter_chunk_texts(old_text, previous['chunk_lengths']))
+        new_text = "".join(self._iter_file_blocks(source_file_path))
+        plan = plan_revision(
+            old_chunks, new_text,
+            lambda text: self._split_text_into_chunks(text, max_chunk_size, chunking_mode, model_id)
+        )
+
+        # 재사용할 청크 중 캐시에서 빠진 번역은 이전 작업의 결과 파일에서 가져와 캐시에 채움
+        settings = self._request_settings()
+        namespace = self._cache_namespace(model_id, settings)
+        missing = [
+            old_index for text, old_index in plan
+            if old_index is not None and not cache.contains(TranslationCache.make_key(namespace, text))
+        ]
+        if missing:
+            logger.info(f"{len(missing)} unchanged chunks are not in the translation cache. Importing previous results.")
+            self._import_job_results_into_cache(previous_job_name)
+        cache.log_stats("revision planning")
+
+        cache_owner = uuid.uuid4().hex
+        prepared = self._prepare_requests(source_file_path, model_id, cache_owner, chunks=[text for text, _ in plan])
+        logger.info(f"Revision of '{previous_job_name}': {prepared['request_count']} of {len(plan)} chunks will be re-translated.")
+        return self._submit_prepared_requests(
+            prepared, source_file_path, model_id, cache_owner,
+            f'revision-{os.path.basename(source_file_path)}', save_path,
+            revision_of=previous_job_name
+        )
+
+    def _import_job_results_into_cache(self, job_name):
+        """이전 작업의 결과 파일을 내려받아 성공한 번역을 번역 캐시에 저장합니다."""
+        job_info = self._tracked_job_info(job_name)
+        _, manifests = self._job_files(job_info)
+        try:
+            jobs = [self.client.batches.get(name=name) for name in self._result_job_names(job_name)]
+            spool = self._spool_results(jobs)
+        except Exception as e:
+            logger.warning(f"Could not download results of '{job_name}' to reuse its translations: {e}")
+            return
+        cache = self._get_translation_cache()
+        batch = []
+        with spool:
+            for file_index, key_num, text, succeeded in iter_results(iter_result_lines(spool)):
+                manifest = manifests.get(file_index, [])
+                if succeeded and key_num <= len(manifest):
+                    batch.append((manifest[key_num - 1], text))
+                    if len(batch) >= CACHE_WRITE_BATCH:
+                        cache.put_many(batch)
+                        batch = []
+        cache.put_many(batch)
+
+    def create_multi_file_batch_jobs(self, source_file_paths):
+        """
+        여러 소스 파일을 하나(크기 상한을 넘으면 여러 개)의 배치 작업으로 묶어 제출합니다.
+        결과 다운로드 시 소스 파일별로 분리된 출력 파일이 만들어집니다.
+        생성된 배치 작업 목록을 반환합니다 (모든 청크가 캐시에 있는 파트는 바로 기본 경로에 결과를 씁니다).
+        """
+        if not self.client:
+            raise ValueError("API client is not initialized. Check your API key.")
+
+        model_id = self.config.get('model_name', 'gemini-2.5-flash')
+        parts = self._prepare_multi_file_requests(source_file_paths, model_id)
+        cache = self._get_translation_cache()
+        batch_jobs = []
+        try:
+            for part_index, part in enumerate(parts):
+                files = part['source_files']
+                if part['request_count'] == 0 and cache:
+                    for file_index, source_file in files.items():
+                        manifest = part['chunks'][file_index]
+                        self._write_stitched_output(self._default_output_path(source_file), {}, manifest, len(manifest))
+                    cache.unpin(part['cache_owner'])
+                    continue
+
+                first_name = os.path.basename(next(iter(files.values())))
+                display_name = f"translation-{len(files)}files-{first_name}"
+                if len(parts) > 1:
+                    display_name += f"-part{part_index + 1}"
+                # Track the file-index -> source mapping so results can be demultiplexed on download
+                details = {'source_files': files}
+                if part['cached_content']:
+                    details.update(cached_content=part['cached_content'])
+                if cache:
+                    details.update(chunks_by_file=part['chunks'], cache_owner=part['cache_owner'])
+                batch_job = self._submit_requests_file(
+                    part['staging'], model_id, display_name,
+                    {'source_file': next(iter(files.values())), 'details': details}
+                )
+                self.job_tracker.add_job(batch_job.name, next(iter(files.values())), **details)
+                batch_jobs.append(batch_job)
+            return batch_jobs
+
+        except Exception as e:
+            logger.error(f"An error occurred during multi-file batch job creation: {e}", exc_info=True)
+            # 업로드가 중단된 파트는 다음 실행에서 이어서 제출하므로 리소스를 유지
+            pending = [part for part in parts if part['staging'].retained]
+            if cache:
+                submitted = {self.job_tracker.get_job(j.name).get('cache_owner') for j in batch_jobs}
+                submitted.update(part['cache_owner'] for part in pending)
+                for part in parts:
+                    if part['cache_owner'] not in submitted:
+                        cache.unpin(part['cache_owner'])
+            submitted_prefixes = {self.job_tracker.get_job(j.name).get('cached_content') for j in batch_jobs}
+            submitted_prefixes.update(part['cached_content'] for part in pending)
+            for part in parts:
+                if part['cached_content'] and part['cached_content'] not in submitted_prefixes:
+                    self._delete_context_cache(part['cached_content'])
+            raise e
+        finally:
+            for part in parts:
+                part['staging'].cleanup()
+
+    def _tracked_job_info(self, job_name):
+        """작업의 추적 정보를 반환합니다. 분산 제출의 파트이면 그룹 정보(청크 목록, 스냅샷 등)를 합쳐서 반환합니다."""
+        job_info = self.job_tracker.get_job(job_name)
+        if job_info.get('fanout_group'):
+            return dict(self.job_tracker.get_group(job_info['fanout_group']), **job_info)
+        return job_info
+
+    def _result_job_names(self, job_name):
+        """결과를 만들기 위해 내려받을 작업 이름 목록 (분산 제출의 파트이면 그룹의 모든 파트)."""
+        group_id = self.job_tracker.get_job(job_name, include_manifest=False).get('fanout_group')
+        if group_id:
+            return list(self.job_tracker.get_group_jobs(group_id))
+        return [job_name]
+
+    def ready_fanout_groups(self):
+        """모든 파트가 SUCCEEDED로 기록되었고 아직 결과를 합치지 않은 분산 제출 그룹 id 목록을 반환합니다."""
+        ready = []
+        for group_id, group in self.job_tracker.list_groups(unmerged_only=True).items():
+            parts = self.job_tracker.get_group_jobs(group_id)
+            if len(parts) >= group['part_count'] and all(info.get('state') == 'SUCCEEDED' for info in parts.values()):
+                ready.append(group_id)
+        return ready
+
+    def merge_fanout_group(self, group_id, save_path=None):
+        """
+        분산 제출 그룹의 모든 파트 결과를 내려받아 하나의 결과 파일로 합칩니다.
+        save_path가 없으면 제출 시 지정한 경로 또는 소스 파일 옆의 기본 경로에 씁니다. 저장한 경로를 반환합니다.
+        """
+        group = self.job_tracker.get_group(group_id)
+        if not group:
+            raise ValueError(f"Unknown job group '{group_id}'.")
+        parts = self.job_tracker.get_group_jobs(group_id)
+        if len(parts) < group['part_count']:
+            raise ValueError(f"Only {len(parts)} of {group['part_count']} parts of this translation have been submitted.")
+        jobs = [self.client.batches.get(name=name) for name in parts]
+        unfinished = [job.name for job in jobs if normalize_job_state(job.state.name) != 'SUCCEEDED']
+        if unfinished:
+            raise ValueError(f"Parts {', '.join(unfinished)} have not succeeded yet.")
+        save_path = save_path or group.get('save_path') or self._default_output_path(group['source_file'])
+        logger.info(f"Merging the results of {len(jobs)} parts of group {group_id} into '{save_path}'.")
+        self._process_results(jobs, group, save_path, owner=group_id)
+        self.job_tracker.update_group(group_id, merged_output=save_path)
+        return save_path
+
+    def can_revise_job(self, job_name):
+        """수정본 재번역에 필요한 원문 스냅샷과 청크 목록이 저장된 작업인지 반환합니다."""
+        job_info = self._tracked_job_info(job_name)
+        return bool(job_info.get('snapshot') and job_info.get('chunks')) and os.path.exists(job_info['snapshot'])
+
+    def is_multi_file_job(self, job_name):
+        """여러 소스 파일을 묶어 제출한 작업인지 반환합니다 (결과는 폴더에 파일별로 저장됨)."""
+        return bool(self.job_tracker.get_job(job_name).get('source_files'))
+
+    def get_batch_job(self, job_name):
+        """작업 하나의 최신 상태를 가져옵니다 (작업별 상태 확인)."""
+        if not self.client:
+            raise ValueError("API client is not initialized.")
+        job = self.client.batches.get(name=job_name)
+        self.job_tracker.record_job_statuses([_job_status(job)])
+        return job
 
     def list_batch_jobs(self):
+        """모든 작업을 순회하는 pager를 반환합니다 (순회하면 모든 페이지를 차례로 가져옴)."""
         if not self.client:
             return []
-        # Add page_size to the config as per the example
-        return self.client.batches.list(config={'page_size': 50})
+        return self.client.batches.list(config={'page_size': self.config.get('job_list_page_size', 50)})
+
+    def list_batch_jobs_page(self, page_token=None):
+        """
+        작업 목록의 한 페이지만 가져옵니다 (최신 작업부터).
+        (작업 목록, 다음 페이지 토큰)을 반환하며 마지막 페이지이면 토큰은 None입니다.
+        """
+        if not self.client:
+            return [], None
+        config = {'page_size': self.config.get('job_list_page_size', 50)}
+        if page_token:
+            config['page_token'] = page_token
+        pager = self.client.batches.list(config=config)
+        next_page_token = (getattr(pager, 'config', None) or {}).get('page_token')
+        jobs = list(pager.page)
+        # 마지막으로 확인한 상태를 저장해 두고 다음 시작 시 첫 페이지를 바로 보여 줌
+        self.job_tracker.record_job_statuses([_job_status(job) for job in jobs], first_page=not page_token)
+        return jobs, next_page_token or None
+
+    def _generate_content_args(self, model_id, settings, text):
+        """청크 하나의 generate_content 호출 인자 (배치 요청과 같은 프롬프트, 생성 설정과 안전 설정)."""
+        request = self._build_request(model_id, settings, text)
+        return {'model': request['model'], 'contents': request['contents'], 'config': _call_config(request)}
+
+    def _generate_text(self, model_id, settings, text):
+        """
+        청크 하나를 동기 호출(client.models.generate_content)로 번역합니다.
+        응답이 차단되었거나 비어 있으면 BlockedResponseError(ValueError)를 던집니다.
+        """
+        self.request_limiter.acquire()
+        response = self.client.models.generate_content(**self._generate_content_args(model_id, settings, text))
+        if not response.text:
+            raise BlockedResponseError("The response has no text (blocked or empty)")
+        return response.text
 
-    def _retry_chunk_with_divide_and_conquer(self, text_to_translate, original_request):
+    def _stream_text(self, model_id, settings, text, on_delta):
         """
-        Recursively tries to translate a failed chunk by splitting it in half.
+        청크 하나를 스트리밍 호출(client.models.generate_content_stream)로 번역하고, 도착하는 텍스트 조각마다 on_delta를 호출합니다.
+        응답이 비어 있거나 중간에 차단(SAFETY)되면 BlockedResponseError(ValueError)를 던집니다.
         """
-        # Base case: If the text is too short to split, give up.
-        if len(text_to_translate) < 50:
-            logger.error(f"Chunk is too short to split further and failed: '{text_to_translate}'")
-            return f"[번역 실패: 최소 단위 도달] {text_to_translate}"
+        self.request_limiter.acquire()
+        parts = []
+        finish_reason = None
+        for response in self.client.models.generate_content_stream(**self._generate_content_args(model_id, settings, text)):
+            candidates = getattr(response, 'candidates', None)
+            if candidates and getattr(candidates[0], 'finish_reason', None) is not None:
+                finish_reason = getattr(candidates[0].finish_reason, 'name', candidates[0].finish_reason)
+            if response.text:
+                parts.append(response.text)
+                on_delta(response.text)
+        if not parts or finish_reason == "SAFETY":
+            raise BlockedResponseError(f"The streamed response was blocked or empty (finish reason: {finish_reason})")
+        return "".join(parts)
 
-        # Prepare a new request for synchronous translation
-        model_id = original_request['model']
-        sync_request = {
-            "contents": original_request['contents'][:-1] + [{'role': 'user', 'parts': [{'text': text_to_translate}]}],
-            "system_instruction": original_request.get('system_instruction'),
-            "generation_config": original_request.get('generation_config'),
-            "safety_settings": original_request.get('safety_settings')
+    async def _generate_text_async(self, model_id, settings, text):
+        """청크 하나를 비동기 호출(client.aio.models.generate_content)로 번역합니다 (빠른 모드)."""
+        import asyncio
+
+        await asyncio.to_thread(self.request_limiter.acquire)
+        response = await self.client.aio.models.generate_content(**self._generate_content_args(model_id, settings, text))
+        if not response.text:
+            raise BlockedResponseError("The response has no text (blocked or empty)")
+        return response.text
+
+    def _repair_results(self, owner, job_info, save_path, writers, failure_reasons, model_id):
+        """
+        결과 파일에 실패 표시로 남은 청크(차단, 빈 응답, 파싱 실패, 결과 누락)를 다시 번역합니다.
+        실패한 청크가 repair_sync_max_chunks개 이하이면 동시 요청 수를 제한한 동기 호출로 바로 고쳐 결과 파일에 반영하고,
+        더 많으면 그 청크들만 담은 복구용 배치 작업을 제출합니다 (작업이 성공하면 apply_repair_job()으로 반영).
+        복구 보고서를 결과 파일 옆에 쓰고 반환합니다. 실패한 청크가 없으면 None을 반환합니다.
+        복구용 배치 작업을 제출했으면 보고서의 repair_job에 그 작업 객체가 들어 있습니다.
+        """
+        report_path = repair_report_path(save_path)
+        outputs = {
+            file_index: {'path': writer.path, 'spans': dict(writer.failed_spans)}
+            for file_index, writer in writers.items() if writer.failed_spans
+        }
+        if not outputs:
+            if os.path.exists(report_path):
+                os.remove(report_path)
+            return None
+
+        report = RepairReport(owner, save_path)
+        for file_index, output in outputs.items():
+            for key_num in output['spans']:
+                reason = failure_reasons.get((file_index, key_num), "결과 누락")
+                report.add_failure(file_index, key_num, reason)
+        if self.config.get('repair_enabled', True):
+            chunk_texts = self._failed_chunk_texts(job_info, report.keys(), model_id)
+            for file_index, key_num in report.keys():
+                if (file_index, key_num) not in chunk_texts:
+                    report.set_status(file_index, key_num, SKIPPED, error="원문 청크를 찾을 수 없습니다.")
+            if len(chunk_texts) <= self.config.get('repair_sync_max_chunks', 20):
+                self._repair_chunks_now(chunk_texts, outputs, job_info, model_id, report)
+            else:
+                self._submit_repair_job(owner, chunk_texts, outputs, job_info, model_id, report, report_path)
+        report.write(report_path)
+        logger.info(f"Repair report for '{owner}' written to '{report_path}': {report.describe()}.")
+        return report
+
+    def _failed_chunk_texts(self, job_info, failed_keys, model_id):
+        """
+        실패한 청크들의 원문을 {(파일 번호, 청크 번호): 텍스트}로 반환합니다.
+        원문 스냅샷이 있으면 제출할 때의 청크 경계를 그대로 쓰고, 없으면 소스 파일을 다시 나눕니다.
+        다시 나눈 청크는 제출할 때의 청크 목록(캐시 키 = 설정과 청크 텍스트의 해시)과 청크 수와 해시가 모두 같아야 쓰며,
+        청크 목록이 없거나 (번역 캐시를 끈 작업) 소스/분할 설정/요청 설정이 바뀌어 맞지 않는 청크는
+        엉뚱한 원문으로 결과를 덮어쓰지 않도록 복구하지 않습니다.
+        """
+        needed = {}
+        for file_index, key_num in failed_keys:
+            needed.setdefault(file_index, set()).add(key_num)
+        source_files, manifests = self._job_files(job_info)
+        namespace = None
+        texts = {}
+        for file_index, keys in needed.items():
+            snapshot = job_info.get('snapshot') if not job_info.get('source_files') else None
+            manifest = manifests.get(file_index)
+            if snapshot and os.path.exists(snapshot) and job_info.get('chunk_lengths'):
+                with gzip.open(snapshot, 'rt', encoding='utf-8') as f:
+                    texts.update(
+                        ((file_index, key_num), chunk)
+                        for key_num, chunk in enumerate(iter_chunk_texts(f.read(), job_info['chunk_lengths']), 1)
+                        if key_num in keys and chunk
+                    )
+                continue
+            if not source_files.get(file_index) or not os.path.exists(source_files[file_index]):
+                logger.warning(f"The source of file {file_index} is gone. Its failed chunks cannot be repaired.")
+                continue
+            if not manifest:
+                logger.warning(f"File {file_index} has no source snapshot or chunk list to verify a re-split source against. Its failed chunks are not repaired.")
+                continue
+            if namespace is None:
+                namespace = self._cache_namespace(model_id, self._request_settings())
+            found = {}
+            mismatched = 0
+            chunk_count = 0
+            for chunk_count, chunk in enumerate(self._iter_source_chunks(source_files[file_index], model_id), 1):
+                if chunk_count in keys and chunk:
+                    if chunk_count <= len(manifest) and TranslationCache.make_key(namespace, chunk) == manifest[chunk_count - 1]:
+                        found[(file_index, chunk_count)] = chunk
+                    else:
+                        mismatched += 1
+            if chunk_count != len(manifest):
+                logger.warning(f"Source of file {file_index} now splits into {chunk_count} chunks instead of {len(manifest)}. Its failed chunks are not repaired.")
+                continue
+            if mismatched:
+                logger.warning(f"{mismatched} failed chunks of file {file_index} no longer match the submitted text or settings and are not repaired.")
+            texts.update(found)
+        return texts
+
+    def _repair_chunks_now(self, chunk_texts, outputs, job_info, model_id, report):
+        """실패한 청크들을 repair_concurrency개까지 동시에 동기 호출로 다시 번역하고 결과 파일에 반영합니다."""
+        if not chunk_texts:
+            return
+        # 청크 전체가 다시 실패하면 문장/줄 경계에서 나눠 두 조각을 동시에 시도 (API 호출은 repair_concurrency개까지)
+        settings = self._request_settings()
+        engine = ChunkRetryEngine(
+            lambda text: self._generate_text(model_id, settings, text),
+            max_concurrency=self.config.get('repair_concurrency', 4),
+            min_length=self.config.get('repair_min_chunk_chars', 50),
+            deadline_seconds=self.config.get('repair_deadline_seconds', 600),
+        )
+        logger.info(f"Repairing {len(chunk_texts)} failed chunks with up to {self.config.get('repair_concurrency', 4)} concurrent requests.")
+        repaired = {}
+        for key, result in engine.retry_many(chunk_texts).items():
+            repaired[key] = result.text
+            if result.succeeded:
+                report.set_status(*key, REPAIRED)
+            else:
+                report.set_status(*key, PARTIAL, failed_pieces=result.failed_pieces)
+        logger.info(f"Repair used {engine.calls} requests ({engine.memo_hits} repeated pieces reused).")
+        self._patch_repaired_chunks(outputs, repaired, self._repair_cache_keys(job_info, repaired), report)
+
+    def _repair_cache_keys(self, job_info, keys):
+        """청크들의 번역 캐시 키를 {(파일 번호, 청크 번호): 캐시 키}로 반환합니다 (청크 목록이 없는 청크는 제외)."""
+        _, manifests = self._job_files(job_info)
+        return {
+            (file_index, key_num): manifests[file_index][key_num - 1] for file_index, key_num in keys
+            if key_num <= len(manifests.get(file_index) or [])
         }
 
+    def _patch_repaired_chunks(self, outputs, repaired, cache_keys, report):
+        """다시 번역한 청크를 결과 파일의 실패 표시 자리에 넣고, 완전히 복구된 번역은 번역 캐시에 저장합니다."""
+        for file_index, output in outputs.items():
+            replacements = {key_num: text for (f, key_num), text in repaired.items() if f == file_index}
+            if replacements:
+                patched = patch_output(output['path'], output['spans'], replacements)
+                logger.info(f"{patched} repaired chunks written to '{output['path']}'.")
+        cache = self._get_translation_cache()
+        if cache:
+            cache.put_many([
+                (cache_keys[key], text) for key, text in repaired.items()
+                if key in cache_keys and report.entries[key]['status'] == REPAIRED
+            ])
+
+    def _submit_repair_job(self, owner, chunk_texts, outputs, job_info, model_id, report, report_path):
+        """실패한 청크만 원래 결과 키로 담은 복구용 배치 작업을 제출합니다. 적용에 필요한 정보는 작업 추적 정보에 저장합니다."""
+        settings = self._request_settings()
+        multi_file = bool(job_info.get('source_files'))
+        source_file = job_info.get('source_file') or next(iter(self._job_files(job_info)[0].values()), None)
+        template = RequestLineTemplate(lambda chunk: self._build_request(model_id, settings, chunk))
+        staging = self._new_request_staging(f"repair-{os.path.splitext(os.path.basename(source_file or owner))[0]}")
+        details = {
+            'repair_of': owner,
+            'repair_report': report_path,
+            'repair_outputs': {
+                file_index: {
+                    'path': output['path'], 'size': os.path.getsize(output['path']),
+                    'mtime_ns': os.stat(output['path']).st_mtime_ns,
+                    'span_sha256': span_digest(output['path'], output['spans']), 'spans': output['spans'],
+                }
+                for file_index, output in outputs.items()
+            },
+            'repair_cache_keys': [
+                [file_index, key_num, cache_key]
+                for (file_index, key_num), cache_key in self._repair_cache_keys(job_info, chunk_texts).items()
+            ],
+        }
+        logger.info(f"Submitting a repair batch job for {len(chunk_texts)} failed chunks of '{owner}'.")
         try:
-            # Try to translate the whole chunk synchronously
-            response = self.client.generate_content(
-                model=model_id,
-                **sync_request
+            with staging as f_out:
+                for (file_index, key_num), text in sorted(chunk_texts.items()):
+                    key = f"file_{file_index}/chunk_{key_num}" if multi_file else f"chunk_{key_num}"
+                    f_out.write(template.render(key, text).encode('utf-8'))
+            batch_job = self._submit_requests_file(
+                staging, model_id, f"repair-{os.path.basename(source_file or owner)}",
+                {'source_file': source_file, 'details': details}
             )
-            logger.info(f"Successfully translated a sub-chunk: '{text_to_translate[:30]}...' ")
-            return response.text
+            self.job_tracker.add_job(batch_job.name, source_file, **details)
+        except UploadInterruptedError as e:
+            logger.error(f"The repair job upload was interrupted and will resume on the next start: {e}", exc_info=True)
+            for key in chunk_texts:
+                report.set_status(*key, PENDING, error="업로드가 중단되어 다음 실행에서 이어서 제출합니다.")
+            return
         except Exception as e:
-            logger.warning(f"Sub-chunk failed, splitting in half. Error: {e}. Text: '{text_to_translate[:30]}...' ")
-            # If it fails, split and recurse
-            mid = len(text_to_translate) // 2
-            first_half = text_to_translate[:mid]
-            second_half = text_to_translate[mid:]
-            
-            translated_first = self._retry_chunk_with_divide_and_conquer(first_half, original_request)
-            translated_second = self._retry_chunk_with_divide_and_conquer(second_half, original_request)
-            
-            return translated_first + translated_second
+            logger.error(f"Failed to submit the repair job for '{owner}': {e}", exc_info=True)
+            for key in chunk_texts:
+                report.set_status(*key, FAILED, error=str(e))
+            return
+        finally:
+            staging.cleanup()
+        report.repair_job = batch_job
+        for key in chunk_texts:
+            report.set_status(*key, PENDING, repair_job=batch_job.name)
+
+    def ready_repair_jobs(self):
+        """성공했지만 아직 결과 파일에 반영하지 않은 복구용 배치 작업 이름 목록을 반환합니다."""
+        return [
+            job_name for job_name, info in self.job_tracker.list_repair_jobs(unapplied_only=True).items()
+            if info.get('state') == 'SUCCEEDED'
+        ]
+
+    def apply_repair_job(self, job_name):
+        """
+        복구용 배치 작업의 결과를 내려받아 원래 결과 파일의 실패 표시 자리에 넣고 복구 보고서를 갱신합니다.
+        결과 파일이 복구 작업을 제출한 뒤에 바뀌었으면 (크기나 수정 시각이 다르거나, 실패 표시 범위의 바이트 해시가 제출할 때와 다름)
+        수정본 재번역이나 다시 내려받은 결과, 사용자가 고친 내용을 덮어쓰지 않도록 그 파일은 건너뜁니다.
+        갱신한 보고서를 반환합니다.
+        """
+        info = self.job_tracker.get_job(job_name)
+        if not info.get('repair_of'):
+            raise ValueError(f"'{job_name}' is not a repair job.")
+        job = self.client.batches.get(name=job_name)
+        if normalize_job_state(job.state.name) != 'SUCCEEDED':
+            raise ValueError(f"Repair job '{job_name}' has not succeeded yet.")
+
+        report_path = info['repair_report']
+        if os.path.exists(report_path):
+            report = RepairReport.load(report_path)
+        else:
+            report = RepairReport(info['repair_of'], None)
+        repaired = {}
+        with self._spool_results([job]) as spool:
+            for file_index, key_num, text, succeeded in iter_results(iter_result_lines(spool)):
+                if succeeded:
+                    repaired[(file_index, key_num)] = text
+                    report.set_status(file_index, key_num, REPAIRED)
+                else:
+                    report.set_status(file_index, key_num, FAILED, error=failure_reason(text))
+        for key in report.keys(PENDING):
+            if key not in repaired:
+                report.set_status(*key, FAILED, error="복구 작업 결과에 없습니다.")
+
+        outputs = {}
+        for file_index, output in info['repair_outputs'].items():
+            file_index = int(file_index)
+            spans = {int(key_num): tuple(span) for key_num, span in output['spans'].items()}
+            if not self._repair_output_unchanged(output, spans):
+                logger.warning(f"'{output['path']}' changed after the repair job was submitted. Its repaired chunks are not applied.")
+                for key in list(repaired):
+                    if key[0] == file_index:
+                        report.set_status(*key, FAILED, error="결과 파일이 바뀌어 반영하지 못했습니다.")
+                        del repaired[key]
+                continue
+            outputs[file_index] = {'path': output['path'], 'spans': spans}
+        cache_keys = {(file_index, key_num): cache_key for file_index, key_num, cache_key in info.get('repair_cache_keys', [])}
+        self._patch_repaired_chunks(outputs, repaired, cache_keys, report)
+        report.write(report_path)
+        self.job_tracker.update_job(job_name, output_file=report_path)
+        logger.info(f"Repair job '{job_name}' applied: {report.describe()}.")
+        return report
+
+    @staticmethod
+    def _repair_output_unchanged(output, spans):
+        """
+        복구 작업을 제출할 때 기록한 결과 파일의 크기, 수정 시각(ns), 실패 표시 범위 해시가 지금도 모두 같으면 True.
+        빈 응답의 실패 표시는 길이가 0이라 해시로는 바뀐 내용을 알 수 없으므로 수정 시각도 함께 확인합니다.
+        """
+        path = output['path']
+        if not os.path.exists(path) or not output.get('mtime_ns') or not output.get('span_sha256'):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != output['size'] or stat.st_mtime_ns != output['mtime_ns']:
+            return False
+        return span_digest(path, spans) == output['span_sha256']
 
     def download_and_process_results(self, job, save_path):
-        """결과 파일을 다운로드하여 파싱하고 최종 텍스트 파일로 저장합니다."""
-        result_file_name = job.dest.file_name
-        logger.info(f"결과가 파일에 저장되었습니다: {result_file_name}")
+        """
+        결과 파일을 다운로드하여 파싱하고 최종 텍스트 파일로 저장합니다.
+        분산 제출의 파트이면 그룹의 모든 파트 결과를 합쳐 저장합니다.
+        실패한 청크가 있었으면 복구 보고서(RepairReport)를 반환합니다. 복구용 배치 작업을 제출했으면 report.repair_job입니다.
+        """
+        job_info = self.job_tracker.get_job(job.name)
+        if job_info.get('fanout_group'):
+            self.merge_fanout_group(job_info['fanout_group'], save_path)
+            return None
+        report = self._process_results([job], job_info, save_path)
+        self.job_tracker.update_job(job.name, output_file=save_path)
+        return report
+
+    def _spool_results(self, jobs):
+        """
+        작업들의 결과 파일을 차례로 임시 파일(spool)에 내려받아, 처음 위치로 되감은 바이너리 파일 객체를 반환합니다.
+        API 키로 만든 SDK 클라이언트이면 HTTP로 블록 단위 스트리밍하므로 결과 파일 전체를 메모리에 올리지 않습니다.
+        인라인 요청 작업은 결과 파일 대신 작업 객체의 인라인 응답을 같은 형식으로 씁니다.
+        """
+        spool = tempfile.TemporaryFile()
+        try:
+            for job in jobs:
+                if getattr(job.dest, 'inlined_responses', None) is not None:
+                    self._spool_inline_results(job, spool)
+                    continue
+                result_file_name = job.dest.file_name
+                logger.info(f"결과가 파일에 저장되었습니다: {result_file_name}")
+                if self._client_from_api_key:
+                    download_file(result_file_name, self.config.get('gemini_api_key'), spool,
+                                  download_url=self.config.get('download_url', DOWNLOAD_URL))
+                else:
+                    spool.write(self.client.files.download(file=result_file_name))
+                # 파일 경계에서 줄이 이어 붙지 않도록
+                spool.write(b"\n")
+            spool.seek(0)
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+
+    def _spool_inline_results(self, job, spool):
+        """
+        인라인 요청 작업의 결과(dest.inlined_responses)를 결과 파일과 같은 형식의 JSONL 라인으로 spool에 씁니다.
+        응답은 요청 순서대로 오므로 제출할 때 저장한 키 목록(inline_keys)으로 키를 붙입니다.
+        """
+        responses = job.dest.inlined_responses
+        keys = self.job_tracker.get_job(job.name).get('inline_keys') or []
+        if len(keys) != len(responses):
+            raise ValueError(f"Job '{job.name}' returned {len(responses)} inline responses for {len(keys)} tracked requests.")
+        logger.info(f"결과를 인라인 응답에서 읽습니다: {job.name} ({len(responses)}개)")
+        for key, inlined in zip(keys, responses):
+            line = {'key': key}
+            if inlined.response is not None:
+                line['response'] = _response_dict(inlined.response)
+            else:
+                line['error'] = _response_dict(inlined.error) or {}
+            spool.write(json.dumps(line, ensure_ascii=False).encode('utf-8'))
+            spool.write(b"\n")
+
+    def _process_results(self, jobs, job_info, save_path, owner=None):
+        """
+        작업들의 결과를 임시 파일로 내려받아 한 줄씩 파싱하면서, 성공한 번역은 번역 캐시에 저장하고
+        job_info의 청크 목록에 따라 청크 순서대로 결과 파일에 바로 씁니다.
+        실패 표시가 들어간 청크는 복구 단계(_repair_results)에서 다시 번역합니다.
+        복구 보고서(RepairReport, 실패한 청크가 없으면 None)를 반환합니다. owner는 보고서에 남길 작업 이름입니다.
+        """
         logger.info("결과 파일 다운로드 및 파싱 중...")
-        
         try:
-            file_content_bytes = self.client.files.download(file=result_file_name)
-            file_content = file_content_bytes.decode('utf-8')
+            spool = self._spool_results(jobs)
         except Exception as e:
             logger.error(f"결과 파일 다운로드 중 오류 발생: {e}", exc_info=True)
+            return None
+
+        # 결과의 usage_metadata로 토큰 추정기를 보정 (토큰 예산 분할 모드의 정확도 향상)
+        estimator = None
+        prompt_tokens = None
+        if self.config.get('token_estimator_calibration', True):
+            estimator = TokenEstimator.for_model(getattr(jobs[0], 'model', None) or self.config.get('model_name', 'gemini-2.5-flash'))
+            prompt_tokens = {}
+
+        source_files, manifests = self._job_files(job_info)
+        cache = self._get_translation_cache() if any(manifests.values()) else None
+
+        if job_info.get('source_files'):
+            # 여러 파일을 묶은 작업: save_path 폴더에 소스 파일별 결과 파일을 씀
+            os.makedirs(save_path, exist_ok=True)
+            output_paths = self._multi_file_output_paths(source_files, save_path)
+        else:
+            output_paths = {0: save_path}
+        writers = {}
+        max_keys = {}
+        cache_batch = []
+        failure_reasons = {}
+        try:
+            for file_index, output_path in output_paths.items():
+                logger.info(f"결과를 '{output_path}' 파일에 저장합니다.")
+                writers[file_index] = StitchedOutputWriter(output_path, manifests.get(file_index, []), cache)
+            with spool:
+                for file_index, key_num, text, succeeded in iter_results(iter_result_lines(spool), prompt_tokens, max_keys):
+                    writer = writers.get(file_index)
+                    if writer:
+                        writer.add(key_num, text, failed=not succeeded)
+                    if not succeeded:
+                        failure_reasons[(file_index, key_num)] = failure_reason(text)
+                    # 성공한 번역은 캐시에 저장하여 다음 실행에서 재사용
+                    manifest = manifests.get(file_index, [])
+                    if cache and succeeded and key_num <= len(manifest):
+                        cache_batch.append((manifest[key_num - 1], text))
+                        if len(cache_batch) >= CACHE_WRITE_BATCH:
+                            cache.put_many(cache_batch)
+                            cache_batch = []
+            if cache:
+                cache.put_many(cache_batch)
+            for file_index, writer in writers.items():
+                writer.finish(max(max_keys.get(file_index, 0), len(manifests.get(file_index, []))))
+        except BaseException:
+            for writer in writers.values():
+                writer.abort()
+            raise
+
+        if estimator:
+            self._calibrate_estimator(estimator, job_info, prompt_tokens)
+        if cache:
+            cache.log_stats("result stitching")
+        reorder_peak = max((writer.peak_pending for writer in writers.values()), default=0)
+        logger.info(f"모든 작업이 완료되었습니다. (재정렬 버퍼 최대 {reorder_peak}개 청크)")
+
+        model_id = (getattr(jobs[0], 'model', None) or self.config.get('model_name', 'gemini-2.5-flash')).removeprefix('models/')
+        return self._repair_results(owner or jobs[0].name, job_info, save_path, writers, failure_reasons, model_id)
+
+    def _calibrate_estimator(self, estimator, job_info, prompt_tokens):
+        """
+        원문 스냅샷의 소스 청크와 결과의 입력 토큰 수로 토큰 추정기를 보정하고 저장합니다.
+        스냅샷이 없는 작업(여러 파일을 묶은 작업, 스냅샷이 지워진 작업)은 보정하지 않습니다.
+        """
+        snapshot = job_info.get('snapshot') if not job_info.get('source_files') else None
+        if not prompt_tokens or not snapshot or not os.path.exists(snapshot) or not job_info.get('chunk_lengths'):
             return
-            
-        translations = {}
-        max_key = 0
-        for line in file_content.splitlines():
-            if not line:
-                continue
-                        
-            try:
-                parsed_response = json.loads(line)
-                key_num = int(parsed_response['key'].split('_')[1])
-                max_key = max(max_key, key_num)
-                full_response_str = json.dumps(parsed_response, indent=2, ensure_ascii=False)
-
-                if 'response' in parsed_response and parsed_response['response'].get('candidates'):
-                    candidate = parsed_response['response']['candidates'][0]
-                    finish_reason = candidate.get('finish_reason', 'UNKNOWN')
-                                        
-                    if finish_reason == "SAFETY":
-                        translations[key_num] = f"[번역 차단됨 (SAFETY) - 전체 응답 객체:]\n{full_response_str}"
-                        logger.error(f"문단 {key_num} 처리 실패/차단됨: Finish reason was SAFETY.")
-                    else:
-                        translations[key_num] = candidate.get('content', {}).get('parts', [{}])[0].get('text', '[번역 내용 없음]')
-                                
-                elif 'response' in parsed_response:
-                    translations[key_num] = f"[번역 차단됨 (Candidates 없음) - 전체 응답 객체:]\n{full_response_str}"
-                    feedback = parsed_response['response'].get('prompt_feedback', {})
-                    logger.error(f"문단 {key_num} 처리 실패/차단됨: Candidates 리스트가 비어있습니다. Feedback: {feedback}")
-                
-                else:
-                    translations[key_num] = f"[번역 실패 (No Response) - 전체 응답 객체:]\n{full_response_str}"
-                    error_message = parsed_response.get('error', {}).get('message', '알 수 없는 오류')
-                    logger.error(f"문단 {key_num} 처리 실패/차단됨: {error_message}")
+        try:
+            with gzip.open(snapshot, 'rt', encoding='utf-8') as f:
+                chunks = iter_chunk_texts(f.read(), job_info['chunk_lengths'])
+                samples = [(chunk, prompt_tokens[(0, key_num)]) for key_num, chunk in enumerate(chunks, 1) if (0, key_num) in prompt_tokens]
+        except OSError as e:
+            logger.warning(f"Could not read snapshot '{snapshot}' for token calibration: {e}")
+            return
+        estimator.observe_prompts(samples)
+        estimator.save_calibration()
 
-            except (json.JSONDecodeError, KeyError, IndexError, ValueError) as e:
-                key_str = f"'{line.split(',')[0]}'" if ',' in line else "알 수 없는 키"
-                max_key += 1 
-                translations[max_key] = f"[결과 라인 파싱 오류 - 원본 라인:]\n{line}"
-                logger.warning(f"{key_str}에 해당하는 결과 라인 파싱 중 예외 발생: {e}")
+    def _job_files(self, job_info):
+        """추적 정보에서 ({파일 번호: 소스 경로}, {파일 번호: 청크 캐시 키 목록})을 만듭니다."""
+        if job_info.get('source_files'):
+            source_files = {int(k): v for k, v in job_info['source_files'].items()}
+            manifests = {int(k): v for k, v in (job_info.get('chunks_by_file') or {}).items()}
+            return source_files, manifests
+        return {0: job_info.get('source_file')}, {0: job_info.get('chunks') or []}
 
+    def _multi_file_output_paths(self, source_files, output_dir):
+        """소스 파일별 결과 파일 경로를 만듭니다. 이름이 겹치면 파일 번호를 붙입니다."""
+        paths = {}
+        used = set()
+        for file_index in sorted(source_files):
+            stem = os.path.splitext(os.path.basename(source_files[file_index] or f"file_{file_index}"))[0]
+            name = f"{stem}_translated.txt"
+            if name in used:
+                name = f"{stem}_{file_index}_translated.txt"
+            used.add(name)
+            paths[file_index] = os.path.join(output_dir, name)
+        return paths
+
+    def _write_stitched_output(self, save_path, translations, manifest, total_chunks):
+        """
+        청크 번호 순서대로 최종 파일을 씁니다.
+        이번 결과에 없는 청크는 manifest의 캐시 키로 번역 캐시에서 가져옵니다.
+        """
+        cache = self._get_translation_cache() if manifest else None
         logger.info(f"결과를 '{save_path}' 파일에 저장합니다.")
-        with open(save_path, 'w', encoding='utf-8') as f:
-            for i in range(1, max_key + 1):
-                f.write(translations.get(i, f"[문단 {i} 결과 누락]"))
-                f.write("\n\n")
-                
-        logger.info("모든 작업이 완료되었습니다.")
+        writer = StitchedOutputWriter(save_path, manifest, cache)
+        try:
+            for key in sorted(translations):
+                writer.add(key, translations[key])
+            writer.finish(total_chunks)
+        except BaseException:
+            writer.abort()
+            raise
+        if cache:
+            cache.log_stats("result stitching")
 
     def delete_batch_job(self, job_name):
         if not self.client:
             raise ValueError("API client is not initialized.")
         self.client.batches.delete(name=job_name)
+        job_info = self.job_tracker.get_job(job_name)
+        group_id = job_info.get('fanout_group')
         # Also remove from tracker
         self.job_tracker.remove_job(job_name)
+        if group_id:
+            # 분산 제출 그룹의 공유 리소스는 마지막 파트가 삭제될 때 정리
+            if not self.job_tracker.get_group_jobs(group_id):
+                self._release_job_resources(self.job_tracker.get_group(group_id))
+                self.job_tracker.remove_group(group_id)
+        else:
+            # Release the cached chunks and the source snapshot this job was relying on
+            self._release_job_resources(job_info)
         logger.info(f"Job '{job_name}' deleted from API and tracker.")
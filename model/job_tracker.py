@@ -1,44 +1,419 @@
 import json
 import os
 import logging
+import sqlite3
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+TRACKER_FILE = 'job_tracker.db'
+LEGACY_TRACKER_FILE = 'job_tracker.json'
+
+# 자주 조회/검색하는 정보는 열로, 큰 청크 목록은 manifests 테이블로, 나머지는 details(JSON)에 저장
+JOB_COLUMNS = ('source_file', 'output_file', 'fanout_group', 'fanout_part', 'state')
+GROUP_COLUMNS = ('source_file', 'save_path', 'merged_output', 'part_count')
+MANIFEST_FIELDS = ('chunks', 'chunk_lengths', 'chunks_by_file', 'inline_keys')
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_name TEXT PRIMARY KEY,
+        source_file TEXT,
+        output_file TEXT,
+        fanout_group TEXT,
+        fanout_part INTEGER,
+        state TEXT,
+        details TEXT NOT NULL DEFAULT '{}',
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_group ON jobs(fanout_group, fanout_part);
+    CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source_file);
+    CREATE TABLE IF NOT EXISTS groups (
+        group_id TEXT PRIMARY KEY,
+        source_file TEXT,
+        save_path TEXT,
+        merged_output TEXT,
+        part_count INTEGER,
+        details TEXT NOT NULL DEFAULT '{}',
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_groups_merged ON groups(merged_output);
+    CREATE TABLE IF NOT EXISTS manifests (
+        owner_kind TEXT NOT NULL,
+        owner TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (owner_kind, owner)
+    );
+    CREATE TABLE IF NOT EXISTS job_status (
+        job_name TEXT PRIMARY KEY,
+        display_name TEXT,
+        state TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        list_position INTEGER,
+        checked_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_status_position ON job_status(list_position);
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+
+def _split_details(details, columns):
+    """세부 정보를 (열 값, 청크 목록 값, 나머지) 세 딕셔너리로 나눕니다."""
+    column_values, manifest, extra = {}, {}, {}
+    for key, value in details.items():
+        if key in columns:
+            column_values[key] = value
+        elif key in MANIFEST_FIELDS:
+            manifest[key] = value
+        else:
+            extra[key] = value
+    return column_values, manifest, extra
+
+
 class JobTracker:
-    def __init__(self, tracker_file='job_tracker.json'):
+    """
+    제출한 작업(소스/출력 경로, 청크 목록, 분산 제출 그룹, 마지막 상태와 시각)을 SQLite(WAL)에 저장합니다.
+    변경은 트랜잭션 단위로 기록되므로 쓰는 도중 종료되어도 파일이 깨지지 않고, 작업 수와 관계없이
+    작업 이름/그룹으로 인덱스 조회합니다. 이전 형식의 job_tracker.json은 처음 열 때 한 번 가져옵니다.
+    """
+
+    def __init__(self, tracker_file=TRACKER_FILE, legacy_file=LEGACY_TRACKER_FILE):
         self.tracker_file = tracker_file
-        self.jobs = self._load()
+        # 작업 추가/삭제가 여러 스레드에서 동시에 일어날 수 있으므로 연결 사용을 직렬화
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(tracker_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._migrate_json(legacy_file)
 
-    def _load(self):
-        if not os.path.exists(self.tracker_file):
-            return {}
+    def _migrate_json(self, legacy_file):
+        """이전 형식의 JSON 파일을 한 번만 가져옵니다 (원본 파일은 그대로 둠)."""
+        if not legacy_file or not os.path.exists(legacy_file):
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return
         try:
-            with open(self.tracker_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            logger.warning(f"Could not read or parse job tracker file: {self.tracker_file}")
-            return {}
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Could not read or parse legacy job tracker file '{legacy_file}': {e}")
+            return
+        # 초기 형식은 {작업 이름: 정보}; 작업 이름은 항상 'batches/'로 시작하므로 {'jobs', 'groups'} 형식과 겹치지 않음
+        if isinstance(data.get('jobs'), dict) and isinstance(data.get('groups'), dict):
+            jobs, groups = data['jobs'], data['groups']
+        else:
+            jobs, groups = data, {}
+        now = time.time()
+        with self._lock, self._conn:
+            for group_id, details in groups.items():
+                self._write_group(group_id, details, now, now)
+            for job_name, details in jobs.items():
+                details = dict(details)
+                self._write_job(job_name, details.pop('source_file', None), details, now, now)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (legacy_file,))
+        logger.info(f"Migrated {len(jobs)} jobs and {len(groups)} job groups from '{legacy_file}' to '{self.tracker_file}'.")
 
-    def _save(self):
-        try:
-            with open(self.tracker_file, 'w', encoding='utf-8') as f:
-                json.dump(self.jobs, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Failed to save job tracker file: {e}", exc_info=True)
-
-    def add_job(self, job_name, source_file_path):
-        """Adds a new job and its source file to the tracker."""
-        self.jobs[job_name] = {'source_file': source_file_path}
-        self._save()
+    # --- 행 읽기/쓰기 (호출하는 쪽에서 잠금과 트랜잭션을 잡음) ---
+
+    def _write_manifest(self, owner_kind, owner, manifest):
+        if manifest:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO manifests (owner_kind, owner, data) VALUES (?, ?, ?)",
+                (owner_kind, owner, json.dumps(manifest, ensure_ascii=False))
+            )
+
+    def _read_manifest(self, owner_kind, owner):
+        row = self._conn.execute(
+            "SELECT data FROM manifests WHERE owner_kind = ? AND owner = ?", (owner_kind, owner)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _write_job(self, job_name, source_file, details, created_at, updated_at, replace_manifest=True):
+        column_values, manifest, extra = _split_details(details, JOB_COLUMNS)
+        column_values['source_file'] = source_file
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO jobs (job_name, {', '.join(JOB_COLUMNS)}, details, created_at, updated_at) "
+            f"VALUES (?, {', '.join('?' * len(JOB_COLUMNS))}, ?, ?, ?)",
+            (job_name, *(column_values.get(c) for c in JOB_COLUMNS),
+             json.dumps(extra, ensure_ascii=False), created_at, updated_at)
+        )
+        if replace_manifest:
+            self._conn.execute("DELETE FROM manifests WHERE owner_kind = 'job' AND owner = ?", (job_name,))
+            self._write_manifest('job', job_name, manifest)
+
+    def _write_group(self, group_id, details, created_at, updated_at, replace_manifest=True):
+        column_values, manifest, extra = _split_details(details, GROUP_COLUMNS)
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO groups (group_id, {', '.join(GROUP_COLUMNS)}, details, created_at, updated_at) "
+            f"VALUES (?, {', '.join('?' * len(GROUP_COLUMNS))}, ?, ?, ?)",
+            (group_id, *(column_values.get(c) for c in GROUP_COLUMNS),
+             json.dumps(extra, ensure_ascii=False), created_at, updated_at)
+        )
+        if replace_manifest:
+            self._conn.execute("DELETE FROM manifests WHERE owner_kind = 'group' AND owner = ?", (group_id,))
+            self._write_manifest('group', group_id, manifest)
+
+    @staticmethod
+    def _row_info(columns, row):
+        """(열 값..., details, created_at, updated_at) 행을 정보 딕셔너리로 만듭니다 (값이 없는 열은 제외)."""
+        info = {column: value for column, value in zip(columns, row) if value is not None}
+        info.update(json.loads(row[len(columns)]))
+        return info
+
+    def _read_job(self, job_name, include_manifest=True):
+        row = self._conn.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)}, details, created_at, updated_at FROM jobs WHERE job_name = ?",
+            (job_name,)
+        ).fetchone()
+        if row is None:
+            return None
+        info = self._row_info(JOB_COLUMNS, row)
+        info.setdefault('source_file', None)
+        if include_manifest:
+            info.update(self._read_manifest('job', job_name))
+        return info, row[-2]
+
+    def _read_group(self, group_id, include_manifest=True):
+        row = self._conn.execute(
+            f"SELECT {', '.join(GROUP_COLUMNS)}, details, created_at, updated_at FROM groups WHERE group_id = ?",
+            (group_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        info = self._row_info(GROUP_COLUMNS, row)
+        if include_manifest:
+            info.update(self._read_manifest('group', group_id))
+        return info, row[-2]
+
+    # --- 작업 ---
+
+    def add_job(self, job_name, source_file_path, **details):
+        """Adds a new job and its source file to the tracker.
+
+        Extra keyword arguments (e.g. the chunk manifest) are stored with the job.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._write_job(job_name, source_file_path, details, now, now)
         logger.info(f"Job '{job_name}' tracked with source '{source_file_path}'.")
 
+    def get_job(self, job_name, include_manifest=True):
+        """Gets all tracked details for a given job name (empty dict if untracked).
+
+        include_manifest=False skips loading the (possibly large) chunk manifest.
+        """
+        with self._lock:
+            found = self._read_job(job_name, include_manifest)
+        return found[0] if found else {}
+
+    def update_job(self, job_name, **details):
+        """Updates stored details of a tracked job (ignored for untracked jobs)."""
+        # 상태 기록 같은 작은 변경마다 큰 청크 목록을 다시 쓰지 않도록, 청크 목록은 바뀔 때만 다시 씀
+        replace_manifest = any(key in MANIFEST_FIELDS for key in details)
+        with self._lock, self._conn:
+            found = self._read_job(job_name, include_manifest=replace_manifest)
+            if found is None:
+                return
+            info, created_at = found
+            info.update(details)
+            self._write_job(job_name, info.pop('source_file'), info, created_at, time.time(), replace_manifest)
+
     def get_source_file(self, job_name):
         """Gets the source file path for a given job name."""
-        return self.jobs.get(job_name, {}).get('source_file')
+        with self._lock:
+            row = self._conn.execute("SELECT source_file FROM jobs WHERE job_name = ?", (job_name,)).fetchone()
+        return row[0] if row else None
 
     def remove_job(self, job_name):
         """Removes a job from the tracker."""
-        if job_name in self.jobs:
-            del self.jobs[job_name]
-            self._save()
-            logger.info(f"Job '{job_name}' removed from tracker.")
+        with self._lock, self._conn:
+            if self._conn.execute("DELETE FROM jobs WHERE job_name = ?", (job_name,)).rowcount == 0:
+                return
+            self._conn.execute("DELETE FROM manifests WHERE owner_kind = 'job' AND owner = ?", (job_name,))
+            self._conn.execute("DELETE FROM job_status WHERE job_name = ?", (job_name,))
+        logger.info(f"Job '{job_name}' removed from tracker.")
+
+    def list_repair_jobs(self, unapplied_only=False):
+        """Returns {job name: details} of repair jobs (jobs with a 'repair_of' detail), without manifests.
+
+        unapplied_only=True skips repair jobs whose results were already written to the output (output_file set).
+        """
+        query = (
+            f"SELECT job_name, {', '.join(JOB_COLUMNS)}, details, created_at, updated_at FROM jobs "
+            "WHERE json_extract(details, '$.repair_of') IS NOT NULL"
+        )
+        if unapplied_only:
+            query += " AND output_file IS NULL"
+        with self._lock:
+            rows = self._conn.execute(query).fetchall()
+        return {row[0]: self._row_info(JOB_COLUMNS, row[1:]) for row in rows}
+
+    def list_jobs(self):
+        """Returns {job name: details} of all tracked jobs in submission order, without manifests."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_name, {', '.join(JOB_COLUMNS)}, details, created_at, updated_at FROM jobs ORDER BY created_at"
+            ).fetchall()
+        return {row[0]: self._row_info(JOB_COLUMNS, row[1:]) for row in rows}
+
+    # --- 분산 제출 그룹 ---
+
+    def add_group(self, group_id, **details):
+        """Adds a logical translation that is split across several batch jobs (its parts).
+
+        Parts are tracked as regular jobs whose 'fanout_group' detail is the group id.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._write_group(group_id, details, now, now)
+        logger.info(f"Job group '{group_id}' tracked with {details.get('part_count')} parts.")
+
+    def get_group(self, group_id):
+        """Gets all tracked details for a job group (empty dict if untracked)."""
+        with self._lock:
+            found = self._read_group(group_id)
+        return found[0] if found else {}
+
+    def update_group(self, group_id, **details):
+        """Updates stored details of a tracked job group (ignored for untracked groups)."""
+        replace_manifest = any(key in MANIFEST_FIELDS for key in details)
+        with self._lock, self._conn:
+            found = self._read_group(group_id, include_manifest=replace_manifest)
+            if found is None:
+                return
+            info, created_at = found
+            info.update(details)
+            self._write_group(group_id, info, created_at, time.time(), replace_manifest)
+
+    def remove_group(self, group_id):
+        """Removes a job group from the tracker (its part jobs are removed separately)."""
+        with self._lock, self._conn:
+            if self._conn.execute("DELETE FROM groups WHERE group_id = ?", (group_id,)).rowcount == 0:
+                return
+            self._conn.execute("DELETE FROM manifests WHERE owner_kind = 'group' AND owner = ?", (group_id,))
+        logger.info(f"Job group '{group_id}' removed from tracker.")
+
+    def list_groups(self, unmerged_only=False):
+        """Returns all tracked job groups as {group id: details}, without their chunk manifests."""
+        query = f"SELECT group_id, {', '.join(GROUP_COLUMNS)}, details, created_at, updated_at FROM groups"
+        if unmerged_only:
+            query += " WHERE merged_output IS NULL"
+        with self._lock:
+            rows = self._conn.execute(query).fetchall()
+        return {row[0]: self._row_info(GROUP_COLUMNS, row[1:]) for row in rows}
+
+    def get_group_jobs(self, group_id):
+        """Returns {job name: details} of the part jobs of a group, ordered by part number (without manifests)."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_name, {', '.join(JOB_COLUMNS)}, details, created_at, updated_at FROM jobs "
+                "WHERE fanout_group = ? ORDER BY fanout_part",
+                (group_id,)
+            ).fetchall()
+        return {row[0]: self._row_info(JOB_COLUMNS, row[1:]) for row in rows}
+
+    # --- 마지막으로 확인한 작업 상태 (시작 시 API 응답 전에 목록을 바로 보여 주기 위함) ---
+
+    def record_job_statuses(self, statuses, first_page=False):
+        """
+        API에서 받은 작업 상태들을 저장합니다. statuses는
+        {'job_name', 'display_name', 'state', 'create_time', 'update_time'}(시각은 ISO 문자열) 딕셔너리 목록입니다.
+        first_page이면 이 목록을 시작 시 보여 줄 첫 페이지로 기록합니다 (이전 첫 페이지 순서는 지움).
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if first_page:
+                self._conn.execute("UPDATE job_status SET list_position = NULL WHERE list_position IS NOT NULL")
+            for position, status in enumerate(statuses):
+                self._conn.execute(
+                    "INSERT INTO job_status (job_name, display_name, state, create_time, update_time, list_position, checked_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(job_name) DO UPDATE SET display_name = excluded.display_name, state = excluded.state, "
+                    "create_time = excluded.create_time, update_time = excluded.update_time, checked_at = excluded.checked_at, "
+                    "list_position = COALESCE(excluded.list_position, job_status.list_position)",
+                    (status['job_name'], status.get('display_name'), status.get('state'), status.get('create_time'),
+                     status.get('update_time'), position if first_page else None, now)
+                )
+
+    def load_job_list(self):
+        """마지막으로 기록한 첫 페이지의 작업 상태 목록을 순서대로 반환합니다 (source_file 포함)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.job_name, s.display_name, s.state, s.create_time, s.update_time, j.source_file "
+                "FROM job_status s LEFT JOIN jobs j ON j.job_name = s.job_name "
+                "WHERE s.list_position IS NOT NULL ORDER BY s.list_position"
+            ).fetchall()
+        keys = ('job_name', 'display_name', 'state', 'create_time', 'update_time', 'source_file')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == '__main__':
+    # 작업 N개(작업마다 청크 200개의 목록)를 추적할 때, 작업 하나를 추가/상태 기록하는 시간과
+    # 시작 시 작업 정보를 읽는 시간을 이전 방식(매번 JSON 전체 다시 쓰기)과 비교합니다.
+    import sys
+    import tempfile
+
+    job_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(tempfile.mkdtemp())
+    manifest = [f"{i:064x}" for i in range(200)]
+
+    jobs = {f"batches/{i}": {'source_file': f"/books/{i}.txt", 'chunks': manifest} for i in range(job_count)}
+    with open(LEGACY_TRACKER_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'jobs': jobs, 'groups': {}}, f, indent=4, ensure_ascii=False)
+
+    started = time.perf_counter()
+    tracker = JobTracker()
+    migrate_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(20):
+        jobs[f"batches/new{i}"] = {'source_file': "/books/new.txt", 'chunks': manifest}
+        with open('legacy_rewrite.json', 'w', encoding='utf-8') as f:
+            json.dump({'jobs': jobs, 'groups': {}}, f, indent=4, ensure_ascii=False)
+    json_add_ms = (time.perf_counter() - started) / 20 * 1000
+
+    started = time.perf_counter()
+    for i in range(20):
+        tracker.add_job(f"batches/new{i}", "/books/new.txt", chunks=manifest)
+    db_add_ms = (time.perf_counter() - started) / 20 * 1000
+
+    started = time.perf_counter()
+    for i in range(200):
+        tracker.update_job(f"batches/{i}", state='SUCCEEDED')
+    db_update_ms = (time.perf_counter() - started) / 200 * 1000
+
+    started = time.perf_counter()
+    with open(LEGACY_TRACKER_FILE, 'r', encoding='utf-8') as f:
+        json.load(f)
+    json_load_ms = (time.perf_counter() - started) * 1000
+
+    tracker.record_job_statuses([
+        {'job_name': f"batches/{i}", 'display_name': f"translation-{i}", 'state': 'JOB_STATE_SUCCEEDED',
+         'create_time': '2026-01-01T00:00:00', 'update_time': '2026-01-01T01:00:00'}
+        for i in range(50)
+    ], first_page=True)
+    tracker.close()
+    started = time.perf_counter()
+    tracker = JobTracker()
+    first_page = tracker.load_job_list()
+    tracker.get_source_file(f"batches/{job_count - 1}")
+    db_start_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{job_count} tracked jobs (one-time migration {migrate_seconds:.2f}s)")
+    print(f"add a job        : JSON rewrite {json_add_ms:8.1f} ms   SQLite {db_add_ms:6.2f} ms")
+    print(f"record a state   : JSON rewrite {json_add_ms:8.1f} ms   SQLite {db_update_ms:6.2f} ms")
+    print(f"startup          : JSON load    {json_load_ms:8.1f} ms   SQLite open + first page ({len(first_page)} rows) {db_start_ms:6.2f} ms")
@@ -0,0 +1,448 @@
+"""
+google-genai Client와 같은 호출 형태를 받는 로컬 대역(stand-in) 클라이언트입니다.
+
+네트워크 없이 GeminiApiService의 요청 생성, 업로드, 배치 작업, 컨텍스트 캐시 흐름을 실행하고
+업로드 바이트 수와 (추정) 입력 토큰 사용량을 측정하는 데 사용합니다.
+번역 결과는 responder 함수(기본값: 원문을 그대로 돌려줌)로 만듭니다.
+
+실행 예 (업로드 크기/토큰 절감 측정):
+    python -m model.local_client 소설.txt
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from .token_estimator import TokenEstimator
+
+logger = logging.getLogger(__name__)
+
+# 컨텍스트 캐시에서 읽은 입력 토큰의 과금 비율 (일반 입력 토큰 대비)
+CACHED_TOKEN_PRICE_RATIO = 0.25
+
+
+def _get(obj, name, default=None):
+    """dict와 SDK 설정 객체(pydantic 모델)를 같은 방식으로 읽습니다."""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def _contents_text(contents):
+    """Content 목록(dict 또는 SDK 객체)에서 텍스트만 이어 붙입니다."""
+    if contents is None:
+        return ""
+    if isinstance(contents, str):
+        return contents
+    if not isinstance(contents, list):
+        contents = [contents]
+    texts = []
+    for content in contents:
+        if isinstance(content, str):
+            texts.append(content)
+            continue
+        for part in _get(content, 'parts', None) or []:
+            texts.append(_get(part, 'text', "") or "")
+    return "".join(texts)
+
+
+class LocalUsage:
+    """로컬 클라이언트가 받은 요청의 사용량 집계입니다."""
+
+    def __init__(self):
+        self.upload_bytes = 0
+        self.requests = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+
+    @property
+    def billed_input_tokens(self):
+        """캐시 할인을 반영한, 일반 입력 토큰 기준의 과금 토큰 수입니다."""
+        return self.input_tokens + self.cached_input_tokens * CACHED_TOKEN_PRICE_RATIO
+
+    def as_dict(self):
+        return {
+            'upload_bytes': self.upload_bytes,
+            'requests': self.requests,
+            'input_tokens': self.input_tokens,
+            'cached_input_tokens': self.cached_input_tokens,
+            'billed_input_tokens': round(self.billed_input_tokens),
+            'output_tokens': self.output_tokens,
+        }
+
+
+class _LocalFiles:
+    def __init__(self, client):
+        self._client = client
+        self._files = {}
+
+    def upload(self, file, config=None):
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as f:
+                data = f.read()
+        else:
+            data = file.read()
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+        with self._client._lock:
+            name = f"files/local-{len(self._files) + 1}"
+            self._files[name] = data
+            self._client.usage.upload_bytes += len(data)
+        return SimpleNamespace(name=name, size_bytes=len(data), mime_type=_get(config, 'mime_type'))
+
+    def download(self, file):
+        return self._files[file]
+
+    def delete(self, name):
+        self._files.pop(name, None)
+
+    def _put(self, name, data):
+        self._files[name] = data
+
+
+class _LocalCaches:
+    def __init__(self, client):
+        self._client = client
+        self._caches = {}
+
+    def create(self, model, config=None):
+        text = _contents_text(_get(config, 'system_instruction')) + _contents_text(_get(config, 'contents'))
+        token_count = self._client.estimator.estimate(text)
+        with self._client._lock:
+            name = f"cachedContents/local-{len(self._caches) + 1}"
+            cached = SimpleNamespace(
+                name=name, model=model, display_name=_get(config, 'display_name'),
+                usage_metadata=SimpleNamespace(total_token_count=token_count),
+            )
+            self._caches[name] = cached
+            # 캐시 생성 시 프리픽스 토큰은 한 번 일반 입력으로 과금됨
+            self._client.usage.input_tokens += token_count
+        return cached
+
+    def get(self, name):
+        return self._caches[name]
+
+    def delete(self, name):
+        self._caches.pop(name, None)
+
+    def list(self, config=None):
+        return list(self._caches.values())
+
+
+class _LocalModels:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content(self, model, contents, config=None):
+        cached = _get(config, 'cached_content')
+        prefix = _contents_text(_get(config, 'system_instruction'))
+        response = self._client._respond(model, contents, prefix, cached)
+        return SimpleNamespace(
+            text=response['candidates'][0]['content']['parts'][0]['text'],
+            candidates=[SimpleNamespace(finish_reason=SimpleNamespace(name='STOP'))],
+            usage_metadata=SimpleNamespace(**response['usage_metadata']),
+        )
+
+    def generate_content_stream(self, model, contents, config=None):
+        """같은 응답을 단어 단위 조각으로 나눠 차례로 돌려줍니다 (마지막 조각에 finish_reason)."""
+        response = self.generate_content(model, contents, config)
+        pieces = re.findall(r'\S+\s*|\s+', response.text) or [""]
+        for i, piece in enumerate(pieces, 1):
+            yield SimpleNamespace(
+                text=piece,
+                candidates=response.candidates if i == len(pieces) else [SimpleNamespace(finish_reason=None)],
+            )
+
+
+class _LocalAioModels:
+    """client.aio.models: 같은 응답을 코루틴으로 돌려줍니다."""
+
+    def __init__(self, models):
+        self._models = models
+
+    async def generate_content(self, model, contents, config=None):
+        return self._models.generate_content(model, contents, config)
+
+
+class _LocalResponse:
+    """인라인 응답: SDK 응답 객체처럼 model_dump()로 응답 dict를 돌려줍니다."""
+
+    def __init__(self, response):
+        self._response = response
+        self.text = response['candidates'][0]['content']['parts'][0]['text']
+
+    def model_dump(self, mode='python', exclude_none=False):
+        return self._response
+
+
+class _LocalPager:
+    """SDK Pager처럼 현재 페이지(page)와 다음 페이지 토큰(config['page_token'])을 주고, 순회하면 남은 모든 항목을 돌려줍니다."""
+
+    def __init__(self, items, page_size, page_token=None):
+        self._items = items
+        self._offset = int(page_token or 0)
+        self.page = items[self._offset:self._offset + page_size]
+        next_offset = self._offset + page_size
+        self.config = {'page_size': page_size, 'page_token': str(next_offset) if next_offset < len(items) else None}
+
+    def __iter__(self):
+        return iter(self._items[self._offset:])
+
+
+class _LocalBatches:
+    def __init__(self, client):
+        self._client = client
+        self._jobs = {}
+        self._ready_at = {}
+        self._created = 0
+
+    def _refresh(self, job):
+        """job_latency로 정한 완료 시각이 지났으면 작업을 SUCCEEDED로 바꿉니다."""
+        ready_at = self._ready_at.get(job.name)
+        if ready_at is not None and self._client.clock() >= ready_at:
+            job.state = SimpleNamespace(name='JOB_STATE_SUCCEEDED')
+            job.update_time = datetime.now()
+            del self._ready_at[job.name]
+        return job
+
+    def create(self, model, src, config=None):
+        client = self._client
+        with client._lock:
+            # 동시에 제출해도 이름이 겹치지 않도록 작업을 등록하기 전에 번호를 잡아 둠
+            self._created += 1
+            name = f"batches/local-{self._created}"
+        if isinstance(src, list):
+            # 인라인 요청: 결과도 요청 순서대로 작업 객체에 담김 (업로드/결과 파일 없음)
+            results = []
+            for request in src:
+                config = _get(request, 'config')
+                prefix = _contents_text(_get(config, 'system_instruction'))
+                response = client._respond(model, _get(request, 'contents'), prefix, _get(config, 'cached_content'))
+                results.append(SimpleNamespace(response=_LocalResponse(response), error=None))
+            dest = SimpleNamespace(file_name=None, inlined_responses=results)
+        else:
+            results = []
+            for line in client.files.download(src).decode('utf-8').splitlines():
+                if not line:
+                    continue
+                entry = json.loads(line)
+                request = entry['request']
+                prefix = _contents_text(request.get('system_instruction'))
+                response = client._respond(model, request['contents'], prefix, request.get('cached_content'))
+                results.append(json.dumps({'key': entry['key'], 'response': response}, ensure_ascii=False))
+            result_file = f"files/local-result-{name.split('/')[-1]}"
+            client.files._put(result_file, "\n".join(results).encode('utf-8'))
+            dest = SimpleNamespace(file_name=result_file)
+
+        now = datetime.now()
+        latency = client.job_latency(len(results)) if client.job_latency else 0
+        job = SimpleNamespace(
+            name=name, display_name=_get(config, 'display_name', name), model=model,
+            state=SimpleNamespace(name='JOB_STATE_RUNNING' if latency > 0 else 'JOB_STATE_SUCCEEDED'),
+            create_time=now, update_time=now,
+            dest=dest,
+        )
+        with client._lock:
+            self._jobs[name] = job
+            if latency > 0:
+                self._ready_at[name] = client.clock() + latency
+        return job
+
+    def get(self, name):
+        with self._client._lock:
+            return self._refresh(self._jobs[name])
+
+    def list(self, config=None):
+        with self._client._lock:
+            jobs = [self._refresh(job) for job in reversed(list(self._jobs.values()))]
+        return _LocalPager(jobs, _get(config, 'page_size', 50), _get(config, 'page_token'))
+
+    def delete(self, name):
+        self._jobs.pop(name, None)
+
+
+class LocalGenaiClient:
+    """
+    genai.Client의 files / batches / caches / models (와 aio.models) 호출을 흉내 내는 로컬 클라이언트입니다.
+    배치 작업은 생성 즉시 SUCCEEDED 상태가 되며, 사용량은 self.usage에 집계됩니다.
+    job_latency(요청 수) -> 초 함수가 주어지면 작업은 그 시간 동안 RUNNING 상태로 있다가 SUCCEEDED가 됩니다.
+    clock으로 시간을 재는 함수를 바꿀 수 있습니다 (측정용 모의 시계).
+    """
+
+    def __init__(self, responder=None, model_name='gemini-2.5-flash', job_latency=None, clock=time.monotonic):
+        self.responder = responder or (lambda text: text)
+        self.job_latency = job_latency
+        self.clock = clock
+        self.estimator = TokenEstimator.for_model(model_name)
+        self.usage = LocalUsage()
+        self._lock = threading.Lock()
+        self.files = _LocalFiles(self)
+        self.caches = _LocalCaches(self)
+        self.models = _LocalModels(self)
+        self.aio = SimpleNamespace(models=_LocalAioModels(self.models))
+        self.batches = _LocalBatches(self)
+
+    def _respond(self, model, contents, prefix_text, cached_content):
+        """요청 하나의 응답(dict)을 만들고 토큰 사용량을 집계합니다."""
+        text = _contents_text(contents)
+        input_tokens = self.estimator.estimate(prefix_text + text)
+        cached_tokens = 0
+        if cached_content:
+            cached_tokens = self.caches.get(cached_content).usage_metadata.total_token_count
+        output = self.responder(_contents_text(contents[-1] if isinstance(contents, list) and contents else contents))
+        output_tokens = self.estimator.estimate(output)
+        with self._lock:
+            self.usage.requests += 1
+            self.usage.input_tokens += input_tokens
+            self.usage.cached_input_tokens += cached_tokens
+            self.usage.output_tokens += output_tokens
+        return {
+            'candidates': [{'content': {'parts': [{'text': output}], 'role': 'model'}, 'finish_reason': 'STOP'}],
+            'usage_metadata': {
+                'prompt_token_count': input_tokens + cached_tokens,
+                'cached_content_token_count': cached_tokens,
+                'candidates_token_count': output_tokens,
+            },
+        }
+
+
+class LocalUploadServer:
+    """
+    File API의 resumable 업로드 프로토콜(X-Goog-Upload-*)을 흉내 내는 로컬 HTTP 서버입니다.
+    drop_every번째 업로드 조각마다 일부만 받고 응답 없이 연결을 끊으며,
+    fail_after개 조각을 받은 뒤에는 모든 요청의 연결을 끊습니다 (네트워크 단절 흉내).
+    완료된 파일은 self.files에 저장되고, client(LocalGenaiClient)가 주어지면 그 files에도 등록됩니다.
+    """
+
+    def __init__(self, client=None, drop_every=0, fail_after=None):
+        self.client = client
+        self.drop_every = drop_every
+        self.fail_after = fail_after
+        self.files = {}
+        self.dropped = 0
+        self.chunks = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/upload/v1beta/files"
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status=200, headers=None, body=b''):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _disconnect(self):
+                server.dropped += 1
+                self.close_connection = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                command = self.headers.get('X-Goog-Upload-Command', '')
+                if server.fail_after is not None and server.chunks >= server.fail_after:
+                    return self._disconnect()
+                if command == 'start':
+                    session_id = uuid.uuid4().hex
+                    display_name = json.loads(body or b'{}').get('file', {}).get('display_name')
+                    with server._lock:
+                        server._sessions[session_id] = {'data': bytearray(), 'file': None, 'display_name': display_name}
+                    host, port = server._server.server_address
+                    return self._reply(headers={
+                        'X-Goog-Upload-URL': f"http://{host}:{port}/upload/session/{session_id}",
+                        'X-Goog-Upload-Status': 'active',
+                    })
+
+                session = server._sessions.get(self.path.rsplit('/', 1)[-1])
+                if session is None:
+                    return self._reply(404)
+                if command == 'query':
+                    status = 'final' if session['file'] else 'active'
+                    response = json.dumps({'file': session['file']}).encode('utf-8') if session['file'] else b''
+                    return self._reply(headers={
+                        'X-Goog-Upload-Status': status,
+                        'X-Goog-Upload-Size-Received': str(len(session['data'])),
+                    }, body=response)
+
+                if int(self.headers.get('X-Goog-Upload-Offset', -1)) != len(session['data']):
+                    return self._reply(400)
+                server.chunks += 1
+                if server.drop_every and server.chunks % server.drop_every == 0:
+                    # 조각의 앞부분만 받은 채로 연결이 끊긴 상황
+                    session['data'] += body[:len(body) // 2]
+                    return self._disconnect()
+                session['data'] += body
+                if 'finalize' not in command:
+                    return self._reply(headers={'X-Goog-Upload-Status': 'active'})
+
+                name = f"files/upload-{len(server.files) + 1}"
+                data = bytes(session['data'])
+                server.files[name] = data
+                if server.client:
+                    server.client.files._put(name, data)
+                session['file'] = {'name': name, 'displayName': session['display_name'], 'sizeBytes': str(len(data))}
+                return self._reply(
+                    headers={'X-Goog-Upload-Status': 'final', 'Content-Type': 'application/json'},
+                    body=json.dumps({'file': session['file']}).encode('utf-8'),
+                )
+
+        return Handler
+
+
+if __name__ == '__main__':
+    # 같은 소스로 컨텍스트 캐시 사용/미사용 시의 업로드 크기와 입력 토큰을 비교합니다.
+    import sys
+    import tempfile
+    from .config_manager import ConfigManager
+    from .gemini_api_service import GeminiApiService
+
+    logging.basicConfig(level=logging.WARNING)
+    if len(sys.argv) > 1:
+        source_path = sys.argv[1]
+    else:
+        source_path = os.path.join(tempfile.mkdtemp(), 'sample.txt')
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write("The rain had not stopped for three days, and the village was quiet.\n" * 5000)
+
+    os.chdir(tempfile.mkdtemp())
+    config_manager = ConfigManager('config.json')
+    config_manager.config['translation_cache_enabled'] = False
+    config_manager.config['revision_snapshots_enabled'] = False
+
+    for enabled in (False, True):
+        config_manager.config['context_cache_enabled'] = enabled
+        service = GeminiApiService(config_manager)
+        service.client = LocalGenaiClient(model_name=config_manager.get('model_name'))
+        started = time.perf_counter()
+        service.create_batch_job(source_path)
+        elapsed = time.perf_counter() - started
+        label = "context cache" if enabled else "inline prefix"
+        print(f"{label:>14}: {json.dumps(service.client.usage.as_dict())} ({elapsed:.2f}s)")
@@ -4,9 +4,11 @@ import sys
 
 LOG_FILE = 'app.log'
 
-def setup_logger():
+def setup_logger(console_stream=None, console_level=logging.INFO):
     """
     Sets up the root logger for the application.
+    Console logs go to console_stream (stdout by default); the command line tool sends them to stderr
+    so that its JSON output on stdout stays machine-readable.
     """
     # Get the root logger
     logger = logging.getLogger()
@@ -23,8 +25,8 @@ def setup_logger():
     )
 
     # Console Handler
-    stdout_handler = logging.StreamHandler(sys.stdout)
-    stdout_handler.setLevel(logging.INFO) # Log INFO and above to console
+    stdout_handler = logging.StreamHandler(console_stream or sys.stdout)
+    stdout_handler.setLevel(console_level) # Log INFO (or console_level) and above to console
     stdout_handler.setFormatter(formatter)
 
     # Rotating File Handler
@@ -0,0 +1,146 @@
+"""
+끝나지 않은 배치 작업만 작업별 간격으로 상태를 확인하도록 일정을 정합니다.
+
+새로 제출한 작업은 짧은 간격으로 확인하고, 상태가 바뀌지 않으면 간격을 지수적으로 늘립니다 (최대 max_interval).
+오래 대기 중인 작업은 처음부터 긴 간격으로 시작하며, 여러 작업이 같은 순간에 몰리지 않도록 간격에 지터를 더합니다.
+끝난 작업(SUCCEEDED/FAILED/CANCELLED/EXPIRED)은 더 이상 확인하지 않습니다.
+
+실행 예 (30초마다 전체 목록을 받는 방식과 하루 동안의 API 호출 수 비교):
+    python -m model.poll_scheduler
+"""
+import random
+
+# 더 이상 상태가 바뀌지 않는 작업 상태 (접두사를 뗀 이름)
+TERMINAL_STATES = frozenset({'SUCCEEDED', 'FAILED', 'CANCELLED', 'EXPIRED'})
+
+
+class PollScheduler:
+    """
+    작업별 다음 상태 확인 시각을 관리합니다. 시각은 호출하는 쪽이 넘기는 now(초, 단조 증가)를 기준으로 합니다.
+    age_factor: 처음 추적할 때 작업 나이(초)에 곱해 시작 간격을 정하는 비율 (오래된 작업일수록 느리게).
+    """
+
+    def __init__(self, min_interval=15, max_interval=600, backoff=1.5, jitter=0.2, age_factor=0.1, rng=None):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self.age_factor = age_factor
+        self._rng = rng or random.Random()
+        self._jobs = {}  # job_name -> {'state', 'interval', 'due'}
+        self.polls = 0
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __contains__(self, job_name):
+        return job_name in self._jobs
+
+    def _clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _schedule(self, entry, now):
+        spread = entry['interval'] * self.jitter
+        entry['due'] = now + entry['interval'] + self._rng.uniform(-spread, spread)
+
+    def track(self, job_name, state, now, age=0):
+        """
+        작업을 추적합니다 (이미 추적 중이면 상태만 반영). 끝난 상태이면 추적하지 않습니다.
+        age는 작업이 만들어진 지 지난 시간(초)입니다. 방금 제출한 작업은 age=0으로 가장 짧은 간격부터 시작합니다.
+        """
+        if state in TERMINAL_STATES:
+            self.untrack(job_name)
+            return
+        if job_name in self._jobs:
+            self.record(job_name, state, now)
+            return
+        entry = {'state': state, 'interval': self._clamp(age * self.age_factor)}
+        self._schedule(entry, now)
+        self._jobs[job_name] = entry
+
+    def untrack(self, job_name):
+        self._jobs.pop(job_name, None)
+
+    def retain_only(self, job_names):
+        """job_names에 없는 작업(목록에서 사라진 작업)의 추적을 멈춥니다."""
+        for job_name in set(self._jobs) - set(job_names):
+            del self._jobs[job_name]
+
+    def due(self, now):
+        """지금 상태를 확인해야 하는 작업 이름 목록을 반환합니다."""
+        return [job_name for job_name, entry in self._jobs.items() if entry['due'] <= now]
+
+    def record(self, job_name, state, now):
+        """
+        상태 확인 결과를 반영합니다. 끝난 상태이면 추적을 멈추고, 상태가 바뀌었으면 가장 짧은 간격으로 되돌리며,
+        그대로이면 간격을 backoff배로 늘립니다.
+        """
+        entry = self._jobs.get(job_name)
+        if entry is None:
+            return
+        if state in TERMINAL_STATES:
+            del self._jobs[job_name]
+            return
+        if state != entry['state']:
+            entry.update(state=state, interval=self.min_interval)
+        else:
+            entry['interval'] = self._clamp(entry['interval'] * self.backoff)
+        self._schedule(entry, now)
+
+    def postpone(self, job_names, now):
+        """상태 확인에 실패한 작업들을 상태가 그대로인 것으로 보고 간격을 늘려 다시 예약합니다."""
+        for job_name in job_names:
+            entry = self._jobs.get(job_name)
+            if entry:
+                self.record(job_name, entry['state'], now)
+
+    def next_due_in(self, now):
+        """다음 상태 확인까지 남은 시간(초)을 반환합니다. 추적 중인 작업이 없으면 None입니다."""
+        if not self._jobs:
+            return None
+        return max(0.0, min(entry['due'] for entry in self._jobs.values()) - now)
+
+
+if __name__ == '__main__':
+    # 하루 동안 두 번 작업을 몰아서 제출하는 사용 패턴(작업 8개씩, 1~6시간 대기 후 완료, 과거 작업 200개)에서
+    # 기존의 30초 간격 전체 목록 조회(페이지당 50개)와 작업별 적응형 확인의 API 호출 수를 비교합니다.
+    import math
+
+    rng = random.Random(7)
+    day = 24 * 3600
+    history = 200
+    jobs = []
+    for submit_at in (9 * 3600, 20 * 3600):
+        for i in range(8):
+            jobs.append((f"batches/{submit_at}-{i}", submit_at, submit_at + rng.uniform(3600, 6 * 3600)))
+
+    def state_at(job, t):
+        _, submitted, finished = job
+        if t >= finished:
+            return 'SUCCEEDED'
+        return 'RUNNING' if t >= submitted + 600 else 'PENDING'
+
+    listing_calls = 0
+    for t in range(0, day, 30):
+        visible = history + sum(1 for job in jobs if job[1] <= t)
+        listing_calls += math.ceil(visible / 50)
+
+    scheduler = PollScheduler(rng=random.Random(1))
+    detection_delays = []
+    pending = sorted(jobs, key=lambda job: job[1])
+    for t in range(0, day):
+        while pending and pending[0][1] <= t:
+            scheduler.track(pending.pop(0)[0], 'PENDING', t)
+        for job_name in scheduler.due(t):
+            job = next(j for j in jobs if j[0] == job_name)
+            scheduler.polls += 1
+            state = state_at(job, t)
+            if state == 'SUCCEEDED':
+                detection_delays.append(t - job[2])
+            scheduler.record(job_name, state, t)
+
+    print(f"30s full listing : {listing_calls:6d} API calls/day")
+    print(f"adaptive polling : {scheduler.polls:6d} API calls/day "
+          f"({listing_calls / max(1, scheduler.polls):.0f}x fewer), "
+          f"completion noticed after {sum(detection_delays) / len(detection_delays) / 60:.1f} min on average "
+          f"(max {max(detection_delays) / 60:.1f} min)")
@@ -0,0 +1,43 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    분당 허용량(rate_per_minute)을 지키는 토큰 버킷입니다. 여러 스레드가 함께 사용할 수 있습니다.
+    버킷 크기만큼은 한 번에 쓸 수 있고(burst), 이후에는 분당 허용량의 속도로 채워집니다.
+    rate_per_minute가 0 이하이면 제한하지 않습니다.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_minute / 60.0)
+        self._updated = now
+
+    def acquire(self, amount=1, cancel_event=None):
+        """
+        amount만큼의 토큰을 얻을 때까지 기다립니다. 버킷 크기보다 큰 요청은 버킷이 가득 찼을 때 통과시키고
+        부족분만큼 이후 요청을 늦춥니다. cancel_event가 설정되면 False를 반환합니다.
+        """
+        if self.rate_per_minute <= 0:
+            return True
+        while True:
+            with self._lock:
+                self._refill()
+                needed = min(amount, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return True
+                wait = (needed - self._tokens) * 60.0 / self.rate_per_minute
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
@@ -0,0 +1,118 @@
+import io
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# keep_request_files가 켜져 있을 때 요청 파일을 남기는 폴더
+KEPT_REQUESTS_DIR = 'request_files'
+
+
+class RequestStaging:
+    """
+    배치 작업 하나의 요청 JSONL을 업로드 전까지 담아 두는 버퍼입니다.
+    memory_limit 바이트까지는 메모리(BytesIO)에 쓰고, 넘으면 작업마다 고유한 임시 파일로 옮겨 씁니다.
+    따라서 작은 작업은 디스크를 거치지 않고 바로 업로드되며, 동시에 여러 작업을 준비해도 서로 덮어쓰지 않습니다.
+    keep_file이 켜져 있으면 항상 KEPT_REQUESTS_DIR의 파일에 쓰고 cleanup() 후에도 남깁니다 (디버깅용).
+    on_spill(staging)이 주어지면 파일로 옮겨 쓰는 순간 호출되어, 쓰는 동안 업로드를 시작할 수 있습니다 (self.upload).
+    쓰기가 끝나면 self.finished 이벤트가 설정됩니다.
+    """
+
+    def __init__(self, memory_limit, keep_file=False, label='requests', on_spill=None):
+        self.memory_limit = memory_limit
+        self.keep_file = keep_file
+        self.label = label
+        self.on_spill = on_spill
+        self.path = None
+        self.upload = None
+        self.finished = threading.Event()
+        self._retained = False
+        self._buffer = io.BytesIO()
+        self._file = None
+        if keep_file:
+            self._spill()
+
+    def _spill(self):
+        """메모리 버퍼의 내용을 고유한 임시 파일로 옮기고 이후에는 파일에 씁니다."""
+        directory = None
+        if self.keep_file:
+            os.makedirs(KEPT_REQUESTS_DIR, exist_ok=True)
+            directory = KEPT_REQUESTS_DIR
+        fd, self.path = tempfile.mkstemp(prefix=f"{self.label}-", suffix='.jsonl', dir=directory)
+        self._file = os.fdopen(fd, 'wb')
+        self._file.write(self._buffer.getvalue())
+        self._buffer = None
+        if self.on_spill:
+            self.on_spill(self)
+
+    def write(self, data):
+        if self._file is None and self._buffer.tell() + len(data) > self.memory_limit:
+            self._spill()
+        (self._file or self._buffer).write(data)
+
+    def tell(self):
+        return (self._file or self._buffer).tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # 쓰기 도중 실패하면 불완전한 파일이 업로드 완료(finalize)되지 않도록 업로드부터 멈춤
+        if exc_type and self.upload:
+            self.upload.cancel()
+        self.close()
+
+    def close(self):
+        """쓰기를 마칩니다 (파일로 옮겨 쓴 경우 파일을 닫음)."""
+        if self._file and not self._file.closed:
+            self._file.close()
+        self.finished.set()
+
+    def upload_source(self):
+        """files.upload(file=...)에 넘길 값을 반환합니다: 임시 파일 경로 또는 처음으로 되감은 메모리 버퍼."""
+        self.close()
+        if self.path:
+            return self.path
+        self._buffer.seek(0)
+        return self._buffer
+
+    def size(self):
+        """지금까지 쓴 요청 JSONL의 바이트 수입니다."""
+        if self.path:
+            return os.path.getsize(self.path)
+        return self._buffer.getbuffer().nbytes
+
+    def describe(self):
+        return f"'{self.path}'" if self.path else f"in-memory buffer ({self._buffer.getbuffer().nbytes} bytes)"
+
+    @property
+    def retained(self):
+        return self._retained
+
+    def retain(self):
+        """중단된 업로드를 나중에 이어 올릴 수 있도록 cleanup()이 파일과 업로드 체크포인트를 지우지 않게 합니다."""
+        self._retained = True
+
+    def cleanup(self):
+        """
+        진행 중인 업로드를 멈추고 버퍼를 비운 뒤 임시 파일을 삭제합니다.
+        keep_file이면 파일을 남기고 경로를 로그에 남깁니다.
+        """
+        self.close()
+        self._buffer = None
+        if self._retained:
+            return
+        if self.upload:
+            self.upload.cancel()
+            self.upload.discard(remove_file=False)
+        if not self.path or not os.path.exists(self.path):
+            return
+        if self.keep_file:
+            logger.info(f"Request file kept for debugging: '{self.path}'")
+            return
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to remove temporary request file '{self.path}': {e}")
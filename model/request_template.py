@@ -0,0 +1,111 @@
+"""
+배치 요청 JSONL 라인을 미리 직렬화한 골격(skeleton)으로 만드는 템플릿입니다.
+
+모든 청크 요청은 모델, 시스템 명령어, prefill, 생성 설정, 안전 설정이 같고 키와 청크 텍스트만 다릅니다.
+골격을 한 번만 json.dumps로 직렬화해 두고, 라인마다 키와 청크 텍스트만 JSON 이스케이프해 끼워 넣으므로
+결과는 json.dumps({"key": ..., "request": ...}, ensure_ascii=False)와 바이트 단위로 같습니다.
+
+실행 예 (정확성 확인 + 100MB 합성 소설 벤치마크, 출력이 다르면 AssertionError):
+    python -m model.request_template [크기_MB]
+"""
+import json
+import uuid
+from json.encoder import encode_basestring
+
+
+class RequestLineTemplate:
+    """청크 텍스트와 키만 바꿔 끼우는 배치 요청 라인 템플릿입니다."""
+
+    def __init__(self, build_request):
+        """build_request(chunk) -> 요청 dict 함수로 골격을 만듭니다."""
+        marker = uuid.uuid4().hex
+        key_marker = f"__request_key_{marker}__"
+        chunk_marker = f"__request_chunk_{marker}__"
+        skeleton = json.dumps({"key": key_marker, "request": build_request(chunk_marker)}, ensure_ascii=False)
+
+        head, key_sep, rest = skeleton.partition(f'"{key_marker}"')
+        middle, chunk_sep, tail = rest.partition(f'"{chunk_marker}"')
+        if not key_sep or not chunk_sep or chunk_marker in tail or key_marker in middle + tail:
+            raise ValueError("Request skeleton must contain the key and chunk text exactly once.")
+        self._head = head
+        self._middle = middle
+        self._tail = tail + '\n'
+
+    def render(self, key, chunk):
+        """키와 청크 텍스트로 JSONL 한 줄(줄바꿈 포함)을 만듭니다."""
+        return f"{self._head}{encode_basestring(key)}{self._middle}{encode_basestring(chunk)}{self._tail}"
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    import tempfile
+    import time
+
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    chunk_size = 5000
+    settings = {
+        'system_instruction': {"parts": [{"text": "Translate the following text to Korean. " * 80}]},
+        'prefill': [
+            {'role': 'user', 'parts': [{'text': "(OOC, translate naturally.)" * 10}]},
+            {'role': 'model', 'parts': [{'text': "(Understood.)" * 10}]},
+        ],
+        'generation_config': {'temperature': 1.0, 'top_p': 0.95, 'thinkingConfig': {'thinking_budget': 128}},
+    }
+
+    def build_request(chunk):
+        return {
+            "model": "models/gemini-2.5-flash",
+            "contents": settings['prefill'] + [{'role': 'user', 'parts': [{'text': chunk}]}],
+            "system_instruction": settings['system_instruction'],
+            "generation_config": settings['generation_config'],
+            "safety_settings": [{"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"}],
+        }
+
+    # 따옴표, 역슬래시, 탭, 한글/일본어가 섞인 합성 소설
+    paragraph = '"Where are you going?" she asked.\tHe said \\nothing\\. 彼は黙っていた。 그는 아무 말도 하지 않았다.\n'
+    total_chars = int(size_mb * 1024 * 1024)
+    novel = paragraph * (total_chars // len(paragraph) + 1)
+    chunks = [novel[i:i + chunk_size] for i in range(0, total_chars, chunk_size)]
+    del novel
+
+    out_dir = tempfile.mkdtemp()
+    template = RequestLineTemplate(build_request)
+
+    def reference(key, chunk):
+        return json.dumps({"key": key, "request": build_request(chunk)}, ensure_ascii=False) + '\n'
+
+    # 정확성: 이스케이프가 필요한 문자, 빈 청크, 마커처럼 보이는 텍스트도 json.dumps와 같은 라인이 됨
+    edge_cases = [
+        "", " ", '"', "\\", "\\\"", "\n\r\t\b\f", "\x00\x1f\x7f", "\u2028\u2029", "\ud800 lone surrogate",
+        "</script>", "{\"key\": \"chunk_1\"}", "__request_chunk_x__", "彼は黙っていた。\n그는 아무 말도 하지 않았다.",
+        "👩‍👩‍👧 🇰🇷 e\u0301", "a" * 10000,
+    ]
+    for key in ("chunk_1", "file_3/chunk_12", 'odd "key"\\'):
+        for chunk in edge_cases:
+            assert template.render(key, chunk) == reference(key, chunk), (key, chunk)
+    # 키나 청크가 골격에 한 번씩 들어가지 않는 요청 함수는 거부
+    for bad_build in (lambda chunk: {"text": "fixed"}, lambda chunk: {"a": chunk, "b": chunk}):
+        try:
+            RequestLineTemplate(bad_build)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("invalid skeleton accepted")
+
+    def run(label, render):
+        path = os.path.join(out_dir, f"{label}.jsonl")
+        started = time.perf_counter()
+        with open(path, 'wb') as f:
+            for i, chunk in enumerate(chunks):
+                f.write(render(f"chunk_{i + 1}", chunk).encode('utf-8'))
+        elapsed = time.perf_counter() - started
+        print(f"{label:>9}: {len(chunks) / elapsed:10.0f} lines/sec, {os.path.getsize(path) / elapsed / 1e6:7.1f} MB/s ({elapsed:.2f}s)")
+        return path
+
+    print(f"{len(chunks)} chunks of {chunk_size} chars ({size_mb:g} MB source)")
+    baseline = run("json.dumps", reference)
+    templated = run("template", template.render)
+    with open(baseline, 'rb') as a, open(templated, 'rb') as b:
+        assert a.read() == b.read(), "template output differs from json.dumps"
+    print(f"byte-identical output for {len(chunks)} lines and {len(edge_cases) * 3} edge cases")
@@ -0,0 +1,135 @@
+"""
+결과 파일에 실패 표시로 남은 청크(SAFETY 차단, 빈 응답, 파싱 실패, 결과 누락)를 복구하기 위한 도구입니다.
+
+결과를 내려받아 쓸 때 StitchedOutputWriter가 실패 표시를 쓴 바이트 범위를 기록해 두면, 복구 단계가
+실패한 청크만 다시 번역한 뒤 그 범위만 번역으로 바꿔 결과 파일을 다시 씁니다.
+청크마다의 실패 이유와 복구 결과는 결과 파일 옆의 복구 보고서(JSON)에 남깁니다.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# 복구 보고서의 청크 상태
+REPAIRED = 'repaired'      # 다시 번역해 결과 파일에 반영함
+PARTIAL = 'partial'        # 나눠서 다시 번역했지만 일부 조각은 끝내 실패함 (반영함)
+PENDING = 'pending'        # 복구용 배치 작업이 끝나기를 기다리는 중
+FAILED = 'failed'          # 다시 번역하지 못함
+SKIPPED = 'skipped'        # 원문 청크를 찾을 수 없어 다시 번역하지 않음
+UNREPAIRED = 'unrepaired'  # 복구 단계가 꺼져 있음
+
+
+class BlockedResponseError(ValueError):
+    """응답이 차단되었거나 텍스트가 없음 (다시 보내도 같은 결과이므로 재시도하지 않음)."""
+
+
+def failure_reason(text):
+    """실패 표시 텍스트에서 보고서에 남길 한 줄짜리 실패 이유를 만듭니다."""
+    if not text:
+        return "빈 번역"
+    # 예: '[번역 차단됨 (SAFETY) - 전체 응답 객체:]' -> '번역 차단됨 (SAFETY)'
+    return text.split("\n", 1)[0].strip("[]").split(" - ", 1)[0]
+
+
+def repair_report_path(output_path):
+    """결과 파일(여러 파일 작업이면 결과 폴더)에 대한 복구 보고서 경로."""
+    if os.path.isdir(output_path):
+        return os.path.join(output_path, "repair_report.json")
+    return f"{os.path.splitext(output_path)[0]}_repair.json"
+
+
+def span_digest(path, spans):
+    """
+    결과 파일에서 청크들의 바이트 범위 spans({청크 번호: (시작, 끝)})에 든 바이트의 SHA-256 해시입니다.
+    복구 작업을 반영하기 전에, 그 범위에 아직 제출할 때의 실패 표시가 그대로 있는지 확인하는 데 씁니다.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for key in sorted(spans, key=lambda key: int(key)):
+            start, end = spans[key]
+            f.seek(start)
+            digest.update(f"{key}:{start}:{end}\n".encode('ascii'))
+            digest.update(f.read(end - start))
+    return digest.hexdigest()
+
+
+def patch_output(path, spans, replacements):
+    """
+    결과 파일에서 청크들의 바이트 범위 spans({청크 번호: (시작, 끝)})를 replacements({청크 번호: 텍스트})로 바꿉니다.
+    '<경로>.part'에 새로 쓴 뒤 제자리로 옮기므로 중간에 실패해도 기존 결과 파일은 그대로입니다.
+    """
+    keys = sorted((key for key in replacements if key in spans), key=lambda key: spans[key][0])
+    if not keys:
+        return 0
+    temp_path = f"{path}.part"
+    try:
+        with open(path, 'rb') as src, open(temp_path, 'wb') as out:
+            position = 0
+            for key in keys:
+                start, end = spans[key]
+                out.write(src.read(start - position))
+                src.seek(end)
+                position = end
+                # 결과 파일은 텍스트 모드로 썼으므로 줄바꿈도 같은 방식으로 변환
+                out.write(replacements[key].replace("\n", os.linesep).encode('utf-8'))
+            while block := src.read(1024 * 1024):
+                out.write(block)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(keys)
+
+
+class RepairReport:
+    """작업 하나의 복구 보고서입니다. 청크는 (파일 번호, 청크 번호)로 구분합니다."""
+
+    def __init__(self, job_name, output_path, entries=None, created_at=None):
+        self.job_name = job_name
+        self.output_path = output_path
+        self.entries = entries if entries is not None else {}
+        self.created_at = created_at or datetime.now().isoformat(timespec='seconds')
+        # 이번 복구로 제출한 복구용 배치 작업 객체 (보고서 파일에는 저장하지 않음, 없으면 None)
+        self.repair_job = None
+
+    def add_failure(self, file_index, key_num, reason):
+        self.entries[(file_index, key_num)] = {'file': file_index, 'chunk': key_num, 'reason': reason, 'status': UNREPAIRED}
+
+    def set_status(self, file_index, key_num, status, **extra):
+        entry = self.entries.get((file_index, key_num))
+        if entry is not None:
+            entry.update(status=status, **extra)
+
+    def keys(self, status=None):
+        return [key for key, entry in sorted(self.entries.items()) if status is None or entry['status'] == status]
+
+    def summary(self):
+        """{상태: 청크 수}"""
+        counts = {}
+        for entry in self.entries.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
+
+    def describe(self):
+        counts = self.summary()
+        return f"{len(self.entries)} failed chunks: " + ", ".join(f"{status} {count}" for status, count in sorted(counts.items()))
+
+    def write(self, path):
+        data = {
+            'job': self.job_name,
+            'output': self.output_path,
+            'created_at': self.created_at,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'summary': self.summary(),
+            'chunks': [entry for _, entry in sorted(self.entries.items())],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = {(entry['file'], entry['chunk']): entry for entry in data.get('chunks', [])}
+        return cls(data.get('job'), data.get('output'), entries, data.get('created_at'))
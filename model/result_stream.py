@@ -0,0 +1,400 @@
+"""
+배치 결과 파일을 메모리에 통째로 올리지 않고 처리하기 위한 도구입니다.
+
+결과 파일은 임시 파일(spool)에 블록 단위로 내려받고 한 줄씩 파싱하며, 번역된 청크는 다음 순서의 청크가
+준비되는 즉시 결과 파일에 씁니다. 순서가 뒤바뀐 청크만 재정렬 버퍼에 잠시 두고, 버퍼가 가득 차면
+(앞 번호 청크가 누락되었거나 결과 순서가 크게 뒤섞인 경우) 나머지는 임시 파일로 옮겨 두므로
+최대 메모리 사용량은 작업 크기와 무관하게 버퍼 상한으로 제한됩니다.
+
+결과 라인은 성공한 응답을 가장 먼저 확인하는 빠른 경로로 파싱하고, 진단용 전체 응답 문자열은 실패한 라인에서만 만듭니다.
+orjson이 설치되어 있으면 JSON 디코딩에 사용합니다 (선택 사항, 없으면 표준 json).
+라인은 bytes 그대로 디코더에 넘기므로 (둘 다 UTF-8 bytes를 직접 받음) 라인마다 str로 바꾸는 복사가 없고,
+str 변환은 파싱에 실패한 라인의 진단 메시지를 만들 때만 합니다.
+
+실행 예:
+    python -m model.result_stream [결과 크기_MB ...]   # 이전 방식과 최대 메모리 사용량 비교
+    python -m model.result_stream parse [라인 수]      # 결과 파싱 속도(초당 라인 수) 비교
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import urllib.request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 결과 키 형식: 'chunk_<번호>' 또는 여러 파일을 묶은 작업의 'file_<파일 번호>/chunk_<번호>'
+RESULT_KEY_PATTERN = re.compile(r'^(?:file_(\d+)/)?chunk_(\d+)$')
+RESULT_KEY_IN_LINE_PATTERN = re.compile(r'"key"\s*:\s*"([^"]+)"')
+
+# orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스이고, 표준 json이 bytes의 UTF-8 오류에서 내는
+# UnicodeDecodeError는 ValueError이므로 오류 처리는 같음
+json_loads = orjson.loads if orjson else json.loads
+
+DOWNLOAD_URL = 'https://generativelanguage.googleapis.com/download/v1beta/{name}:download?alt=media'
+DOWNLOAD_BLOCK_SIZE = 1024 * 1024
+# 재정렬 버퍼에 메모리로 두는 최대 청크 수 (넘는 청크는 임시 파일로 옮김)
+REORDER_BUFFER_MAX_CHUNKS = 256
+
+
+def download_file(file_name, api_key, out, download_url=DOWNLOAD_URL, block_size=DOWNLOAD_BLOCK_SIZE, timeout=120):
+    """File API 파일('files/...')을 block_size 단위로 내려받아 바이너리 파일 객체 out에 씁니다."""
+    request = urllib.request.Request(download_url.format(name=file_name), headers={'x-goog-api-key': api_key})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        shutil.copyfileobj(response, out, block_size)
+
+
+def iter_result_lines(spool):
+    """바이너리 파일에서 결과 JSONL을 한 줄씩 읽어 빈 줄을 뺀 bytes로 반환합니다 (디코딩은 iter_results에서)."""
+    for raw_line in spool:
+        line = raw_line.rstrip(b'\r\n')
+        if line:
+            yield line
+
+
+def parse_result_key(key):
+    """결과 키를 (파일 번호, 청크 번호)로 변환합니다. 단일 파일 작업의 키('chunk_N')는 파일 번호 0입니다."""
+    match = RESULT_KEY_PATTERN.match(key)
+    if not match:
+        raise ValueError(f"Unrecognized result key: '{key}'")
+    return int(match.group(1) or 0), int(match.group(2))
+
+
+def recover_result_key(line, max_keys):
+    """
+    파싱할 수 없는 결과 라인에서 키를 찾아 (파일 번호, 청크 번호)를 반환합니다.
+    키를 찾지 못하면 첫 번째 파일의 마지막 청크 다음 번호를 사용합니다.
+    """
+    match = RESULT_KEY_IN_LINE_PATTERN.search(line)
+    if match:
+        try:
+            return parse_result_key(match.group(1))
+        except ValueError:
+            pass
+    file_index = min(max_keys) if max_keys else 0
+    return file_index, max_keys.get(file_index, 0) + 1
+
+
+def missing_marker(key_num):
+    """결과도 번역 캐시도 없는 청크 자리에 쓰는 표시."""
+    return f"[문단 {key_num} 결과 누락]"
+
+
+def _describe(parsed_response):
+    """실패한 결과의 진단용 전체 응답 문자열."""
+    return json.dumps(parsed_response, indent=2, ensure_ascii=False)
+
+
+def iter_results(lines, prompt_tokens=None, max_keys=None):
+    """
+    배치 결과 JSONL 라인들(bytes 또는 str)을 한 줄씩 파싱해 (파일 번호, 청크 번호, 번역 또는 오류 표시, 성공 여부)를 반환합니다.
+    max_keys({파일 번호: 최대 청크 번호})에는 지금까지 본 최대 청크 번호를 기록합니다.
+    prompt_tokens가 주어지면 성공한 응답의 입력 토큰 수(usage_metadata.prompt_token_count)를
+    {(파일 번호, 청크 번호): 토큰 수}로 기록합니다 (토큰 추정기 보정용).
+    """
+    max_keys = {} if max_keys is None else max_keys
+    for line in lines:
+        if not line:
+            continue
+        try:
+            parsed_response = json_loads(line)
+            file_index, key_num = parse_result_key(parsed_response['key'])
+            if key_num > max_keys.get(file_index, 0):
+                max_keys[file_index] = key_num
+            response = parsed_response.get('response')
+            candidates = response.get('candidates') if response is not None else None
+
+            # 빠른 경로: 차단되지 않은 후보가 있는 응답 (대부분의 라인)
+            if candidates and candidates[0].get('finish_reason') != "SAFETY":
+                text = candidates[0].get('content', {}).get('parts', [{}])[0].get('text')
+                if text is None:
+                    text, succeeded = '[번역 내용 없음]', False
+                else:
+                    succeeded = bool(text)
+                if prompt_tokens is not None and succeeded:
+                    usage = response.get('usage_metadata') or response.get('usageMetadata') or {}
+                    count = usage.get('prompt_token_count') or usage.get('promptTokenCount')
+                    if count:
+                        prompt_tokens[(file_index, key_num)] = count
+                yield file_index, key_num, text, succeeded
+
+            elif candidates:
+                logger.error(f"문단 {key_num} 처리 실패/차단됨: Finish reason was SAFETY.")
+                yield file_index, key_num, f"[번역 차단됨 (SAFETY) - 전체 응답 객체:]\n{_describe(parsed_response)}", False
+
+            elif response is not None:
+                feedback = response.get('prompt_feedback', {})
+                logger.error(f"문단 {key_num} 처리 실패/차단됨: Candidates 리스트가 비어있습니다. Feedback: {feedback}")
+                yield file_index, key_num, f"[번역 차단됨 (Candidates 없음) - 전체 응답 객체:]\n{_describe(parsed_response)}", False
+
+            else:
+                error_message = parsed_response.get('error', {}).get('message', '알 수 없는 오류')
+                logger.error(f"문단 {key_num} 처리 실패/차단됨: {error_message}")
+                yield file_index, key_num, f"[번역 실패 (No Response) - 전체 응답 객체:]\n{_describe(parsed_response)}", False
+
+        except (json.JSONDecodeError, KeyError, IndexError, ValueError) as e:
+            if isinstance(line, bytes):
+                # 깨진 바이트가 있는 줄도 진단 메시지와 키 복원에 쓸 수 있도록 치환
+                line = line.decode('utf-8', errors='replace')
+            key_str = f"'{line.split(',')[0]}'" if ',' in line else "알 수 없는 키"
+            file_index, key_num = recover_result_key(line, max_keys)
+            max_keys[file_index] = max(max_keys.get(file_index, 0), key_num)
+            logger.warning(f"{key_str}에 해당하는 결과 라인 파싱 중 예외 발생: {e}")
+            yield file_index, key_num, f"[결과 라인 파싱 오류 - 원본 라인:]\n{line}", False
+
+
+class StitchedOutputWriter:
+    """
+    청크 번호 순서대로 결과 파일을 씁니다.
+    순서가 뒤바뀌어 도착한 청크는 앞 번호가 채워질 때까지 재정렬 버퍼에 두고 (max_pending개를 넘으면
+    텍스트는 임시 파일에 쓰고 위치만 기억), 결과에 없는 청크
+    (제출 시 번역 캐시에 있어 요청하지 않은 청크)는 manifest의 캐시 키로 번역 캐시에서 가져옵니다.
+    '<경로>.part' 임시 파일에 쓰고 finish()에서 제자리로 옮기므로, 중간에 실패해도 기존 결과 파일이 깨지지 않습니다.
+    """
+
+    def __init__(self, path, manifest=(), cache=None, max_pending=REORDER_BUFFER_MAX_CHUNKS):
+        self.path = path
+        self.manifest = manifest
+        self.cache = cache
+        self.max_pending = max_pending
+        self.next_key = 1
+        self.pending = {}
+        self.peak_pending = 0
+        # 버퍼가 가득 차 임시 파일로 옮긴 청크 {청크 번호: (위치, 바이트 수, 실패 여부)}
+        self.spilled = {}
+        self._spill_file = None
+        # 실패 표시를 쓴 청크의 결과 파일 내 바이트 범위 {청크 번호: (시작, 끝)} (복구 단계에서 번역으로 교체)
+        self.failed_spans = {}
+        # 캐시에 없다고 이미 확인한 가장 큰 청크 번호 (도착을 기다리는 동안 같은 키를 반복 조회하지 않음)
+        self._checked_key = 0
+        self._temp_path = f"{path}.part"
+        self._file = open(self._temp_path, 'w', encoding='utf-8')
+
+    def _cached(self, key):
+        if self.cache and key <= len(self.manifest):
+            return self.cache.get(self.manifest[key - 1])
+        return None
+
+    def _spill(self, key, text, failed):
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile()
+            logger.info(f"'{self.path}' 재정렬 버퍼가 가득 찼습니다 ({self.max_pending}개 청크). 이후 청크는 임시 파일에 보관합니다.")
+        data = text.encode('utf-8')
+        self._spill_file.seek(0, os.SEEK_END)
+        self.spilled[key] = (self._spill_file.tell(), len(data), failed)
+        self._spill_file.write(data)
+
+    def _pop_pending(self, key):
+        """버퍼(메모리 또는 임시 파일)에서 청크를 꺼냅니다. 없으면 None."""
+        entry = self.pending.pop(key, None)
+        if entry is not None or key not in self.spilled:
+            return entry
+        offset, length, failed = self.spilled.pop(key)
+        self._spill_file.seek(offset)
+        return self._spill_file.read(length).decode('utf-8'), failed
+
+    def _close_spill(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _write_next(self, text, failed=False):
+        if failed:
+            start = self._file.tell()
+            self._file.write(text)
+            self.failed_spans[self.next_key] = (start, self._file.tell())
+        else:
+            self._file.write(text)
+        self._file.write("\n\n")
+        self.next_key += 1
+
+    def add(self, key, text, failed=False):
+        """청크 하나의 결과를 추가하고, 순서가 된 청크들을 바로 씁니다. failed이면 text는 실패 표시입니다."""
+        if key < self.next_key:
+            return
+        if key > self.next_key:
+            if len(self.pending) >= self.max_pending:
+                self._spill(key, text, failed)
+            else:
+                self.pending[key] = (text, failed)
+                self.peak_pending = max(self.peak_pending, len(self.pending))
+        else:
+            self._write_next(text, failed)
+        while True:
+            entry = self._pop_pending(self.next_key)
+            if entry is None and self._checked_key < self.next_key:
+                self._checked_key = self.next_key
+                text = self._cached(self.next_key)
+                entry = (text, False) if text is not None else None
+            if entry is None:
+                return
+            self._write_next(*entry)
+
+    def finish(self, total_chunks):
+        """남은 청크를 total_chunks번까지 쓰고 (결과도 캐시도 없는 청크는 누락 표시) 결과 파일을 완성합니다."""
+        while self.next_key <= total_chunks:
+            entry = self._pop_pending(self.next_key)
+            if entry is None:
+                text = self._cached(self.next_key)
+                entry = (text, False) if text is not None else (missing_marker(self.next_key), True)
+            self._write_next(*entry)
+        self._file.close()
+        self._close_spill()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        """쓰던 임시 파일을 지웁니다."""
+        self._file.close()
+        self._close_spill()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+if __name__ == '__main__':
+    import io
+    import random
+    import sys
+    import time
+
+    logging.basicConfig(level=logging.CRITICAL)
+    os.chdir(tempfile.mkdtemp())
+    rng = random.Random(3)
+    translated = "그는 아무 말도 하지 않았다. 비는 사흘째 그치지 않았고 마을은 조용했다. "
+
+    def result_line(key, text, finish_reason='STOP', ensure_ascii=False):
+        return json.dumps({
+            'key': f"chunk_{key}",
+            'response': {
+                'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}, 'finish_reason': finish_reason}],
+                'usage_metadata': {'prompt_token_count': 2100, 'candidates_token_count': 1900, 'total_token_count': 4000},
+                'model_version': 'gemini-2.5-flash',
+            },
+        }, ensure_ascii=ensure_ascii)
+
+    if sys.argv[1:2] == ['parse']:
+        # 합성 결과 50k 라인 (1%는 SAFETY 차단, 0.5%는 깨진 라인)의 초당 파싱 라인 수를 비교합니다.
+        # 번역문을 UTF-8 그대로 담은 경우와 \uXXXX로 이스케이프한 경우를 각각 측정합니다.
+        line_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+        def make_lines(ensure_ascii):
+            lines = []
+            for key in range(1, line_count + 1):
+                roll = rng.random()
+                if roll < 0.005:
+                    lines.append(result_line(key, translated)[:200])
+                else:
+                    lines.append(result_line(key, translated * 20, 'SAFETY' if roll < 0.015 else 'STOP', ensure_ascii))
+            return lines
+
+        def parse_before(spool):
+            # 이전 구현: 모든 라인을 str로 바꾸고 indent=2로 다시 직렬화한 뒤 분기
+            for raw_line in spool:
+                line = raw_line.rstrip(b'\r\n').decode('utf-8', errors='replace')
+                try:
+                    parsed_response = json.loads(line)
+                    file_index, key_num = parse_result_key(parsed_response['key'])
+                    full_response_str = json.dumps(parsed_response, indent=2, ensure_ascii=False)
+                    if 'response' in parsed_response and parsed_response['response'].get('candidates'):
+                        candidate = parsed_response['response']['candidates'][0]
+                        if candidate.get('finish_reason', 'UNKNOWN') == "SAFETY":
+                            yield file_index, key_num, f"[번역 차단됨 (SAFETY) - 전체 응답 객체:]\n{full_response_str}", False
+                        else:
+                            text = candidate.get('content', {}).get('parts', [{}])[0].get('text')
+                            yield file_index, key_num, text if text is not None else '[번역 내용 없음]', bool(text)
+                    else:
+                        yield file_index, key_num, full_response_str, False
+                except (json.JSONDecodeError, KeyError, IndexError, ValueError):
+                    yield 0, 0, f"[결과 라인 파싱 오류 - 원본 라인:]\n{line}", False
+
+        def parse_after(spool):
+            return iter_results(iter_result_lines(spool))
+
+        runs = [('before (json, pretty-print every line)', parse_before, json.loads),
+                ('after  (json)', parse_after, json.loads)]
+        if orjson:
+            runs.append(('after  (orjson)', parse_after, orjson.loads))
+        else:
+            print("orjson is not installed; skipping the orjson run.")
+        for ensure_ascii in (False, True):
+            data = ("\n".join(make_lines(ensure_ascii)) + "\n").encode('utf-8')
+            size_mb = len(data) / (1024 * 1024)
+            print(f"{line_count} result lines ({size_mb:.0f} MB, {'escaped' if ensure_ascii else 'UTF-8'} text)")
+            baseline = None
+            for label, parse, loads in runs:
+                json_loads = loads
+                started = time.perf_counter()
+                with io.BytesIO(data) as spool:
+                    succeeded = sum(1 for result in parse(spool) if result[3])
+                rate = line_count / (time.perf_counter() - started)
+                baseline = baseline or rate
+                print(f"  {label:40s} {rate:10,.0f} lines/s  ({rate / baseline:.1f}x, {succeeded} succeeded)")
+        sys.exit(0)
+
+    # 합성 결과 파일(응답 메타데이터 포함, 일부 순서 뒤섞임)을 로컬 클라이언트에 올려 두고,
+    # 이전 방식(전체 bytes -> str -> splitlines -> 번역 dict -> 쓰기)과 지금 방식의 최대 메모리를 비교합니다.
+    # 로컬 클라이언트는 저장한 bytes를 복사 없이 돌려주므로 측정값은 다운로드 이후의 처리 메모리입니다.
+    import tracemalloc
+    from types import SimpleNamespace
+    from .config_manager import ConfigManager
+    from .gemini_api_service import GeminiApiService
+    from .local_client import LocalGenaiClient
+
+    config_manager = ConfigManager('config.json')
+    config_manager.config.update(translation_cache_enabled=False, token_estimator_calibration=False)
+
+    def make_results(size_mb):
+        lines, size, key = [], 0, 0
+        while size < size_mb * 1024 * 1024:
+            key += 1
+            line = result_line(key, translated * 60)
+            lines.append(line)
+            size += len(line.encode('utf-8')) + 1
+        # 이웃한 결과끼리 순서를 조금 섞음 (배치 결과 순서는 보장되지 않음)
+        for i in range(0, len(lines) - 8, 8):
+            window = lines[i:i + 8]
+            rng.shuffle(window)
+            lines[i:i + 8] = window
+        return ("\n".join(lines) + "\n").encode('utf-8'), key
+
+    def process_old(data, save_path):
+        lines = data.decode('utf-8').splitlines()
+        translations = {}
+        for line in lines:
+            parsed = json.loads(line)
+            key = int(parsed['key'].split('_')[1])
+            full_response_str = json.dumps(parsed, indent=2, ensure_ascii=False)
+            translations[key] = parsed['response']['candidates'][0]['content']['parts'][0]['text']
+        with open(save_path, 'w', encoding='utf-8') as f:
+            for i in range(1, max(translations) + 1):
+                f.write(translations.get(i, f"[문단 {i} 결과 누락]"))
+                f.write("\n\n")
+
+    size_args = [float(arg) for arg in sys.argv[1:]] or [25, 100]
+    print(f"{'result MB':>10} {'chunks':>7} {'old peak MB':>12} {'new peak MB':>12} {'old s':>7} {'new s':>7}")
+    for size_mb in size_args:
+        data, chunk_count = make_results(size_mb)
+        service = GeminiApiService(config_manager)
+        service.client = LocalGenaiClient()
+        service.client.files._put('files/results', data)
+        job = SimpleNamespace(name='batches/bench', model='models/gemini-2.5-flash', dest=SimpleNamespace(file_name='files/results'))
+
+        measurements = []
+        for run in (lambda: process_old(data, 'old.txt'), lambda: service._process_results([job], {}, 'new.txt')):
+            tracemalloc.start()
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            measurements.append((peak / (1024 * 1024), elapsed))
+        with open('old.txt', 'rb') as old, open('new.txt', 'rb') as new:
+            assert old.read() == new.read(), "outputs differ"
+        (old_peak, old_seconds), (new_peak, new_seconds) = measurements
+        print(f"{len(data) / (1024 * 1024):10.1f} {chunk_count:7d} {old_peak:12.1f} {new_peak:12.1f} {old_seconds:7.2f} {new_seconds:7.2f}")
@@ -0,0 +1,317 @@
+"""
+File API에 요청 JSONL을 재개 가능한(resumable) 방식으로 업로드합니다.
+
+Google의 resumable 업로드 프로토콜(X-Goog-Upload-* 헤더)로 파일을 chunk_size 단위로 보내며,
+연결이 끊기면 서버에 받은 바이트 수를 물어(query) 그 위치부터 이어서 보냅니다.
+세션 URL과 진행 위치는 체크포인트 파일(upload_sessions/)에 저장되므로 앱을 다시 시작해도 이어서 올릴 수 있습니다.
+complete_event를 주면 아직 쓰고 있는 파일을 따라가며 완성된 부분부터 올립니다 (요청 생성과 업로드를 겹침).
+
+실행 예 (연결 끊김을 주입하는 로컬 업로드 서버로 재개 동작과 처리량 측정):
+    python -m model.resumable_upload [크기_MB]
+"""
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_URL = 'https://generativelanguage.googleapis.com/upload/v1beta/files'
+UPLOAD_CHECKPOINT_DIR = 'upload_sessions'
+# 마지막 조각을 제외한 업로드 조각은 이 크기의 배수여야 합니다.
+UPLOAD_GRANULARITY = 256 * 1024
+# 재시도할 HTTP 상태 코드 (요청 한도 초과, 일시적 서버 오류)
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+RETRYABLE_ERRORS = (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError)
+
+
+class UploadInterruptedError(ConnectionError):
+    """재시도 횟수를 넘겨 업로드가 멈췄지만, 체크포인트로 나중에 이어서 올릴 수 있는 경우입니다."""
+
+    def __init__(self, message, checkpoint_path):
+        super().__init__(message)
+        self.checkpoint_path = checkpoint_path
+
+
+class ResumableUpload:
+    """파일 하나의 재개 가능한 업로드 세션입니다."""
+
+    def __init__(self, path, api_key, upload_url=UPLOAD_URL, chunk_size=8 * 1024 * 1024,
+                 mime_type='application/json', display_name=None, max_retries=5,
+                 checkpoint_dir=UPLOAD_CHECKPOINT_DIR, progress_callback=None, throttle=None, timeout=120):
+        self.path = path
+        self.api_key = api_key
+        self.upload_url = upload_url
+        self.chunk_size = max(UPLOAD_GRANULARITY, chunk_size // UPLOAD_GRANULARITY * UPLOAD_GRANULARITY)
+        self.mime_type = mime_type
+        self.display_name = display_name or os.path.basename(path)
+        self.max_retries = max_retries
+        self.progress_callback = progress_callback
+        # throttle(nbytes): 조각을 보내기 전에 호출되어 업로드 속도 제한을 적용 (예: TokenBucket.acquire)
+        self.throttle = throttle
+        self.timeout = timeout
+        self.checkpoint_path = os.path.join(checkpoint_dir, f"{uuid.uuid4().hex}.json")
+        self.session_url = None
+        self.offset = 0
+        self.file_name = None
+        self.submission = None
+        self.owner_pid = os.getpid()
+        self.resumes = 0
+        self._cancelled = threading.Event()
+        self._thread = None
+        self._result = None
+        self._error = None
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint_path, api_key, **kwargs):
+        """저장된 체크포인트로 업로드 세션을 복원합니다."""
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        upload = cls(data['path'], api_key, mime_type=data['mime_type'], display_name=data['display_name'], **kwargs)
+        upload.checkpoint_path = checkpoint_path
+        upload.session_url = data['session_url']
+        upload.offset = data['offset']
+        upload.file_name = data.get('file_name')
+        upload.submission = data.get('submission')
+        upload.owner_pid = data.get('pid')
+        return upload
+
+    @staticmethod
+    def list_checkpoints(checkpoint_dir=UPLOAD_CHECKPOINT_DIR):
+        if not os.path.isdir(checkpoint_dir):
+            return []
+        return [os.path.join(checkpoint_dir, name) for name in sorted(os.listdir(checkpoint_dir)) if name.endswith('.json')]
+
+    def save_checkpoint(self, **extra):
+        """세션 URL, 진행 위치와 (있으면) 업로드 후 할 일(submission)을 원자적으로 저장합니다."""
+        if 'submission' in extra:
+            self.submission = extra['submission']
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        data = {
+            'path': self.path,
+            'session_url': self.session_url,
+            'offset': self.offset,
+            'file_name': self.file_name,
+            'mime_type': self.mime_type,
+            'display_name': self.display_name,
+            'pid': os.getpid(),
+            'submission': self.submission,
+        }
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def discard(self, remove_file=True):
+        """체크포인트(와 업로드할 파일)를 삭제합니다."""
+        paths = [self.checkpoint_path] + ([self.path] if remove_file else [])
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _request(self, url, headers, data=b''):
+        headers = dict(headers, **{'x-goog-api-key': self.api_key})
+        request = urllib.request.Request(url, data=data, headers=headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.headers, response.read()
+
+    def _start_session(self, total_size):
+        headers = {
+            'X-Goog-Upload-Protocol': 'resumable',
+            'X-Goog-Upload-Command': 'start',
+            'X-Goog-Upload-Header-Content-Type': self.mime_type,
+            'Content-Type': 'application/json',
+        }
+        # 요청 생성과 겹쳐 올릴 때는 전체 크기를 아직 모르므로 마지막 조각의 finalize로 알립니다.
+        if total_size is not None:
+            headers['X-Goog-Upload-Header-Content-Length'] = str(total_size)
+        body = json.dumps({'file': {'display_name': self.display_name}}).encode('utf-8')
+        response_headers, _ = self._request(self.upload_url, headers, body)
+        self.session_url = response_headers.get('X-Goog-Upload-URL')
+        if not self.session_url:
+            raise ValueError("Upload server did not return a resumable session URL.")
+        self.offset = 0
+        self.save_checkpoint()
+
+    def _query_offset(self):
+        """서버가 받은 바이트 수를 물어 진행 위치를 맞춥니다. 이미 완료된 세션이면 True를 반환합니다."""
+        headers, body = self._request(self.session_url, {'X-Goog-Upload-Command': 'query'})
+        if headers.get('X-Goog-Upload-Status') == 'final':
+            self.file_name = self._parse_file_name(body)
+            return True
+        self.offset = int(headers.get('X-Goog-Upload-Size-Received', self.offset))
+        return False
+
+    @staticmethod
+    def _parse_file_name(body):
+        file_info = json.loads(body.decode('utf-8')).get('file', {})
+        if not file_info.get('name'):
+            raise ValueError("Upload finished but the server response has no file name.")
+        return file_info['name']
+
+    def _send_chunk(self, data, final):
+        headers = {
+            'X-Goog-Upload-Command': 'upload, finalize' if final else 'upload',
+            'X-Goog-Upload-Offset': str(self.offset),
+            'Content-Type': self.mime_type,
+        }
+        return self._request(self.session_url, headers, data)
+
+    def run(self, complete_event=None):
+        """
+        업로드를 끝까지 진행하고 업로드된 파일 이름('files/...')을 반환합니다.
+        complete_event가 주어지면 이벤트가 설정될 때까지 파일이 아직 쓰이는 중으로 보고, 완성된 조각만 보냅니다.
+        재시도 횟수를 넘기면 체크포인트를 남기고 UploadInterruptedError를 발생시킵니다.
+        """
+        if self.file_name:
+            return self.file_name
+        started = time.perf_counter()
+        start_offset = self.offset
+        failures = 0
+        with open(self.path, 'rb') as f:
+            while True:
+                if self._cancelled.is_set():
+                    raise ConnectionAbortedError(f"Upload of '{self.path}' was cancelled.")
+                complete = complete_event is None or complete_event.is_set()
+                size = os.path.getsize(self.path)
+                length = min(self.chunk_size, size - self.offset)
+                if not complete and length < self.chunk_size:
+                    complete_event.wait(0.05)
+                    continue
+                final = complete and self.offset + length >= size
+                if self.throttle and length:
+                    self.throttle(length)
+                try:
+                    if self.session_url is None:
+                        self._start_session(size if complete else None)
+                    f.seek(self.offset)
+                    _, body = self._send_chunk(f.read(length), final)
+                except urllib.error.HTTPError as e:
+                    if e.code not in RETRYABLE_STATUS:
+                        raise ValueError(f"Upload of '{self.path}' was rejected: HTTP {e.code} {e.reason}") from e
+                    failures = self._recover(failures, e)
+                    if self.file_name:
+                        break
+                    continue
+                except RETRYABLE_ERRORS as e:
+                    failures = self._recover(failures, e)
+                    if self.file_name:
+                        break
+                    continue
+                failures = 0
+                self.offset += length
+                if final:
+                    self.file_name = self._parse_file_name(body)
+                    break
+                self.save_checkpoint()
+                if self.progress_callback:
+                    self.progress_callback(self.offset, size if complete else None)
+
+        self.save_checkpoint()
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        sent_mb = (self.offset - start_offset) / (1024 * 1024)
+        logger.info(f"Uploaded '{self.path}' as {self.file_name}: {sent_mb:.1f} MB in {elapsed:.1f}s ({sent_mb / elapsed:.1f} MB/s, {self.resumes} resumes).")
+        if self.progress_callback:
+            self.progress_callback(self.offset, self.offset)
+        return self.file_name
+
+    def _recover(self, failures, error):
+        """실패한 조각 전송 뒤 잠시 기다렸다가 서버가 받은 위치를 다시 확인합니다. 늘어난 실패 횟수를 반환합니다."""
+        failures += 1
+        if failures > self.max_retries:
+            self.save_checkpoint()
+            raise UploadInterruptedError(
+                f"Upload of '{self.path}' stopped at {self.offset} bytes after {self.max_retries} retries: {error}",
+                self.checkpoint_path
+            ) from error
+        delay = min(30.0, 0.5 * 2 ** (failures - 1))
+        logger.warning(f"Upload chunk at offset {self.offset} failed ({error}). Resuming in {delay:.1f}s (attempt {failures}/{self.max_retries}).")
+        if self._cancelled.wait(delay) or self.session_url is None:
+            return failures
+        try:
+            self._query_offset()
+            self.resumes += 1
+        except (urllib.error.HTTPError, *RETRYABLE_ERRORS) as e:
+            logger.warning(f"Could not query upload status: {e}")
+        return failures
+
+    def start(self, complete_event=None):
+        """백그라운드 스레드에서 업로드를 시작합니다. 결과는 result()로 받습니다."""
+        def target():
+            try:
+                self._result = self.run(complete_event)
+            except BaseException as e:
+                self._error = e
+        self._thread = threading.Thread(target=target, name=f"upload-{os.path.basename(self.path)}", daemon=True)
+        self._thread.start()
+        return self
+
+    def result(self):
+        """백그라운드 업로드가 끝나길 기다려 파일 이름을 반환하거나, 발생한 예외를 다시 발생시킵니다."""
+        self._thread.join()
+        if self._error:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        """진행 중인 업로드를 멈추고 스레드가 끝날 때까지 기다립니다."""
+        self._cancelled.set()
+        if self._thread:
+            self._thread.join()
+
+
+if __name__ == '__main__':
+    import sys
+    import tempfile
+    from .local_client import LocalUploadServer
+
+    logging.basicConfig(level=logging.WARNING)
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 200
+    work_dir = tempfile.mkdtemp()
+    os.chdir(work_dir)
+    line = json.dumps({"key": "chunk_1", "request": {"contents": [{"parts": [{"text": "가나다 abc " * 400}]}]}}, ensure_ascii=False).encode('utf-8') + b'\n'
+    total_lines = int(size_mb * 1024 * 1024 / len(line)) + 1
+
+    with LocalUploadServer(drop_every=7) as server:
+        # 1) 요청 생성과 겹친 업로드: 생성기가 파일을 쓰는 동안 완성된 조각부터 올림
+        path = os.path.join(work_dir, 'requests.jsonl')
+        complete = threading.Event()
+        open(path, 'wb').close()
+        upload = ResumableUpload(path, 'local-key', upload_url=server.url, max_retries=10).start(complete)
+        started = time.perf_counter()
+        with open(path, 'wb') as f:
+            for _ in range(total_lines):
+                f.write(line)
+        complete.set()
+        file_name = upload.result()
+        elapsed = time.perf_counter() - started
+        with open(path, 'rb') as f:
+            identical = server.files[file_name] == f.read()
+        print(f"pipelined: {size_mb:g} MB in {elapsed:.2f}s ({size_mb / elapsed:.1f} MB/s), "
+              f"{server.dropped} disconnects injected, {upload.resumes} resumes, identical={identical}")
+
+        # 2) 앱 재시작 후 재개: 첫 업로드를 중간에 멈추고 체크포인트로 새 세션 객체를 만들어 이어서 올림
+        server.drop_every = 0
+        server.chunks = 0
+        server.fail_after = 3
+        first = ResumableUpload(path, 'local-key', upload_url=server.url, max_retries=1)
+        try:
+            first.run()
+        except UploadInterruptedError as e:
+            print(f"interrupted at {first.offset} bytes, checkpoint {os.path.basename(e.checkpoint_path)}")
+        server.fail_after = None
+        resumed = ResumableUpload.from_checkpoint(first.checkpoint_path, 'local-key', upload_url=server.url)
+        resumed_from = resumed.offset
+        started = time.perf_counter()
+        file_name = resumed.run()
+        elapsed = time.perf_counter() - started
+        with open(path, 'rb') as f:
+            identical = server.files[file_name] == f.read()
+        print(f"resumed from {resumed_from} bytes: finished in {elapsed:.2f}s, identical={identical}")
+        resumed.discard()
+    sys.exit(0 if identical else 1)
@@ -0,0 +1,62 @@
+import difflib
+import logging
+from itertools import accumulate
+
+logger = logging.getLogger(__name__)
+
+
+def iter_chunk_texts(text, chunk_lengths):
+    """이전 작업의 청크 길이 목록으로 스냅샷 텍스트를 원래 청크들로 다시 나눕니다."""
+    start = 0
+    for length in chunk_lengths:
+        yield text[start:start + length]
+        start += length
+
+
+def plan_revision(old_chunks, new_text, rechunk):
+    """
+    수정된 소스(new_text)를 이전 작업의 청크 경계(old_chunks)에 맞춰 다시 나눕니다.
+
+    두 텍스트를 줄 단위로 비교하여, 내용이 바뀌지 않은 영역에 완전히 포함된 이전 청크는
+    경계와 텍스트를 그대로 유지합니다 (따라서 이전 번역을 재사용할 수 있습니다).
+    그 사이에 남는 바뀐 부분만 rechunk(text) 함수로 새로 나눕니다.
+
+    (청크 텍스트, 재사용한 이전 청크 번호 또는 None) 목록을 새 텍스트 순서대로 반환합니다.
+    """
+    old_text = "".join(old_chunks)
+    old_lines = old_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    old_offsets = [0, *accumulate(len(line) for line in old_lines)]
+    new_offsets = [0, *accumulate(len(line) for line in new_lines)]
+
+    # 바뀌지 않은 구간: (이전 텍스트 시작, 끝, 새 텍스트 시작) 글자 위치
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    equal_ranges = [
+        (old_offsets[i1], old_offsets[i2], new_offsets[j1])
+        for tag, i1, i2, j1, _ in matcher.get_opcodes() if tag == 'equal'
+    ]
+
+    plan = []
+    new_pos = 0
+    chunk_start = 0
+    range_index = 0
+    for old_index, chunk in enumerate(old_chunks):
+        chunk_end = chunk_start + len(chunk)
+        while range_index < len(equal_ranges) and equal_ranges[range_index][1] < chunk_end:
+            range_index += 1
+        if chunk and range_index < len(equal_ranges):
+            old_start, old_end, new_start = equal_ranges[range_index]
+            if old_start <= chunk_start and chunk_end <= old_end:
+                mapped_start = new_start + (chunk_start - old_start)
+                if mapped_start > new_pos:
+                    plan.extend((text, None) for text in rechunk(new_text[new_pos:mapped_start]))
+                plan.append((chunk, old_index))
+                new_pos = mapped_start + len(chunk)
+        chunk_start = chunk_end
+
+    if new_pos < len(new_text):
+        plan.extend((text, None) for text in rechunk(new_text[new_pos:]))
+
+    reused = sum(1 for _, old_index in plan if old_index is not None)
+    logger.info(f"Revision plan: {reused} of {len(old_chunks)} previous chunks unchanged, {len(plan) - reused} new or changed chunks.")
+    return plan
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from .resumable_upload import UploadInterruptedError
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = 'submission_queue.json'
+
+# 항목 상태
+QUEUED = 'queued'
+IN_FLIGHT = 'in_flight'
+SUBMITTED = 'submitted'
+FAILED = 'failed'
+
+
+def is_rate_limit_error(error):
+    """요청 한도 초과(429 / RESOURCE_EXHAUSTED / quota) 오류인지 판별합니다."""
+    if getattr(error, 'code', None) == 429 or getattr(error, 'status', None) == 'RESOURCE_EXHAUSTED':
+        return True
+    message = str(error)
+    return '429' in message or 'RESOURCE_EXHAUSTED' in message or 'quota' in message.lower()
+
+
+class SubmissionQueue:
+    """
+    여러 소스 파일을 파일마다 별도의 배치 작업으로 제출하는 영속 대기열입니다 (submission_queue.json).
+    워커 스레드 max_concurrent개가 준비 -> 업로드 -> batches.create(submit_fn)를 동시에 진행하며,
+    submit_fn(소스 파일)은 만들어진 배치 작업 목록을 반환합니다 (분산 제출이면 여러 개, 캐시로 끝나면 빈 목록).
+    on_submitted(소스 파일, 작업 목록)은 워커 스레드에서 호출됩니다.
+    요청/업로드 속도는 GeminiApiService의 토큰 버킷이 제한합니다.
+    요청 한도 초과 오류가 나면 대기열 전체를 잠시 멈추고 해당 파일을 지수 백오프로 다시 시도합니다.
+    앱이 다시 시작되면 제출되지 않은 항목(대기/진행 중이던 항목)부터 이어서 처리합니다.
+    """
+
+    def __init__(self, submit_fn, queue_file=QUEUE_FILE, max_concurrent=2, max_attempts=8,
+                 on_change=None, on_submitted=None):
+        self.submit_fn = submit_fn
+        self.queue_file = queue_file
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_attempts = max_attempts
+        self.on_change = on_change
+        self.on_submitted = on_submitted
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._cooldown_until = 0.0
+        self._workers = []
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.queue_file):
+            return []
+        try:
+            with open(self.queue_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Could not read submission queue file '{self.queue_file}': {e}")
+            return []
+        # 이전 실행에서 끝난 항목은 버리고, 진행 중이던 항목은 처음부터 다시 제출
+        pending = [entry for entry in entries if entry['status'] in (QUEUED, IN_FLIGHT)]
+        for entry in pending:
+            entry['status'] = QUEUED
+        if pending:
+            logger.info(f"Submission queue restored with {len(pending)} pending file(s).")
+        return pending
+
+    def _save(self):
+        try:
+            with open(self.queue_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=4, ensure_ascii=False)
+        except OSError as e:
+            logger.error(f"Failed to save submission queue file: {e}", exc_info=True)
+
+    def counts(self):
+        """상태별 항목 수 {'queued', 'in_flight', 'submitted', 'failed'}를 반환합니다."""
+        with self._lock:
+            result = {QUEUED: 0, IN_FLIGHT: 0, SUBMITTED: 0, FAILED: 0}
+            for entry in self.entries:
+                result[entry['status']] += 1
+            return result
+
+    def _changed(self):
+        """(잠금을 잡은 상태에서 호출) 저장하고 대기 중인 워커와 관찰자에게 알립니다."""
+        self._save()
+        self._lock.notify_all()
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change(self.counts())
+
+    def enqueue(self, source_file_paths):
+        """소스 파일들을 대기열 끝에 추가합니다."""
+        with self._lock:
+            for path in source_file_paths:
+                self.entries.append({
+                    'id': uuid.uuid4().hex,
+                    'source_file': path,
+                    'status': QUEUED,
+                    'attempts': 0,
+                    'not_before': 0.0,
+                    'job_names': [],
+                    'error': None,
+                })
+            self._changed()
+        logger.info(f"{len(source_file_paths)} file(s) added to the submission queue.")
+        self._notify()
+
+    def start(self):
+        """워커 스레드를 시작합니다."""
+        self._stop.clear()
+        for i in range(self.max_concurrent - len(self._workers)):
+            worker = threading.Thread(target=self._worker_loop, name=f"submission-worker-{i + 1}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self._notify()
+
+    def stop(self, timeout=5):
+        """새 항목을 꺼내지 않도록 하고 워커가 끝나길 잠시 기다립니다. 진행 중이던 항목은 다음 실행에서 다시 제출됩니다."""
+        self._stop.set()
+        with self._lock:
+            self._lock.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def _next_entry(self):
+        """제출할 수 있는 다음 항목을 꺼냅니다. 중지되면 None을 반환합니다."""
+        with self._lock:
+            while not self._stop.is_set():
+                now = time.time()
+                ready = [e for e in self.entries if e['status'] == QUEUED and e['not_before'] <= now]
+                if ready and now >= self._cooldown_until:
+                    entry = ready[0]
+                    entry['status'] = IN_FLIGHT
+                    entry['attempts'] += 1
+                    self._changed()
+                    return entry
+                waits = [e['not_before'] - now for e in self.entries if e['status'] == QUEUED]
+                if self._cooldown_until > now:
+                    waits.append(self._cooldown_until - now)
+                self._lock.wait(timeout=max(0.05, min(waits)) if waits else None)
+            return None
+
+    def _worker_loop(self):
+        while True:
+            entry = self._next_entry()
+            if entry is None:
+                return
+            self._notify()
+            self._process(entry)
+            self._notify()
+
+    def _process(self, entry):
+        source_file = entry['source_file']
+        try:
+            jobs = self.submit_fn(source_file)
+        except UploadInterruptedError as e:
+            # 요청 파일과 체크포인트는 남아 있으므로 다음 실행의 업로드 재개로 작업이 만들어짐
+            self._finish(entry, FAILED, error=f"업로드 중단 (다음 실행 시 이어서 업로드): {e}")
+            return
+        except Exception as e:
+            if is_rate_limit_error(e) and entry['attempts'] < self.max_attempts:
+                delay = min(600.0, 30.0 * 2 ** (entry['attempts'] - 1))
+                logger.warning(f"Rate limited while submitting '{source_file}'. Pausing the queue for {delay:.0f}s: {e}")
+                with self._lock:
+                    entry['status'] = QUEUED
+                    entry['not_before'] = time.time() + delay
+                    entry['error'] = str(e)
+                    self._cooldown_until = max(self._cooldown_until, entry['not_before'])
+                    self._changed()
+                return
+            logger.error(f"Failed to submit '{source_file}' from the queue: {e}", exc_info=True)
+            self._finish(entry, FAILED, error=str(e))
+            return
+        self._finish(entry, SUBMITTED, job_names=[job.name for job in jobs])
+        if self.on_submitted:
+            self.on_submitted(source_file, jobs)
+
+    def _finish(self, entry, status, **fields):
+        with self._lock:
+            entry.update(status=status, **fields)
+            self._changed()
@@ -0,0 +1,128 @@
+import json
+import math
+import os
+import re
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_FILE = 'token_calibration.json'
+
+# 문자 종류별 (정규식, 문자당 예상 토큰 수)
+# Gemini 토크나이저 기준의 대략적인 값이며, 실제 사용량으로 보정(calibrate)할 수 있습니다.
+_SCRIPT_RULES = [
+    ('cjk', re.compile('[\u3040-\u30ff\u31f0-\u31ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]'), 0.8),
+    ('hangul', re.compile('[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]'), 0.6),
+    ('latin', re.compile('[A-Za-z\u00c0-\u024f]'), 0.25),
+    ('digit', re.compile(r'[0-9]'), 0.5),
+    ('space', re.compile(r'\s'), 0.1),
+]
+# 위 규칙에 해당하지 않는 문자 (문장 부호, 기호, 기타 문자)
+_OTHER_TOKENS_PER_CHAR = 0.5
+
+# 보정 계수의 허용 범위 (이상치 샘플로 추정이 망가지는 것을 방지)
+_MIN_SCALE = 0.5
+_MAX_SCALE = 2.0
+# 작업 하나에서 보정에 쓰는 최소 샘플(청크) 수
+_MIN_SAMPLES = 3
+
+
+class TokenEstimator:
+    """
+    API 호출 없이 텍스트의 토큰 수를 빠르게 추정합니다.
+    문자 종류(스크립트)별 휴리스틱을 사용하며, 모델별 보정 계수를 적용합니다.
+
+    보정은 추정 대상과 같은 텍스트(소스 청크)와 그 요청의 실제 입력 토큰 수(prompt_token_count)로 합니다.
+    입력 토큰 수에는 작업 안에서 모든 청크에 같은 시스템 명령어/prefill 토큰이 더해져 있으므로,
+    작업별로 평균을 뺀 값들로 기울기(청크 추정치 1당 실제 토큰 수)를 구해 고정 부분을 상쇄합니다.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, model_name, calibration_file=CALIBRATION_FILE):
+        self.model_name = model_name
+        self.calibration_file = calibration_file
+        # 작업별로 평균을 뺀 (추정치, 실제 토큰 수)의 공분산/분산 합 (기울기 = _sxy / _sxx)
+        self._sxy = 0.0
+        self._sxx = 0.0
+        self._lock = threading.Lock()
+        self._load_calibration()
+
+    @classmethod
+    def for_model(cls, model_name):
+        """모델별로 캐시된 추정기 인스턴스를 반환합니다."""
+        model_name = (model_name or '').replace('models/', '', 1)
+        with cls._instances_lock:
+            if model_name not in cls._instances:
+                cls._instances[model_name] = cls(model_name)
+            return cls._instances[model_name]
+
+    @property
+    def scale(self):
+        """과거 결과의 usage_metadata로부터 계산된 보정 계수입니다 (샘플이 없으면 1.0)."""
+        if self._sxx <= 0:
+            return 1.0
+        return min(_MAX_SCALE, max(_MIN_SCALE, self._sxy / self._sxx))
+
+    def _raw_estimate(self, text):
+        total = 0.0
+        remaining = len(text)
+        for _, pattern, tokens_per_char in _SCRIPT_RULES:
+            count = len(pattern.findall(text))
+            total += count * tokens_per_char
+            remaining -= count
+        return total + remaining * _OTHER_TOKENS_PER_CHAR
+
+    def estimate(self, text):
+        """텍스트의 예상 토큰 수를 반환합니다."""
+        if not text:
+            return 0
+        return math.ceil(self._raw_estimate(text) * self.scale)
+
+    def observe_prompts(self, samples):
+        """
+        작업 하나의 (소스 청크 텍스트, 그 요청의 prompt_token_count) 목록을 보정 데이터에 추가합니다.
+        모든 요청에 같은 고정 토큰(시스템 명령어, prefill)이 붙은 같은 작업의 샘플이어야 합니다.
+        """
+        points = [(self._raw_estimate(text), actual) for text, actual in samples if text and actual]
+        if len(points) < _MIN_SAMPLES:
+            return
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        with self._lock:
+            self._sxy += sum((x - mean_x) * (y - mean_y) for x, y in points)
+            self._sxx += sum((x - mean_x) ** 2 for x, _ in points)
+
+    def _load_calibration(self):
+        if not os.path.exists(self.calibration_file):
+            return
+        try:
+            with open(self.calibration_file, 'r', encoding='utf-8') as f:
+                entry = json.load(f).get(self.model_name, {})
+            # 예전 형식(번역문 기준 actual_tokens/estimated_tokens)은 소스 추정에 맞지 않으므로 쓰지 않음
+            self._sxy = entry.get('sxy', 0.0)
+            self._sxx = entry.get('sxx', 0.0)
+        except (json.JSONDecodeError, OSError, AttributeError) as e:
+            logger.warning(f"Could not read token calibration file '{self.calibration_file}': {e}")
+
+    def save_calibration(self):
+        """현재 보정 데이터를 파일에 저장합니다 (다른 모델의 항목은 유지)."""
+        with self._lock:
+            data = {}
+            if os.path.exists(self.calibration_file):
+                try:
+                    with open(self.calibration_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except (json.JSONDecodeError, OSError):
+                    data = {}
+            data[self.model_name] = {
+                'sxy': self._sxy,
+                'sxx': self._sxx,
+            }
+            try:
+                with open(self.calibration_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=4, ensure_ascii=False)
+                logger.info(f"Token estimator for '{self.model_name}' calibrated (scale={self.scale:.3f}).")
+            except OSError as e:
+                logger.error(f"Failed to save token calibration file: {e}")
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = 'translation_cache.db'
+# 모아 둔 최근 사용 시간 갱신이 이 개수를 넘으면 바로 한 번에 기록
+TOUCH_FLUSH_THRESHOLD = 1000
+
+
+class TranslationCache:
+    """
+    번역 결과를 청크 내용 기준으로 저장하는 영속 캐시입니다 (SQLite).
+    키는 청크 텍스트와 모델/프롬프트/생성 설정의 해시이므로, 같은 설정으로 같은 청크를 다시
+    번역할 때 요청을 보내지 않고 저장된 번역을 재사용할 수 있습니다.
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+    제출된 작업이 아직 참조하는 항목은 pin으로 고정되어 삭제되지 않습니다.
+    조회할 때의 최근 사용 시간 갱신은 메모리에 모았다가 저장/고정/통계 기록 때 한 트랜잭션으로 기록하고,
+    전체 크기는 meta 테이블에 누적해 두므로 정리할 때 전체 항목을 합산하지 않습니다.
+    """
+
+    def __init__(self, cache_file=CACHE_FILE, max_bytes=512 * 1024 * 1024):
+        self.cache_file = cache_file
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 아직 기록하지 않은 최근 사용 시간 {키: 시각}
+        self._touched = {}
+        self._conn = sqlite3.connect(cache_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                translation TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+            CREATE TABLE IF NOT EXISTS pins (
+                owner TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (owner, key)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()
+        if row is None:
+            # meta 테이블이 없던 캐시 파일은 한 번만 합산해 기록
+            self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            self._save_total_size()
+        else:
+            self._total_size = row[0]
+        self._conn.commit()
+
+    def _save_total_size(self):
+        self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('total_size', ?)", (self._total_size,))
+
+    def _flush_touches(self):
+        """모아 둔 최근 사용 시간을 기록합니다 (_lock을 잡은 상태에서 호출, 커밋은 호출하는 쪽에서)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+
+    @staticmethod
+    def make_namespace(model_name, system_instruction, prefill, generation_config):
+        """청크와 무관한 요청 설정(모델, 시스템 명령어, prefill, 생성 설정)의 해시를 반환합니다."""
+        settings = json.dumps(
+            [model_name, system_instruction, prefill, generation_config],
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(namespace, chunk):
+        """설정 해시와 청크 텍스트로 캐시 키를 만듭니다."""
+        return hashlib.sha256(f"{namespace}\n{chunk}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """캐시된 번역을 반환하고 최근 사용 시간을 갱신합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            row = self._conn.execute("SELECT translation FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_FLUSH_THRESHOLD:
+                self._flush_touches()
+                self._conn.commit()
+            return row[0]
+
+    def contains(self, key):
+        """항목 존재 여부를 확인합니다 (적중/실패 통계와 최근 사용 시간도 갱신)."""
+        return self.get(key) is not None
+
+    def put_many(self, items):
+        """(key, translation) 목록을 저장한 뒤 크기 제한에 맞춰 오래된 항목을 정리합니다."""
+        now = time.time()
+        # 같은 키가 여러 번 있으면 마지막 번역만 저장 (전체 크기를 한 번만 반영하도록)
+        rows = list({key: (key, text, len(text.encode('utf-8')), now) for key, text in items}.values())
+        if not rows:
+            return
+        with self._lock:
+            self._flush_touches()
+            for key, _, size, _ in rows:
+                old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._total_size += size - (old[0] if old else 0)
+                self._touched.pop(key, None)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, translation, size, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._save_total_size()
+            self._conn.commit()
+        self.evict()
+
+    def put(self, key, translation):
+        self.put_many([(key, translation)])
+
+    def pin(self, owner, keys):
+        """owner(제출 작업)가 참조하는 항목을 삭제 대상에서 제외합니다."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.executemany("INSERT OR IGNORE INTO pins (owner, key) VALUES (?, ?)", [(owner, k) for k in keys])
+            self._conn.commit()
+
+    def unpin(self, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM pins WHERE owner = ?", (owner,))
+            self._conn.commit()
+
+    def total_size(self):
+        with self._lock:
+            return self._total_size
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 고정되지 않은 항목을 LRU 순서로 삭제합니다."""
+        with self._lock:
+            if self._total_size <= self.max_bytes:
+                return 0
+            # LRU 순서가 맞도록 모아 둔 최근 사용 시간부터 기록
+            self._flush_touches()
+            total = self._total_size
+            candidates = self._conn.execute(
+                "SELECT key, size FROM entries WHERE key NOT IN (SELECT key FROM pins) ORDER BY last_access"
+            )
+            to_delete = []
+            for key, size in candidates:
+                if total <= self.max_bytes:
+                    break
+                to_delete.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", to_delete)
+            self._total_size = total
+            self._save_total_size()
+            self._conn.commit()
+        if to_delete:
+            logger.info(f"Translation cache evicted {len(to_delete)} entries (now {total} bytes).")
+        return len(to_delete)
+
+    def log_stats(self, context=""):
+        """적중/실패 통계를 로그에 남기고 카운터를 초기화합니다. 모아 둔 최근 사용 시간도 이때 기록합니다."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            hits, misses = self.hits, self.misses
+            self.hits = 0
+            self.misses = 0
+        total = hits + misses
+        rate = (hits / total * 100) if total else 0.0
+        logger.info(f"Translation cache{f' ({context})' if context else ''}: {hits} hits, {misses} misses (hit rate {rate:.1f}%).")
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
@@ -2,15 +2,20 @@ import sys
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLineEdit, QTableView, QHeaderView, QStatusBar, QLabel,
-    QFileDialog
+    QFileDialog, QPlainTextEdit
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QTextCursor
 
 class MainWindow(QMainWindow):
+    # 창에 끌어다 놓은 파일 경로 목록
+    files_dropped = Signal(list)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("소설 번역기")
         self.setGeometry(100, 100, 800, 600)
+        self.setAcceptDrops(True)
 
         # --- 메인 위젯 및 레이아웃 ---
         central_widget = QWidget()
@@ -23,13 +28,17 @@ class MainWindow(QMainWindow):
         self.settings_button.setToolTip("애플리케이션 설정을 변경합니다 (API 키, 모델 등).")
         self.refresh_button = QPushButton("새로고침")
         self.refresh_button.setToolTip("서버로부터 작업 목록을 즉시 새로고침합니다.")
+        self.cancel_tasks_button = QPushButton("작업 취소")
+        self.cancel_tasks_button.setToolTip("진행 중인 작업(추가, 다운로드, 새로고침 등)의 취소를 요청합니다.")
+        self.cancel_tasks_button.setEnabled(False)
         top_layout.addWidget(self.settings_button)
         top_layout.addWidget(self.refresh_button)
         top_layout.addStretch(1)
+        top_layout.addWidget(self.cancel_tasks_button)
 
         file_selection_layout = QHBoxLayout()
         self.source_file_path_edit = QLineEdit()
-        self.source_file_path_edit.setPlaceholderText("번역할 소설 (.txt) 파일을 선택하세요...")
+        self.source_file_path_edit.setPlaceholderText("번역할 소설 (.txt) 파일을 선택하세요 (여러 개 선택 가능)...")
         self.source_file_path_edit.setToolTip("번역할 텍스트 파일의 경로입니다.")
         self.browse_button = QPushButton("찾아보기")
         self.browse_button.setToolTip("로컬 파일 시스템에서 번역할 파일을 선택합니다.")
@@ -40,9 +49,14 @@ class MainWindow(QMainWindow):
         main_layout.addLayout(file_selection_layout)
 
         # --- 작업 추가 버튼 ---
+        add_job_layout = QHBoxLayout()
         self.add_job_button = QPushButton("새 번역 작업 추가")
         self.add_job_button.setToolTip("선택된 파일을 사용하여 새 번역 작업을 생성하고 목록에 추가합니다.")
-        main_layout.addWidget(self.add_job_button)
+        self.enqueue_button = QPushButton("파일별 작업으로 대기열에 추가")
+        self.enqueue_button.setToolTip("선택된 파일마다 별도의 작업을 만들도록 제출 대기열에 추가합니다. 창에 파일을 끌어다 놓아도 됩니다.")
+        add_job_layout.addWidget(self.add_job_button)
+        add_job_layout.addWidget(self.enqueue_button)
+        main_layout.addLayout(add_job_layout)
 
         # --- 작업 목록 테이블 ---
         self.jobs_table_view = QTableView()
@@ -56,11 +70,52 @@ class MainWindow(QMainWindow):
         self.jobs_table_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.jobs_table_view.customContextMenuRequested.connect(self.show_jobs_table_context_menu)
 
+        # --- 미리보기 (배치 작업을 기다리는 동안 처음 몇 청크의 번역을 실시간으로 표시) ---
+        self.preview_label = QLabel("미리보기")
+        self.preview_text_edit = QPlainTextEdit()
+        self.preview_text_edit.setReadOnly(True)
+        self.preview_text_edit.setMaximumHeight(180)
+        self.preview_text_edit.setPlaceholderText("새 번역 작업을 추가하면 처음 몇 문단의 번역이 배치 작업과 별도로 여기에 바로 표시됩니다.")
+        self.preview_text_edit.setToolTip("미리보기 번역은 결과 파일에도 그대로 사용됩니다 (설정: preview_chunks).")
+        main_layout.addWidget(self.preview_label)
+        main_layout.addWidget(self.preview_text_edit)
+
         # --- 상태 표시줄 ---
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_label = QLabel("준비 완료")
         self.status_bar.addWidget(self.status_label)
+        self.queue_label = QLabel("")
+        self.queue_label.setToolTip("제출 대기열: 대기 / 진행 중 / 제출 완료 / 실패 파일 수")
+        self.status_bar.addPermanentWidget(self.queue_label)
+        self.next_poll_label = QLabel("")
+        self.next_poll_label.setToolTip("끝나지 않은 작업만 작업별 간격으로 상태를 확인합니다.")
+        self.status_bar.addPermanentWidget(self.next_poll_label)
+        self.tasks_label = QLabel("")
+        self.status_bar.addPermanentWidget(self.tasks_label)
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if paths:
+            self.files_dropped.emit(paths)
+            event.acceptProposedAction()
+
+    def start_preview(self, file_name):
+        """새 미리보기를 위해 미리보기 창을 비웁니다."""
+        self.preview_label.setText(f"미리보기: {file_name}")
+        self.preview_text_edit.clear()
+
+    def append_preview_text(self, text):
+        """미리보기 창 끝에 텍스트를 이어 붙이고 끝으로 스크롤합니다."""
+        cursor = self.preview_text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.preview_text_edit.setTextCursor(cursor)
+        self.preview_text_edit.ensureCursorVisible()
 
     def show_jobs_table_context_menu(self, position):
         pass # This will be connected in main.py
@@ -82,6 +137,30 @@ class MainWindow(QMainWindow):
         )
         return file_path
 
+    def get_save_directory(self):
+        """폴더 선택 대화상자를 열어 여러 파일 작업의 결과를 저장할 폴더를 고르도록 합니다."""
+        return QFileDialog.getExistingDirectory(self, "번역 결과 저장 폴더 선택")
+
+    def get_selected_file_paths(self):
+        """파일 대화상자를 열어 사용자가 하나 이상의 파일을 선택하도록 합니다."""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "번역할 파일 선택",
+            "",
+            "Text Files (*.txt);;All Files (*)"
+        )
+        return file_paths
+
+    def get_revised_file_path(self, original_path):
+        """수정본 재번역에 사용할 (수정된) 소스 파일을 선택하도록 합니다."""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "수정된 소스 파일 선택",
+            original_path,
+            "Text Files (*.txt);;All Files (*)"
+        )
+        return file_path
+
     def get_selected_file_path(self):
         """파일 대화상자를 열어 사용자가 파일을 선택하도록 합니다."""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -2,7 +2,7 @@ import json
 from PySide6.QtWidgets import (
     QDialog, QWidget, QVBoxLayout, QFormLayout, QLineEdit,
     QPushButton, QDialogButtonBox, QLabel, QTextEdit, QDoubleSpinBox,
-    QSpinBox
+    QSpinBox, QComboBox
 )
 from PySide6.QtGui import QValidator, QIntValidator
 
@@ -51,6 +51,14 @@ class SettingsDialog(QDialog):
         self.chunk_size_edit.setToolTip("API 요청 시 한 번에 보낼 텍스트의 최대 글자 수 (100 ~ 100000)")
         self.chunk_size_edit.setValidator(QIntValidator(100, 100000, self))
 
+        self.chunking_mode_combo = QComboBox()
+        self.chunking_mode_combo.addItem("글자 수", "chars")
+        self.chunking_mode_combo.addItem("토큰 예산", "tokens")
+        self.chunking_mode_combo.setToolTip("텍스트 분할 기준 (글자 수: Chunk 크기 사용, 토큰 예산: 추정 토큰 수 기준으로 묶음)")
+        self.chunk_token_budget_edit = QLineEdit()
+        self.chunk_token_budget_edit.setToolTip("토큰 예산 모드에서 요청 하나에 담을 최대 추정 토큰 수 (100 ~ 100000)")
+        self.chunk_token_budget_edit.setValidator(QIntValidator(100, 100000, self))
+
         self.temperature_spinbox = QDoubleSpinBox()
         self.temperature_spinbox.setToolTip("모델 응답의 창의성 조절 (높을수록 다양, 낮을수록 결정적)")
         self.temperature_spinbox.setRange(0.0, 2.0)
@@ -73,6 +81,8 @@ class SettingsDialog(QDialog):
         form_layout.addRow(QLabel("모델 이름:"), self.model_name_edit)
         form_layout.addRow(QLabel("시스템 명령어:"), self.system_instruction_edit)
         form_layout.addRow(QLabel("Chunk 크기:"), self.chunk_size_edit)
+        form_layout.addRow(QLabel("분할 기준:"), self.chunking_mode_combo)
+        form_layout.addRow(QLabel("토큰 예산:"), self.chunk_token_budget_edit)
         form_layout.addRow(QLabel("Temperature:"), self.temperature_spinbox)
         form_layout.addRow(QLabel("Top P:"), self.top_p_spinbox)
         form_layout.addRow(QLabel("Thinking Budget:"), self.thinking_budget_edit)
@@ -95,6 +105,8 @@ class SettingsDialog(QDialog):
             "model_name": self.model_name_edit.text(),
             "system_instruction": self.system_instruction_edit.toPlainText(),
             "chunk_size": int(self.chunk_size_edit.text() or 0),
+            "chunking_mode": self.chunking_mode_combo.currentData(),
+            "chunk_token_budget": int(self.chunk_token_budget_edit.text() or 0),
             "temperature": self.temperature_spinbox.value(),
             "top_p": self.top_p_spinbox.value(),
             "thinking_budget": int(self.thinking_budget_edit.text() or 0),
@@ -109,6 +121,9 @@ class SettingsDialog(QDialog):
         self.model_name_edit.setText(config.get("model_name", "gemini-1.5-pro"))
         self.system_instruction_edit.setPlainText(config.get("system_instruction", ""))
         self.chunk_size_edit.setText(str(config.get("chunk_size", 5000)))
+        mode_index = self.chunking_mode_combo.findData(config.get("chunking_mode", "chars"))
+        self.chunking_mode_combo.setCurrentIndex(max(mode_index, 0))
+        self.chunk_token_budget_edit.setText(str(config.get("chunk_token_budget", 2000)))
         self.temperature_spinbox.setValue(config.get("temperature", 1.0))
         self.top_p_spinbox.setValue(config.get("top_p", 0.95))
         self.thinking_budget_edit.setText(str(config.get("thinking_budget", 128)))
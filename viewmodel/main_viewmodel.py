@@ -1,18 +1,65 @@
 import logging
-from PySide6.QtCore import QObject, Signal, Slot, QTimer, QAbstractTableModel, Qt
+from PySide6.QtCore import QObject, Signal, Slot, QTimer, QAbstractTableModel, QModelIndex, Qt
 from PySide6.QtGui import QColor
+import math
 import os
+import time
 
 from model.translation_job import TranslationJob, JobStatus
+from model.submission_queue import SubmissionQueue
+from model.poll_scheduler import PollScheduler
+from model.gemini_api_service import normalize_job_state
+from .task_runner import TaskRunner
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+STATUS_COLORS = {
+    JobStatus.FAILED: QColor("red"),
+    JobStatus.SUCCEEDED: QColor("lightgreen"),
+}
+
+
+def _display_row(job):
+    """작업 한 행의 표시 문자열들을 한 번만 만들어 둡니다 (data()마다 strftime/basename을 호출하지 않음)."""
+    return (
+        job.job_name,
+        job.display_name,
+        job.status.value,
+        job.creation_time.strftime("%Y-%m-%d %H:%M:%S"),
+        job.update_time.strftime("%Y-%m-%d %H:%M:%S"),
+        os.path.basename(job.source_file_path),
+        job.output_file_path,
+        job.error_message,
+    )
+
+
 class JobTableModel(QAbstractTableModel):
-    def __init__(self, parent=None, jobs=[]):
+    """
+    작업 목록 테이블 모델입니다.
+    update_jobs()는 새 목록을 job_name 기준으로 현재 목록과 비교해 바뀐 행/열에 대해서만
+    rowsRemoved / rowsInserted / dataChanged를 알리므로, 새로고침해도 선택과 스크롤 위치가 유지됩니다.
+    """
+
+    def __init__(self, parent=None, jobs=()):
         super().__init__(parent)
-        self._jobs = jobs
+        self._jobs = list(jobs)
+        self._rows = [_display_row(job) for job in self._jobs]
         self._headers = ["작업 이름", "표시 이름", "상태", "생성 시간", "업데이트 시간", "소스 파일", "출력 파일", "오류"]
+        # 스크롤이 끝에 닿으면 다음 페이지를 가져오는 함수 (set_fetch_more로 지정)
+        self._fetch_more = None
+
+    def set_fetch_more(self, fetch_more):
+        """더 가져올 페이지가 있으면 그 페이지를 가져오는 함수를, 없으면 None을 지정합니다."""
+        self._fetch_more = fetch_more
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._fetch_more is not None
+
+    def fetchMore(self, parent):
+        if self.canFetchMore(parent):
+            fetch_more, self._fetch_more = self._fetch_more, None
+            fetch_more()
 
     def rowCount(self, parent):
         return len(self._jobs)
@@ -23,25 +70,12 @@ class JobTableModel(QAbstractTableModel):
     def data(self, index, role):
         if not index.isValid():
             return None
-        
-        job = self._jobs[index.row()]
-        col = index.column()
 
         if role == Qt.DisplayRole:
-            if col == 0: return job.job_name
-            if col == 1: return job.display_name
-            if col == 2: return job.status.value
-            if col == 3: return job.creation_time.strftime("%Y-%m-%d %H:%M:%S")
-            if col == 4: return job.update_time.strftime("%Y-%m-%d %H:%M:%S")
-            if col == 5: return os.path.basename(job.source_file_path)
-            if col == 6: return job.output_file_path
-            if col == 7: return job.error_message
-        
+            return self._rows[index.row()][index.column()]
+
         if role == Qt.BackgroundRole:
-            if job.status == JobStatus.FAILED:
-                return QColor("red")
-            if job.status == JobStatus.SUCCEEDED:
-                return QColor("lightgreen")
+            return STATUS_COLORS.get(self._jobs[index.row()].status)
 
         return None
 
@@ -49,17 +83,92 @@ class JobTableModel(QAbstractTableModel):
         if role == Qt.DisplayRole and orientation == Qt.Horizontal:
             return self._headers[section]
         return None
-    
+
     def update_jobs(self, jobs):
+        """
+        표시할 작업 목록을 jobs(순서 포함)로 바꿉니다.
+        남은 작업들의 상대 순서가 바뀐 경우에만 전체를 다시 그립니다 (목록 응답은 생성 시간 순이라 드묾).
+        """
+        jobs = list(jobs)
+        new_names = [job.job_name for job in jobs]
+        wanted = set(new_names)
+        if len(wanted) != len(new_names):
+            # 같은 이름이 두 번 들어오면 행 대응이 모호하므로 통째로 교체
+            self._reset(jobs)
+            return
+
+        # 1. 없어진 작업의 행을 아래쪽 구간부터 제거
+        row = len(self._jobs) - 1
+        while row >= 0:
+            if self._jobs[row].job_name in wanted:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._jobs[row].job_name not in wanted:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            del self._jobs[row + 1:last + 1]
+            del self._rows[row + 1:last + 1]
+            self.endRemoveRows()
+
+        current_names = {job.job_name for job in self._jobs}
+        kept_order = [name for name in new_names if name in current_names]
+        if kept_order != [job.job_name for job in self._jobs]:
+            self._reset(jobs)
+            return
+
+        # 2. 새 작업을 연속된 구간 단위로 제자리에 삽입
+        row = 0
+        index = 0
+        while index < len(jobs):
+            if jobs[index].job_name in current_names:
+                row += 1
+                index += 1
+                continue
+            start = index
+            while index < len(jobs) and jobs[index].job_name not in current_names:
+                index += 1
+            inserted = jobs[start:index]
+            self.beginInsertRows(QModelIndex(), row, row + len(inserted) - 1)
+            self._jobs[row:row] = inserted
+            self._rows[row:row] = [_display_row(job) for job in inserted]
+            self.endInsertRows()
+            row += len(inserted)
+
+        # 3. 내용이 바뀐 행은 바뀐 열 범위만 갱신
+        for row, job in enumerate(jobs):
+            if self._jobs[row] is job or self._jobs[row] == job:
+                self._jobs[row] = job
+                continue
+            old_values = self._rows[row]
+            new_values = _display_row(job)
+            self._jobs[row] = job
+            self._rows[row] = new_values
+            changed = [col for col, (old, new) in enumerate(zip(old_values, new_values)) if old != new]
+            if changed:
+                self.dataChanged.emit(self.index(row, changed[0]), self.index(row, changed[-1]))
+
+    def _reset(self, jobs):
         self.beginResetModel()
         self._jobs = jobs
+        self._rows = [_display_row(job) for job in jobs]
         self.endResetModel()
 
 
 class MainViewModel(QObject):
     # --- Signals ---
     status_message_changed = Signal(str)
-    is_loading_changed = Signal(bool)
+    active_tasks_changed = Signal(int)
+    submission_counts_changed = Signal(dict)
+    next_poll_changed = Signal(int)  # 다음 상태 확인까지 남은 초 (확인할 작업이 없으면 -1)
+    jobs_refreshed = Signal(bool)  # 작업 목록 새로고침이 끝남 (성공 여부)
+    preview_started = Signal(str)  # 새 미리보기 시작 (소스 파일 이름)
+    preview_text_appended = Signal(str)  # 미리보기 창에 이어 붙일 텍스트
+    # 제출 대기열의 워커 스레드에서 emit되어 GUI 스레드의 슬롯으로 전달됨
+    _queue_counts_updated = Signal(dict)
+    _queue_job_submitted = Signal(str, list)
+    # 미리보기 스레드에서 emit됨 (청크 번호, 텍스트 조각)
+    _preview_delta = Signal(int, str)
     
     def __init__(self, config_manager, gemini_api_service, file_service):
         super().__init__()
@@ -70,27 +179,52 @@ class MainViewModel(QObject):
         self.file_service = file_service
         
         # --- Properties ---
-        self._batch_jobs = []
+        # 마지막으로 받은 첫 페이지를 먼저 보여 주고, 새로고침으로 갱신
+        self._batch_jobs = self._cached_jobs()
+        self._next_page_token = None
+        # 목록 앞쪽에서 첫 페이지(와 그 뒤 추가된 작업)가 차지하는 행 수. 새로고침은 이 부분만 교체합니다.
+        self._first_page_rows = len(self._batch_jobs)
         self._new_source_file_path = ""
-        self._is_loading = False
+        self._new_source_file_paths = []
         self._status_message = "준비 완료"
+        # 목록 새로고침과 동시에 추가된 작업이 새로고침 결과로 사라지지 않도록 추가 시각을 기록
+        self._inserted_at = {}
         
         self.jobs_model = JobTableModel(jobs=self._batch_jobs)
 
-        # --- Timer for auto-refresh ---
-        self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.load_jobs)
-        self.refresh_timer.start(30000) # 30초마다
+        # --- Background tasks (API calls never run on the GUI thread) ---
+        self.tasks = TaskRunner(self)
+        self.tasks.active_count_changed.connect(self.active_tasks_changed)
+        self.tasks.task_progress.connect(self._on_task_progress)
+
+        # --- Submission queue (many files, one batch job per file) ---
+        self.submission_queue = SubmissionQueue(
+            self.gemini_api.create_batch_jobs,
+            max_concurrent=self.config_manager.get('max_concurrent_submissions', 2),
+            on_change=self._queue_counts_updated.emit,
+            on_submitted=self._queue_job_submitted.emit,
+        )
+        self._queue_counts_updated.connect(self._on_queue_counts_updated)
+        self._queue_job_submitted.connect(self._on_queue_job_submitted)
+        # 미리보기에서 마지막으로 텍스트를 받은 청크 번호 (청크가 바뀌면 구분선을 넣음)
+        self._preview_chunk = 0
+        self._preview_delta.connect(self._on_preview_delta)
+
+        # --- Adaptive status polling (only jobs that have not finished) ---
+        self.poll_scheduler = PollScheduler(
+            min_interval=self.config_manager.get('poll_min_seconds', 15),
+            max_interval=self.config_manager.get('poll_max_seconds', 600),
+            backoff=self.config_manager.get('poll_backoff', 1.5),
+        )
+        # 1초마다 남은 시간을 알리고, 확인할 작업이 있으면 상태 확인 작업을 시작
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self._on_poll_tick)
+        self.poll_timer.start(1000)
 
     # --- Property Getters/Setters ---
     @property
-    def is_loading(self):
-        return self._is_loading
-
-    @is_loading.setter
-    def is_loading(self, value):
-        self._is_loading = value
-        self.is_loading_changed.emit(value)
+    def active_task_count(self):
+        return self.tasks.active_count
 
     @property
     def status_message(self):
@@ -101,11 +235,176 @@ class MainViewModel(QObject):
         self._status_message = value
         self.status_message_changed.emit(value)
 
+    def _on_task_progress(self, label, message):
+        self.status_message = f"{label}: {message}"
+
+    def _cached_jobs(self):
+        """작업 추적 DB에 저장된 마지막 첫 페이지의 작업 상태를 TranslationJob 목록으로 읽어 옵니다."""
+        jobs = []
+        for entry in self.gemini_api.job_tracker.load_job_list():
+            if not (entry['create_time'] and entry['update_time']):
+                continue
+            jobs.append(TranslationJob(
+                job_name=entry['job_name'],
+                display_name=entry['display_name'] or entry['job_name'],
+                status=self._convert_status(entry['state'] or ""),
+                creation_time=datetime.fromisoformat(entry['create_time']),
+                update_time=datetime.fromisoformat(entry['update_time']),
+                source_file_path=entry['source_file'] or "",
+            ))
+        return jobs
+
+    def _job_from_api(self, job, source_file_path="", previous=None):
+        """
+        API의 작업 객체를 TranslationJob으로 바꿉니다.
+        이전 새로고침의 같은 작업(previous)이 상태와 업데이트 시간까지 같으면 그 객체를 그대로 재사용합니다.
+        """
+        status = self._convert_status(job.state.name)
+        if previous and previous.status == status and previous.update_time == job.update_time \
+                and previous.display_name == job.display_name:
+            return previous
+        return TranslationJob(
+            job_name=job.name,
+            display_name=job.display_name,
+            status=status,
+            creation_time=job.create_time,
+            update_time=job.update_time,
+            source_file_path=source_file_path or (previous.source_file_path if previous else ""),
+        )
+
+    def _insert_jobs(self, jobs, source_file_path=""):
+        """새로 만든 작업을 목록 맨 위에 추가하고 UI를 바로 갱신합니다. 새 작업은 짧은 간격부터 상태를 확인합니다."""
+        now = time.monotonic()
+        for job in jobs:
+            self._batch_jobs.insert(0, self._job_from_api(job, source_file_path))
+            self._inserted_at[job.name] = now
+            self._first_page_rows += 1
+            self.poll_scheduler.track(job.name, normalize_job_state(job.state.name), now)
+        self.jobs_model.update_jobs(self._batch_jobs)
+
+    def _track_listed_jobs(self, jobs_list):
+        """목록 조회 결과로 상태 확인 대상을 맞춥니다. 오래된 작업일수록 긴 간격부터 시작합니다."""
+        now = time.monotonic()
+        self.poll_scheduler.retain_only([job.job_name for job in self._batch_jobs])
+        for job in jobs_list:
+            created = getattr(job, 'create_time', None)
+            age = (datetime.now(created.tzinfo) - created).total_seconds() if created else 0
+            self.poll_scheduler.track(job.name, normalize_job_state(job.state.name), now, age=max(0, age))
+
+    def _on_poll_tick(self):
+        remaining = self.poll_scheduler.next_due_in(time.monotonic())
+        self.next_poll_changed.emit(-1 if remaining is None else math.ceil(remaining))
+        if remaining == 0 and not self.tasks.is_running('poll_jobs') and not self.tasks.is_running('load_jobs'):
+            self._poll_due_jobs()
+
+    def _poll_due_jobs(self):
+        """확인할 때가 된 작업들만 batches.get으로 상태를 가져와 해당 행만 갱신합니다."""
+        due = self.poll_scheduler.due(time.monotonic())
+        if not due:
+            return
+
+        def poll(task):
+            jobs = []
+            for job_name in due:
+                task.check_cancelled()
+                job = self.gemini_api.get_batch_job(job_name)
+                # 끝난 작업이 쓰던 컨텍스트 캐시 등 서버 측 리소스 정리
+                self.gemini_api.release_finished_job_resources(job.name, job.state.name)
+                jobs.append(job)
+            return jobs
+
+        def on_success(jobs):
+            now = time.monotonic()
+            self.poll_scheduler.polls += len(jobs)
+            for job in jobs:
+                self.poll_scheduler.record(job.name, normalize_job_state(job.state.name), now)
+            previous = {job.job_name: (row, job) for row, job in enumerate(self._batch_jobs)}
+            for job in jobs:
+                if job.name in previous:
+                    row, old = previous[job.name]
+                    self._batch_jobs[row] = self._job_from_api(job, previous=old)
+            self.jobs_model.update_jobs(self._batch_jobs)
+            self._merge_ready_groups()
+            self._apply_ready_repairs()
+
+        def on_error(e):
+            # 일시적인 오류일 수 있으므로 간격을 늘려 다시 시도
+            self.poll_scheduler.postpone(due, time.monotonic())
+            logger.warning(f"Failed to poll job status: {e}")
+
+        self.tasks.submit(f"작업 상태 확인 ({len(due)}개)", poll, on_success, on_error, key='poll_jobs')
+
+    def _job_at(self, row_index):
+        if 0 <= row_index < len(self._batch_jobs):
+            return self._batch_jobs[row_index]
+        return None
+
     # --- Commands (Slots) ---
+    @Slot()
+    def cancel_tasks(self):
+        """실행 중인 백그라운드 작업에 취소를 요청합니다 (진행 중인 API 호출은 끝난 뒤 결과가 버려짐)."""
+        if self.tasks.active_count:
+            self.tasks.cancel_all()
+            self.status_message = "진행 중인 작업의 취소를 요청했습니다."
+
+    def shutdown(self):
+        self.poll_timer.stop()
+        self.submission_queue.stop()
+        self.tasks.shutdown()
+
+    def start_submission_queue(self):
+        """이전 실행에서 남은 항목을 포함해 제출 대기열 처리를 시작합니다."""
+        self.submission_queue.start()
+
+    @Slot(list)
+    def enqueue_files(self, file_paths):
+        """여러 파일을 파일마다 별도의 배치 작업으로 제출하도록 대기열에 추가합니다."""
+        file_paths = [path for path in file_paths if path]
+        if not file_paths:
+            self.status_message = "오류: 먼저 번역할 파일을 선택하세요."
+            return
+        self.submission_queue.enqueue(file_paths)
+        self.status_message = f"{len(file_paths)}개 파일을 제출 대기열에 추가했습니다."
+
+    @Slot()
+    def enqueue_selected_files(self):
+        self.enqueue_files(self._new_source_file_paths)
+
+    @Slot(dict)
+    def _on_queue_counts_updated(self, counts):
+        self.submission_counts_changed.emit(counts)
+
+    @Slot(str, list)
+    def _on_queue_job_submitted(self, source_file_path, jobs):
+        if not jobs:
+            self.status_message = f"배치 작업 없이 번역 완료: {self.gemini_api._default_output_path(source_file_path)}"
+            return
+        self._insert_jobs(jobs, source_file_path)
+        self.status_message = f"대기열에서 작업 생성 성공: {', '.join(job.name for job in jobs)} ({os.path.basename(source_file_path)})"
+
+    @Slot(int, str)
+    def _on_preview_delta(self, key_num, delta):
+        if key_num != self._preview_chunk:
+            header = f"── 문단 {key_num} ──\n"
+            if self._preview_chunk:
+                header = "\n\n" + header
+            self._preview_chunk = key_num
+            delta = header + delta
+        self.preview_text_appended.emit(delta)
+
     @Slot()
     def select_source_file(self, file_path):
-        self._new_source_file_path = file_path
-        message = f"Selected file: {os.path.basename(file_path)}"
+        self.select_source_files([file_path])
+
+    @Slot(list)
+    def select_source_files(self, file_paths):
+        """번역할 소스 파일을 선택합니다. 여러 개를 선택하면 하나의 배치 작업으로 묶어 제출합니다."""
+        self._new_source_file_paths = list(file_paths)
+        self._new_source_file_path = file_paths[0] if file_paths else ""
+        if len(file_paths) > 1:
+            message = f"Selected {len(file_paths)} files: {os.path.basename(file_paths[0])} 외 {len(file_paths) - 1}개"
+        else:
+            message = f"Selected file: {os.path.basename(self._new_source_file_path)}"
         self.status_message = message
         logger.info(message)
 
@@ -115,121 +414,329 @@ class MainViewModel(QObject):
             self.status_message = "오류: 먼저 번역할 파일을 선택하세요."
             logger.warning("Add job failed: No source file selected.")
             return
+
+        if len(self._new_source_file_paths) > 1:
+            self._add_multi_file_job()
+            return
         
-        self.is_loading = True
-        self.status_message = f"'{os.path.basename(self._new_source_file_path)}' 작업 추가 중..."
-        logger.info(f"Attempting to add job for file: {self._new_source_file_path}")
-        
-        try:
-            job = self.gemini_api.create_batch_job(self._new_source_file_path)
-            self.status_message = f"작업 생성 성공: {job.name}"
-            logger.info(f"Successfully created job: {job.name}")
-            
-            # Convert the new job to our data model
-            new_translation_job = TranslationJob(
-                job_name=job.name,
-                display_name=job.display_name,
-                status=self._convert_status(job.state.name),
-                creation_time=job.create_time,
-                update_time=job.update_time,
-            )
-            
-            # Add the new job to the top of the list and update the UI immediately
-            self._batch_jobs.insert(0, new_translation_job)
-            self.jobs_model.update_jobs(self._batch_jobs)
-            
-        except Exception as e:
+        source_file_path = self._new_source_file_path
+        self.status_message = f"'{os.path.basename(source_file_path)}' 작업 추가 중..."
+        logger.info(f"Attempting to add job for file: {source_file_path}")
+
+        def on_success(jobs):
+            if not jobs:
+                # 작은 파일(빠른 모드)이거나 모든 청크가 번역 캐시에 있어 배치 작업 없이 바로 결과 파일이 만들어진 경우
+                output_path = self.gemini_api._default_output_path(source_file_path)
+                self.status_message = f"배치 작업 없이 번역 완료: {output_path}"
+                logger.info(f"'{source_file_path}' was translated without a batch job.")
+                return
+            if len(jobs) > 1:
+                self.status_message = f"작업 {len(jobs)}개로 나눠 생성 성공: {jobs[0].name} 외 {len(jobs) - 1}개"
+            else:
+                self.status_message = f"작업 생성 성공: {jobs[0].name}"
+            logger.info(f"Successfully created job(s): {', '.join(job.name for job in jobs)}")
+            # Add the new jobs to the top of the list and update the UI immediately
+            self._insert_jobs(jobs)
+
+        def on_error(e):
+            self.status_message = f"오류: 작업 추가 실패 - {e}"
+            logger.error(f"Failed to create job for file '{source_file_path}': {e}", exc_info=e)
+
+        # 처음 몇 청크는 배치 작업 제출과 동시에 스트리밍으로 번역해 미리보기 창에 보여 줌 (preview_chunks)
+        self._preview_chunk = 0
+        self.preview_started.emit(os.path.basename(source_file_path))
+        self.tasks.submit(
+            f"작업 추가 ({os.path.basename(source_file_path)})",
+            lambda task: self.gemini_api.create_batch_jobs(source_file_path, on_preview=self._preview_delta.emit),
+            on_success, on_error
+        )
+
+    def _add_multi_file_job(self):
+        """선택된 여러 파일을 하나(또는 크기 상한에 따라 여러 개)의 배치 작업으로 묶어 제출합니다."""
+        file_paths = list(self._new_source_file_paths)
+        self.status_message = f"{len(file_paths)}개 파일을 묶은 작업 추가 중..."
+        logger.info(f"Attempting to add a multi-file job for {len(file_paths)} files.")
+
+        def on_success(jobs):
+            self._insert_jobs(jobs)
+            self.status_message = f"{len(file_paths)}개 파일로 작업 {len(jobs)}개 생성 성공"
+            logger.info(f"Successfully created {len(jobs)} multi-file job(s) for {len(file_paths)} files.")
+
+        def on_error(e):
             self.status_message = f"오류: 작업 추가 실패 - {e}"
-            logger.error(f"Failed to create job for file '{self._new_source_file_path}': {e}", exc_info=True)
-        finally:
-            self.is_loading = False
+            logger.error(f"Failed to create multi-file job: {e}", exc_info=e)
+
+        self.tasks.submit(
+            f"작업 추가 ({len(file_paths)}개 파일)",
+            lambda task: self.gemini_api.create_multi_file_batch_jobs(file_paths),
+            on_success, on_error
+        )
+
+    def is_multi_file_job(self, row_index):
+        """해당 행의 작업이 여러 파일을 묶은 작업인지 반환합니다 (결과 저장 위치로 폴더를 받음)."""
+        job = self._job_at(row_index)
+        return bool(job) and self.gemini_api.is_multi_file_job(job.job_name)
+
+    def can_revise_job(self, row_index):
+        """해당 행의 작업을 수정본 재번역에 쓸 수 있는지 반환합니다."""
+        job = self._job_at(row_index)
+        return bool(job) and self.gemini_api.can_revise_job(job.job_name)
+
+    def get_job_source_file(self, row_index):
+        job = self._job_at(row_index)
+        if job:
+            return self.gemini_api.job_tracker.get_source_file(job.job_name) or ""
+        return ""
+
+    @Slot(int, str)
+    def revise_job(self, row_index, source_file_path):
+        """수정된 소스 파일에서 바뀐 청크만 다시 번역하는 작업을 추가합니다."""
+        previous_job = self._job_at(row_index)
+        if not previous_job:
+            return
+        self.status_message = f"'{os.path.basename(source_file_path)}' 수정본 재번역 작업 추가 중..."
+        logger.info(f"Attempting to add a revision of job '{previous_job.job_name}' with source '{source_file_path}'.")
+
+        def on_success(job):
+            if job is None:
+                output_path = self.gemini_api._default_output_path(source_file_path)
+                self.status_message = f"바뀐 청크가 없어 이전 번역으로 완료: {output_path}"
+                return
+            self._insert_jobs([job], source_file_path)
+            self.status_message = f"수정본 재번역 작업 생성 성공: {job.name}"
+            logger.info(f"Successfully created revision job: {job.name}")
+
+        def on_error(e):
+            self.status_message = f"오류: 수정본 재번역 작업 추가 실패 - {e}"
+            logger.error(f"Failed to create revision of job '{previous_job.job_name}': {e}", exc_info=e)
+
+        self.tasks.submit(
+            f"수정본 재번역 ({os.path.basename(source_file_path)})",
+            lambda task: self.gemini_api.create_revision_job(previous_job.job_name, source_file_path),
+            on_success, on_error
+        )
+
+    @Slot()
+    def resume_pending_uploads(self):
+        """이전 실행에서 연결이 끊겨 멈춘 요청 업로드를 이어서 마치고, 만들어진 작업을 목록에 추가합니다."""
+        def on_success(jobs):
+            if jobs:
+                self._insert_jobs(jobs)
+                self.status_message = f"중단된 업로드 {len(jobs)}개를 마치고 작업을 생성했습니다."
+                logger.info(f"Resumed {len(jobs)} interrupted request upload(s).")
+
+        def on_error(e):
+            self.status_message = f"오류: 중단된 업로드 재개 실패 - {e}"
+            logger.error(f"Failed to resume pending uploads: {e}", exc_info=e)
+
+        self.tasks.submit(
+            "중단된 업로드 재개",
+            lambda task: self.gemini_api.resume_pending_uploads(),
+            on_success, on_error, key='resume_uploads'
+        )
+
+    def _fetch_jobs(self, task, page_token=None):
+        """(작업 스레드) 작업 목록 한 페이지를 가져오고 끝난 작업의 서버 측 리소스를 정리합니다."""
+        jobs_list, next_page_token = self.gemini_api.list_batch_jobs_page(page_token)
+        logger.info(f"API returned {len(jobs_list)} jobs (more pages: {bool(next_page_token)}).")
+        if len(jobs_list) > 0:
+            # Log details for each job at DEBUG level
+            logger.debug("--- Fetched Batch Jobs ---")
+            for job in jobs_list:
+                logger.debug(f"  - Name: {job.name}, Display: {job.display_name}, State: {job.state.name}")
+            logger.debug("--------------------------")
+        # --- End Debugging ---
+
+        # 끝난 작업이 쓰던 컨텍스트 캐시 등 서버 측 리소스 정리
+        for job in jobs_list:
+            task.check_cancelled()
+            self.gemini_api.release_finished_job_resources(job.name, job.state.name)
+        return jobs_list, next_page_token
+
+    def _jobs_from_page(self, jobs_list):
+        previous = {job.job_name: job for job in self._batch_jobs}
+        tracker = self.gemini_api.job_tracker
+        return [
+            self._job_from_api(j, tracker.get_source_file(j.name) or "", previous.get(j.name))
+            for j in jobs_list
+        ]
+
+    def _set_next_page_token(self, next_page_token):
+        self._next_page_token = next_page_token
+        self.jobs_model.set_fetch_more(self.load_more_jobs if next_page_token else None)
 
     @Slot()
     def load_jobs(self):
-        self.is_loading = True
-        self.status_message = "작업 목록을 새로고침하는 중..."
-        logger.info("Refreshing job list...")
-        try:
-            jobs_from_api = self.gemini_api.list_batch_jobs()
-            
-            # The result from the SDK is now a direct list.
-            jobs_list = jobs_from_api
-            logger.info(f"API returned {len(jobs_list)} jobs. Type: {type(jobs_from_api)}")
-            if len(jobs_list) > 0:
-                # Log details for each job at DEBUG level
-                logger.debug("--- Fetched Batch Jobs ---")
-                for job in jobs_list:
-                    logger.debug(f"  - Name: {job.name}, Display: {job.display_name}, State: {job.state.name}")
-                logger.debug("--------------------------")
-            # --- End Debugging ---
-
-            self._batch_jobs = [
-                TranslationJob(
-                    job_name=j.name,
-                    display_name=j.display_name,
-                    status=self._convert_status(j.state.name),
-                    creation_time=j.create_time,
-                    update_time=j.update_time,
-                ) for j in jobs_list # Use the converted list from the page
+        """
+        전체 작업 목록을 백그라운드에서 새로고침합니다 (시작 시와 새로고침 버튼). 이미 새로고침 중이면 건너뜁니다.
+        이후의 상태 변화는 끝나지 않은 작업만 작업별 간격으로 확인합니다.
+        """
+        started = time.monotonic()
+        first_page_rows = self._first_page_rows
+
+        def on_success(result):
+            jobs_list, next_page_token = result
+            fetched = self._jobs_from_page(jobs_list)
+            fetched_names = {job.job_name for job in fetched}
+            # 새로고침 도중에 추가된 작업은 아직 목록 응답에 없을 수 있으므로 유지
+            added_meanwhile = [
+                job for job in self._batch_jobs
+                if job.job_name not in fetched_names and self._inserted_at.get(job.job_name, -1) >= started
             ]
+            self._inserted_at = {name: t for name, t in self._inserted_at.items() if t >= started}
+            # 스크롤해서 이미 받은 다음 페이지들은 유지하고 첫 페이지 부분만 교체 (스크롤 위치 유지).
+            # 새 작업이 생겨 첫 페이지 밖으로 밀려난 작업(받은 페이지의 마지막 작업보다 오래된 작업)은 뒤쪽에 남깁니다.
+            later_pages = []
+            if len(self._batch_jobs) > first_page_rows and fetched:
+                oldest = fetched[-1].creation_time
+                later_pages = [
+                    job for row, job in enumerate(self._batch_jobs)
+                    if job.job_name not in fetched_names and (row >= first_page_rows or job.creation_time <= oldest)
+                    and job not in added_meanwhile
+                ]
+            self._batch_jobs = added_meanwhile + fetched + later_pages
+            self._first_page_rows = len(added_meanwhile) + len(fetched)
+            if not later_pages:
+                self._set_next_page_token(next_page_token)
             self.jobs_model.update_jobs(self._batch_jobs)
+            self._track_listed_jobs(jobs_list)
             self.status_message = f"작업 목록 새로고침 완료. 총 {len(self._batch_jobs)}개 작업."
             logger.info(f"Job list UI updated. Found {len(self._batch_jobs)} jobs.")
-        except Exception as e:
+            self._merge_ready_groups()
+            self._apply_ready_repairs()
+            self.jobs_refreshed.emit(True)
+
+        def on_error(e):
             self.status_message = f"오류: 작업 목록 로드 실패 - {e}"
-            logger.error(f"Failed to load job list: {e}", exc_info=True)
-        finally:
-            self.is_loading = False
+            logger.error(f"Failed to load job list: {e}", exc_info=e)
+            self.jobs_refreshed.emit(False)
+
+        task = self.tasks.submit("작업 목록 새로고침", self._fetch_jobs, on_success, on_error, key='load_jobs')
+        if task:
+            self.status_message = "작업 목록을 새로고침하는 중..."
+            logger.info("Refreshing job list...")
+
+    def load_more_jobs(self):
+        """목록 끝까지 스크롤하면 다음 페이지를 가져와 목록 아래에 붙입니다."""
+        page_token = self._next_page_token
+        if not page_token:
+            return
+
+        def on_success(result):
+            jobs_list, next_page_token = result
+            known = {job.job_name for job in self._batch_jobs}
+            # 첫 페이지를 받은 뒤 새 작업이 생기면 페이지 경계가 밀려 겹칠 수 있으므로 중복 제거
+            self._batch_jobs = self._batch_jobs + [job for job in self._jobs_from_page(jobs_list) if job.job_name not in known]
+            self.jobs_model.update_jobs(self._batch_jobs)
+            self._set_next_page_token(next_page_token)
+            self._track_listed_jobs(jobs_list)
+            self.status_message = f"작업 {len(jobs_list)}개를 더 불러왔습니다. 총 {len(self._batch_jobs)}개 작업."
+
+        def on_error(e):
+            # 다음에 스크롤하면 다시 시도
+            self._set_next_page_token(page_token)
+            self.status_message = f"오류: 작업 목록 추가 로드 실패 - {e}"
+            logger.error(f"Failed to load more jobs: {e}", exc_info=e)
+
+        self.tasks.submit(
+            "작업 목록 더 불러오기", lambda task: self._fetch_jobs(task, page_token),
+            on_success, on_error, key='load_more_jobs'
+        )
+
+    def _merge_ready_groups(self):
+        """여러 작업으로 나눠 제출한 번역 중 모든 파트가 성공한 번역의 결과를 바로 합칩니다."""
+        for group_id in self.gemini_api.ready_fanout_groups():
+            def on_success(output_path):
+                self.status_message = f"나눠 제출한 작업의 결과 병합 완료: {output_path}"
+
+            def on_error(e, group_id=group_id):
+                self.status_message = f"오류: 나눠 제출한 작업의 결과 병합 실패 - {e}"
+                logger.error(f"Failed to merge results of job group '{group_id}': {e}", exc_info=e)
+
+            self.tasks.submit(
+                "나눠 제출한 작업의 결과 병합",
+                lambda task, group_id=group_id: self.gemini_api.merge_fanout_group(group_id),
+                on_success, on_error, key=f"merge:{group_id}"
+            )
+
+    def _apply_ready_repairs(self):
+        """성공한 복구용 배치 작업의 결과를 원래 결과 파일에 바로 반영합니다."""
+        for job_name in self.gemini_api.ready_repair_jobs():
+            def on_success(report):
+                self.status_message = f"복구 작업 반영 완료: {report.describe()}"
+
+            def on_error(e, job_name=job_name):
+                self.status_message = f"오류: 복구 작업 반영 실패 - {e}"
+                logger.error(f"Failed to apply repair job '{job_name}': {e}", exc_info=e)
+
+            self.tasks.submit(
+                "복구 작업 결과 반영",
+                lambda task, job_name=job_name: self.gemini_api.apply_repair_job(job_name),
+                on_success, on_error, key=f"repair:{job_name}"
+            )
 
     @Slot(int)
     def delete_job(self, row_index):
-        if 0 <= row_index < len(self._batch_jobs):
-            job_to_delete = self._batch_jobs[row_index]
-            self.is_loading = True
-            self.status_message = f"'{job_to_delete.display_name}' 작업 삭제 중..."
-            logger.info(f"Attempting to delete job: {job_to_delete.job_name}")
-            try:
-                self.gemini_api.delete_batch_job(job_to_delete.job_name)
-                self.status_message = "작업 삭제 성공."
-                logger.info(f"Successfully deleted job: {job_to_delete.job_name}")
-                self.load_jobs()
-            except Exception as e:
-                self.status_message = f"오류: 작업 삭제 실패 - {e}"
-                logger.error(f"Failed to delete job '{job_to_delete.job_name}': {e}", exc_info=True)
-            finally:
-                self.is_loading = False
+        job_to_delete = self._job_at(row_index)
+        if not job_to_delete:
+            return
+        self.status_message = f"'{job_to_delete.display_name}' 작업 삭제 중..."
+        logger.info(f"Attempting to delete job: {job_to_delete.job_name}")
+
+        def on_success(_):
+            self.status_message = "작업 삭제 성공."
+            logger.info(f"Successfully deleted job: {job_to_delete.job_name}")
+            # 뒤쪽 페이지의 작업은 첫 페이지 새로고침으로 사라지지 않으므로 목록에서 직접 제거
+            if job_to_delete in self._batch_jobs:
+                if self._batch_jobs.index(job_to_delete) < self._first_page_rows:
+                    self._first_page_rows -= 1
+                self._batch_jobs.remove(job_to_delete)
+                self.jobs_model.update_jobs(self._batch_jobs)
+            self.load_jobs()
+
+        def on_error(e):
+            self.status_message = f"오류: 작업 삭제 실패 - {e}"
+            logger.error(f"Failed to delete job '{job_to_delete.job_name}': {e}", exc_info=e)
+
+        self.tasks.submit(
+            f"작업 삭제 ({job_to_delete.display_name})",
+            lambda task: self.gemini_api.delete_batch_job(job_to_delete.job_name),
+            on_success, on_error
+        )
 
     @Slot(int)
     def download_result(self, row_index, save_path):
-        if 0 <= row_index < len(self._batch_jobs):
-            job_to_download = self._batch_jobs[row_index]
-            
-            # Get the full job object from the API to ensure we have the latest data
-            try:
-                full_job_obj = self.gemini_api.client.batches.get(name=job_to_download.job_name)
-                normalized_state = full_job_obj.state.name.replace("JOB_STATE_", "")
-            except Exception as e:
-                self.status_message = f"오류: 작업 정보를 가져올 수 없습니다 - {e}"
-                logger.error(f"Failed to get job details for '{job_to_download.job_name}': {e}", exc_info=True)
-                return
+        job_to_download = self._job_at(row_index)
+        if not job_to_download:
+            return
+        self.status_message = f"'{job_to_download.display_name}' 결과 다운로드 및 처리 중..."
+        logger.info(f"Attempting to download and process result for job: {job_to_download.job_name}")
 
+        def download(task):
+            # Get the full job object from the API to ensure we have the latest data
+            full_job_obj = self.gemini_api.client.batches.get(name=job_to_download.job_name)
+            normalized_state = full_job_obj.state.name.replace("JOB_STATE_", "")
             if normalized_state != "SUCCEEDED":
-                self.status_message = "오류: '성공' 상태인 작업만 결과를 다운로드할 수 있습니다."
                 logger.warning(f"Download result for job '{job_to_download.job_name}' failed: Job status is '{normalized_state}', not 'SUCCEEDED'.")
-                return
+                raise ValueError("'성공' 상태인 작업만 결과를 다운로드할 수 있습니다.")
+            task.check_cancelled()
+            task.report_progress("결과 파일 다운로드 및 처리 중...")
+            return self.gemini_api.download_and_process_results(full_job_obj, save_path)
+
+        def on_success(report):
+            self.status_message = f"결과 저장 완료: {save_path}"
+            if report:
+                self.status_message += f" (복구 {report.describe()})"
+            if report and report.repair_job:
+                # 실패한 청크의 복구용 배치 작업도 목록에 넣고 상태를 확인해, 성공하면 _apply_ready_repairs로 반영
+                self._insert_jobs([report.repair_job], job_to_download.source_file_path)
+            logger.info(f"Successfully downloaded and saved result for job '{job_to_download.job_name}' to '{save_path}'.")
+
+        def on_error(e):
+            self.status_message = f"오류: 결과 처리 실패 - {e}"
+            logger.error(f"Failed to download and process result for job '{job_to_download.job_name}': {e}", exc_info=e)
 
-            self.is_loading = True
-            self.status_message = f"'{job_to_download.display_name}' 결과 다운로드 및 처리 중..."
-            logger.info(f"Attempting to download and process result for job: {job_to_download.job_name}")
-            try:
-                self.gemini_api.download_and_process_results(full_job_obj, save_path)
-                self.status_message = f"결과 저장 완료: {save_path}"
-                logger.info(f"Successfully downloaded and saved result for job '{job_to_download.job_name}' to '{save_path}'.")
-            except Exception as e:
-                self.status_message = f"오류: 결과 처리 실패 - {e}"
-                logger.error(f"Failed to download and process result for job '{job_to_download.job_name}': {e}", exc_info=True)
-            finally:
-                self.is_loading = False
+        self.tasks.submit(f"결과 다운로드 ({job_to_download.display_name})", download, on_success, on_error)
 
     def _convert_status(self, api_status_str):
         """Converts API status string to JobStatus enum."""
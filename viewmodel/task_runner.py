@@ -0,0 +1,160 @@
+import logging
+import threading
+import uuid
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCancelledError(Exception):
+    """취소된 작업에서 발생합니다."""
+
+
+class _TaskSignals(QObject):
+    # 작업 스레드에서 emit되어 GUI 스레드의 TaskRunner로 전달됩니다 (queued connection).
+    progress = Signal(str, str)
+    succeeded = Signal(str, object)
+    failed = Signal(str, object)
+
+
+class Task(QRunnable):
+    """
+    QThreadPool에서 실행되는 작업 하나입니다.
+    fn(task)는 작업 스레드에서 호출되며, task.report_progress()로 진행 상황을 알리고
+    task.check_cancelled()로 취소 요청을 확인할 수 있습니다 (협조적 취소).
+    """
+
+    def __init__(self, label, fn):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.task_id = uuid.uuid4().hex
+        self.label = label
+        self.signals = _TaskSignals()
+        self._fn = fn
+        self._cancelled = threading.Event()
+        self.done = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise TaskCancelledError(f"'{self.label}' was cancelled.")
+
+    def report_progress(self, message):
+        self.signals.progress.emit(self.task_id, message)
+
+    def run(self):
+        try:
+            self.check_cancelled()
+            result = self._fn(self)
+            self.check_cancelled()
+        except Exception as e:
+            self.signals.failed.emit(self.task_id, e)
+        else:
+            self.signals.succeeded.emit(self.task_id, result)
+        finally:
+            self.done.set()
+
+
+class TaskRunner(QObject):
+    """
+    API 호출 같은 느린 작업을 GUI 스레드 밖(QThreadPool)에서 실행합니다.
+    완료/실패 콜백은 GUI 스레드에서 호출되므로 모델과 위젯을 바로 갱신해도 됩니다.
+    여러 작업이 동시에 실행될 수 있으며, key가 같은 작업은 하나만 실행됩니다 (예: 목록 새로고침).
+    """
+    active_count_changed = Signal(int)
+    task_progress = Signal(str, str)  # (작업 이름, 진행 메시지)
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._tasks = {}  # task_id -> (task, on_success, on_error, key)
+        self._running_keys = {}
+        # 끝난 작업도 run()이 완전히 반환될 때까지는 참조를 유지 (autoDelete를 끈 QRunnable)
+        self._retired = []
+
+    @property
+    def active_count(self):
+        return len(self._tasks)
+
+    def is_running(self, key):
+        return key in self._running_keys
+
+    def submit(self, label, fn, on_success=None, on_error=None, key=None):
+        """
+        fn(task)를 작업 스레드에서 실행합니다. 같은 key의 작업이 이미 실행 중이면 None을 반환합니다.
+        on_success(result) / on_error(exception)는 GUI 스레드에서 호출됩니다 (취소된 작업은 호출하지 않음).
+        """
+        if key is not None and key in self._running_keys:
+            logger.debug(f"Task '{label}' skipped: a task with key '{key}' is already running.")
+            return None
+        self._retired = [t for t in self._retired if not t.done.is_set()]
+        task = Task(label, fn)
+        task.signals.progress.connect(self._on_progress)
+        task.signals.succeeded.connect(self._on_succeeded)
+        task.signals.failed.connect(self._on_failed)
+        self._tasks[task.task_id] = (task, on_success, on_error, key)
+        if key is not None:
+            self._running_keys[key] = task.task_id
+        logger.info(f"Task started: {label}")
+        self._pool.start(task)
+        self.active_count_changed.emit(len(self._tasks))
+        return task
+
+    def cancel_all(self):
+        """실행 중인 작업에 취소를 요청하고, 아직 시작하지 않은 작업은 대기열에서 뺍니다."""
+        for task_id, (task, _, _, _) in list(self._tasks.items()):
+            task.cancel()
+            if self._pool.tryTake(task):
+                logger.info(f"Task cancelled before it started: {task.label}")
+                task.done.set()
+                self._finish(task_id)
+
+    def shutdown(self, timeout_ms=5000):
+        """앱 종료 시 작업을 취소하고 실행 중인 작업이 끝나길 잠시 기다립니다."""
+        self.cancel_all()
+        self._pool.waitForDone(timeout_ms)
+
+    def _finish(self, task_id):
+        entry = self._tasks.pop(task_id, None)
+        if entry:
+            self._retired.append(entry[0])
+        if entry and entry[3] is not None:
+            self._running_keys.pop(entry[3], None)
+        self.active_count_changed.emit(len(self._tasks))
+        return entry
+
+    @Slot(str, str)
+    def _on_progress(self, task_id, message):
+        entry = self._tasks.get(task_id)
+        if entry:
+            self.task_progress.emit(entry[0].label, message)
+
+    @Slot(str, object)
+    def _on_succeeded(self, task_id, result):
+        entry = self._finish(task_id)
+        if not entry:
+            return
+        task, on_success, _, _ = entry
+        logger.info(f"Task finished: {task.label}")
+        if on_success:
+            on_success(result)
+
+    @Slot(str, object)
+    def _on_failed(self, task_id, error):
+        entry = self._finish(task_id)
+        if not entry:
+            return
+        task, _, on_error, _ = entry
+        if isinstance(error, TaskCancelledError):
+            logger.info(f"Task cancelled: {task.label}")
+            return
+        logger.warning(f"Task failed: {task.label}: {error}")
+        if on_error:
+            on_error(error)